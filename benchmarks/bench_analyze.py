@@ -0,0 +1,55 @@
+'''
+Purpose: Measure how analyze_project scales with the number of worker processes.
+
+Generates a synthetic project of Python files in a temporary directory and
+analyzes it with the analysis cache off, once per worker count.
+
+Usage: python benchmarks/bench_analyze.py [files] [max_workers]
+'''
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core import project_analyzer
+from core.project_analyzer import analyze_project
+
+FUNCTIONS_PER_FILE = 40
+
+
+def make_project(root: Path, files: int):
+    body = "".join(
+        f"def func_{i}(a, b):\n    '''Docstring {i}.'''\n    return [x * a + b for x in range({i})]\n\n"
+        for i in range(FUNCTIONS_PER_FILE)
+    )
+    for i in range(files):
+        package = root / f"pkg_{i % 20}"
+        package.mkdir(exist_ok=True)
+        (package / f"module_{i}.py").write_text(f"class Model{i}:\n    pass\n\n" + body)
+
+
+def main(files: int, max_workers: int):
+    project_analyzer.console.quiet = True
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        make_project(root, files)
+
+        baseline = None
+        workers = 1
+        while workers <= max_workers:
+            start = time.perf_counter()
+            analyze_project(root, use_cache=False, workers=workers)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"{workers:>3} workers: {elapsed:.2f}s ({baseline / elapsed:.2f}x)")
+            workers *= 2
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 2000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1,
+    )
@@ -0,0 +1,58 @@
+'''
+Purpose: Measure the latency win of the pooled OpenAI client.
+
+Sends the same number of chat completions to the local fake server, once with a
+fresh AsyncOpenAI client per request (the old behaviour) and once through the
+shared ClientManager.
+
+Usage: python benchmarks/bench_client_pool.py [requests]
+'''
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from openai import AsyncOpenAI
+from core.clients import ClientManager
+from benchmarks.fake_openai_server import start_server
+
+MESSAGES = [{"role": "user", "content": "ping"}]
+
+
+async def fresh_clients(base_url: str, requests: int) -> float:
+    start = time.perf_counter()
+    for _ in range(requests):
+        client = AsyncOpenAI(api_key="fake", base_url=base_url)
+        await client.chat.completions.create(model="fake", messages=MESSAGES)
+        await client.close()
+    return time.perf_counter() - start
+
+
+async def pooled_client(base_url: str, requests: int) -> float:
+    manager = ClientManager(api_key="fake", base_url=base_url)
+    start = time.perf_counter()
+    for _ in range(requests):
+        await manager.get_client("fake").chat.completions.create(model="fake", messages=MESSAGES)
+    elapsed = time.perf_counter() - start
+    await manager.aclose()
+    return elapsed
+
+
+def main(requests: int):
+    server, base_url = start_server()
+    try:
+        fresh = asyncio.run(fresh_clients(base_url, requests))
+        pooled = asyncio.run(pooled_client(base_url, requests))
+    finally:
+        server.shutdown()
+
+    print(f"{requests} requests")
+    print(f"fresh client per request: {fresh * 1000 / requests:.2f} ms/request")
+    print(f"pooled client:            {pooled * 1000 / requests:.2f} ms/request")
+    print(f"speedup:                  {fresh / pooled:.2f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,50 @@
+'''
+Purpose: Time write previews of multi-MB files with the bounded diff engine.
+
+Builds a large generated file and an edited copy, then times difflib.unified_diff
+against the engine's diff, and the identical-content check, for a few edit counts.
+
+Usage: python benchmarks/bench_diff.py [lines]
+'''
+import sys
+import time
+from difflib import unified_diff
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.diff_engine import same_content, unified_lines
+
+
+def timed(action) -> tuple[float, object]:
+    start = time.perf_counter()
+    result = action()
+    return time.perf_counter() - start, result
+
+
+def edited(lines: list[str], edits: int) -> list[str]:
+    copy = list(lines)
+    step = max(1, len(copy) // (edits + 1))
+    for i in range(1, edits + 1):
+        copy[i * step] = f"    value_{i} = compute({i})  # edited"
+    return copy
+
+
+def main(lines: int):
+    old = [f"    field_{i % 997} = Column(Integer, default={i})  # generated row {i}" for i in range(lines)]
+    old_text = "\n".join(old)
+    print(f"{lines} lines, {len(old_text) / 1024 / 1024:.1f} MB")
+
+    same, _ = timed(lambda: same_content(old_text, old_text + "\n"))
+    print(f"identical check       {same * 1000:8.1f} ms")
+
+    for edits in (10, 200, 2000):
+        new_text = "\n".join(edited(old, edits))
+        ours, diff = timed(lambda: list(unified_lines(old_text, new_text, "models.py")))
+        theirs, _ = timed(lambda: list(unified_diff(old, new_text.splitlines(), "models.py", "models.py", lineterm="")))
+        shown = f"{len(diff)} lines" if len(diff) > 1 else "summary"
+        print(f"{edits:5d} edits   difflib {theirs:7.2f}s   engine {ours:7.2f}s ({shown})")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
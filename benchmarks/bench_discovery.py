@@ -0,0 +1,61 @@
+'''
+Purpose: Measure file discovery on a repo with large vendored trees.
+
+Builds a temporary project with a few source files next to big node_modules
+and venv trees, then compares the old rglob-then-filter discovery with the
+pruning scandir walker.
+
+Usage: python benchmarks/bench_discovery.py [vendored_files]
+'''
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.file_discovery import discover_files
+
+OLD_EXCLUDED_DIRS = {".git", "venv", ".coductor", "__pycache__", "node_modules"}
+
+
+def rglob_discovery(root: Path) -> list[Path]:
+    return [
+        f for f in root.rglob("*.py")
+        if not any(excluded in f.parts for excluded in OLD_EXCLUDED_DIRS)
+    ]
+
+
+def make_project(root: Path, vendored: int):
+    for i in range(200):
+        path = root / "src" / f"pkg_{i % 10}" / f"module_{i}.py"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("")
+    for tree in ("node_modules", "venv"):
+        for i in range(vendored // 2):
+            path = root / tree / f"dep_{i % 500}" / "lib" / f"file_{i}.py"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text("")
+
+
+def timed(discover, root: Path) -> tuple[float, int]:
+    start = time.perf_counter()
+    files = discover(root)
+    return time.perf_counter() - start, len(files)
+
+
+def main(vendored: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        make_project(root, vendored)
+        old, old_count = timed(rglob_discovery, root)
+        new, new_count = timed(discover_files, root)
+
+    print(f"{vendored} vendored files, {new_count} source files")
+    print(f"rglob then filter: {old * 1000:.1f} ms ({old_count} files)")
+    print(f"pruning scandir:   {new * 1000:.1f} ms ({new_count} files)")
+    print(f"speedup:           {old / new:.0f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
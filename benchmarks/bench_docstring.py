@@ -0,0 +1,52 @@
+'''
+Purpose: Compare the streaming docstring splice with reading and rewriting the whole file.
+
+Writes one large Python file with a docstring, then replaces the docstring both
+ways and reports time and peak Python memory.
+
+Usage: python benchmarks/bench_docstring.py [megabytes]
+'''
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core import file_writer
+
+
+def measure(action) -> tuple[float, float]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    action()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1024 / 1024
+
+
+def rewrite_whole(path: Path, docstring: str):
+    content = path.read_text()
+    end = content.find('"""', 3) + 4
+    path.write_text('"""' + docstring + '"""\n' + content[end:])
+
+
+def main(megabytes: int):
+    line = "value = compute(1, 2, 3)  # generated\n"
+    body = line * (megabytes * 1024 * 1024 // len(line))
+    with tempfile.TemporaryDirectory() as tmp, patch.object(file_writer.console, "print"):
+        path = Path(tmp) / "generated.py"
+        path.write_text('"""Old"""\n' + body)
+        whole = measure(lambda: rewrite_whole(path, "Whole"))
+        with patch.object(file_writer.Confirm, "ask", return_value=True):
+            streamed = measure(lambda: file_writer.append_docstring(path, "Streamed"))
+    print(f"{megabytes} MB file")
+    print(f"read and rewrite  {whole[0]:6.2f}s {whole[1]:8.1f} MB")
+    print(f"streaming splice  {streamed[0]:6.2f}s {streamed[1]:8.1f} MB")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100)
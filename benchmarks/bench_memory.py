@@ -0,0 +1,72 @@
+'''
+Purpose: Measure scripted bulk edits of the project memory.
+
+Applies many update_memory calls to a memory.yml of realistic size three ways:
+the old pure-Python parse and rewrite per call, the cached LibYAML-backed
+MemoryManager, and the same inside one `with memory.transaction():`.
+
+Usage: python benchmarks/bench_memory.py [updates] [keys]
+'''
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import yaml
+from core import memory as memory_module
+from core.memory import MemoryManager
+
+
+def old_update(path: Path, key: str, value):
+    with open(path, 'r') as f:
+        memory = yaml.safe_load(f) or {}
+    memory[key] = value
+    with open(path, 'w') as f:
+        yaml.safe_dump(memory, f)
+
+
+def seed(path: Path, keys: int):
+    data = {f"note_{i}": {"summary": f"Decision {i} about module {i % 40}", "files": [f"core/m{i % 40}.py"]} for i in range(keys)}
+    path.write_text(yaml.safe_dump(data))
+
+
+def timed(action) -> float:
+    start = time.perf_counter()
+    action()
+    return time.perf_counter() - start
+
+
+def main(updates: int, keys: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        memory = MemoryManager(root)
+        seed(memory.memory_path, keys)
+        old = timed(lambda: [old_update(memory.memory_path, f"step_{i}", i) for i in range(updates)])
+
+        seed(memory.memory_path, keys)
+        cached = timed(lambda: [memory.update_memory(f"step_{i}", i) for i in range(updates)])
+
+        seed(memory.memory_path, keys)
+
+        def batched():
+            with memory.transaction():
+                for i in range(updates):
+                    memory.update_memory(f"step_{i}", i)
+
+        transaction = timed(batched)
+        memory.close()
+
+    libyaml = memory_module.YamlLoader is not yaml.SafeLoader
+    print(f"{updates} updates to a memory of {keys} keys (LibYAML: {'yes' if libyaml else 'no'})")
+    print(f"parse and rewrite each  {old:7.2f}s")
+    print(f"cached                  {cached:7.2f}s  {old / cached:6.1f}x")
+    print(f"one transaction         {transaction:7.2f}s  {old / transaction:6.1f}x")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 100,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 500,
+    )
@@ -0,0 +1,52 @@
+'''
+Purpose: Compare the prompt registry with loading a template on every call.
+
+Renders the plan_project prompt many times the old way (read the YAML file,
+parse it, compile a new Template) and through load_prompt, then times a cold
+start (first template in a fresh registry) with and without the bytecode cache.
+
+Usage: python benchmarks/bench_prompts.py [renders]
+'''
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import yaml
+from jinja2 import Template
+from core.prompts.prompt_loader import PROMPTS_DIR, PromptRegistry, load_prompt
+
+VALUES = {"idea": "A habit tracker", "stack": "Python, SQLite", "name": "Habits"}
+
+
+def old_load(name: str) -> Template:
+    with open(PROMPTS_DIR / f"{name}.yml", "r") as file:
+        return Template(yaml.safe_load(file)["prompt"])
+
+
+def timed(action, repeat: int = 1) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        action()
+    return time.perf_counter() - start
+
+
+def main(renders: int):
+    old = timed(lambda: old_load("plan_project").render(**VALUES), renders)
+    new = timed(lambda: load_prompt("plan_project").render(**VALUES), renders)
+    with tempfile.TemporaryDirectory() as tmp:
+        cold = timed(lambda: PromptRegistry(bytecode_cache=False).template("plan_project"))
+        PromptRegistry(bytecode_dir=Path(tmp)).template("plan_project")
+        warm = timed(lambda: PromptRegistry(bytecode_dir=Path(tmp)).template("plan_project"))
+
+    print(f"{renders} renders")
+    print(f"load per call   {old:8.3f}s  ({old / renders * 1e6:7.1f} us/render)")
+    print(f"registry        {new:8.3f}s  ({new / renders * 1e6:7.1f} us/render)")
+    print(f"first template, no bytecode cache  {cold * 1000:6.2f} ms")
+    print(f"first template, bytecode cache     {warm * 1000:6.2f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
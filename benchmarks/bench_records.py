@@ -0,0 +1,49 @@
+'''
+Purpose: Measure the memory the analysis results take per symbol.
+
+Analyzes a synthetic project, then compares the memory held by the symbol,
+import and reference records with the same data kept as one dict per item.
+
+Usage: python benchmarks/bench_records.py [files]
+'''
+import gc
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.project_analyzer import analyze_file, get_python_files
+from bench_analyze import make_project
+
+KEYS = ("symbols", "imports", "references")
+
+
+def held(build) -> tuple[object, float]:
+    gc.collect()
+    tracemalloc.start()
+    value = build()
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return value, size / 1024 / 1024
+
+
+def main(files: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        make_project(root, files)
+        results = [analyze_file(file) for file in get_python_files(root)]
+
+    symbols = sum(len(r["symbols"]) for r in results)
+    _, as_records = held(lambda: [{key: [row._make(row) for row in r[key]] for key in KEYS} for r in results])
+    _, as_dicts = held(lambda: [{key: [row._asdict() for row in r[key]] for key in KEYS} for r in results])
+
+    print(f"{files} files, {symbols} symbols")
+    print(f"records  {as_records:7.1f} MB  {as_records * 1024 * 1024 / symbols:6.0f} B/symbol")
+    print(f"dicts    {as_dicts:7.1f} MB  {as_dicts * 1024 * 1024 / symbols:6.0f} B/symbol")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,76 @@
+'''
+Purpose: Measure context retrieval latency against repo size.
+
+Fills a temporary symbol index with synthetic analysis results for projects of
+increasing size, then times a full index build, an incremental update of one
+changed file, and BM25 queries.
+
+Usage: python benchmarks/bench_retrieval.py [sizes...]
+'''
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.symbol_index import SymbolIndex
+
+WORDS = (
+    "user account password reset email token session cache invoice payment order "
+    "report export import parser render template theme config logger queue worker "
+    "schedule retry limit search index summary history migrate schema validate"
+).split()
+QUERIES = ["add a password reset flow", "export invoices as csv", "retry failed queue workers", "dark theme toggle"]
+SYMBOLS_PER_FILE = 6
+
+
+def sentence(rng: random.Random, words: int = 8) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def fake_result(root: Path, i: int, rng: random.Random) -> dict:
+    symbols = [
+        {"name": f"func_{j}", "qualname": f"func_{j}", "kind": "function", "line": j * 10 + 1,
+         "end_line": j * 10 + 8, "docstring": sentence(rng)}
+        for j in range(SYMBOLS_PER_FILE)
+    ]
+    return {
+        "file": str(root / f"pkg_{i % 50}" / f"module_{i}.py"),
+        "docstring": sentence(rng, 12),
+        "summary": f"module_{i}.py defines:\n- Functions: " + ", ".join(s["name"] for s in symbols),
+        "symbols": symbols,
+        "imports": [],
+        "references": [],
+    }
+
+
+def main(sizes: list[int]):
+    rng = random.Random(0)
+    print(f"{'files':>7} {'build':>9} {'update 1':>9} {'query p50':>10} {'query max':>10}")
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            results = [fake_result(root, i, rng) for i in range(size)]
+            with SymbolIndex(root / "index.db") as index:
+                start = time.perf_counter()
+                index.update(results, root)
+                build = time.perf_counter() - start
+
+                results[0] = fake_result(root, 0, rng)
+                start = time.perf_counter()
+                index.update(results, root)
+                update = time.perf_counter() - start
+
+                timings = []
+                for query in QUERIES * 5:
+                    start = time.perf_counter()
+                    index.search(query, limit=32)
+                    timings.append(time.perf_counter() - start)
+        print(f"{size:>7} {build:>8.2f}s {update * 1000:>7.0f}ms {statistics.median(timings) * 1000:>8.1f}ms {max(timings) * 1000:>8.1f}ms")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1000, 5000, 20000])
@@ -0,0 +1,56 @@
+'''
+Purpose: Compare the transactional scaffold writer with writing files one by one.
+
+Scaffolds a synthetic plan of many files into a temp directory, once through
+append_docstring per file (the old path) and once through create_structure_from_dict,
+which plans, then writes and fsyncs temp files in parallel before renaming them.
+
+Usage: python benchmarks/bench_scaffold.py [files]
+'''
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core import file_writer
+
+
+def fake_structure(files: int) -> dict:
+    structure = {}
+    for i in range(files):
+        package = structure.setdefault(f"pkg_{i % 50}", {})
+        package.setdefault(f"sub_{i % 7}", {})[f"module_{i}.py"] = f"Module {i}: does step {i} of the plan."
+    return structure
+
+
+def write_one_by_one(structure: dict, base: Path):
+    for name, content in structure.items():
+        if isinstance(content, dict):
+            (base / name).mkdir(parents=True, exist_ok=True)
+            write_one_by_one(content, base / name)
+        else:
+            file_writer.append_docstring(base / name, content)
+
+
+def main(files: int):
+    structure = fake_structure(files)
+    with tempfile.TemporaryDirectory() as tmp, patch.object(file_writer.console, "print"):
+        start = time.perf_counter()
+        write_one_by_one(structure, Path(tmp) / "serial")
+        serial = time.perf_counter() - start
+
+        start = time.perf_counter()
+        file_writer.create_structure_from_dict(structure, base_path=Path(tmp) / "plan")
+        planned = time.perf_counter() - start
+
+        plan = file_writer.plan_structure(structure, base_path=Path(tmp) / "plan")
+    print(f"{files} files, {file_writer.WRITE_WORKERS} workers")
+    print(f"one by one     {serial:7.2f}s")
+    print(f"transactional  {planned:7.2f}s   (re-plan finds {len(plan.writes)} changes)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,60 @@
+'''
+Purpose: Measure CLI startup time and what gets imported.
+
+Runs each command in a fresh interpreter with `python -X importtime` and
+reports the wall time, the total import time and the slowest top-level imports.
+tests/test_startup_unit.py runs the same measurement as part of the test suite.
+
+Usage: python benchmarks/bench_startup.py [runs]
+'''
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+COMMANDS = [
+    ["main.py", "--help"],
+    ["main.py", "analyze", "status"],
+    ["main.py", "session", "list"],
+    ["-c", "import core.agent"],
+]
+
+
+def import_times(args: list[str]) -> dict[str, int]:
+    '''
+    Cumulative import time in microseconds of each module `python args` imports.
+    '''
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name[1:].rstrip()] = int(cumulative)  # Indentation marks nesting; top-level names have none
+    return times
+
+
+def total_import_ms(times: dict[str, int]) -> float:
+    return sum(us for name, us in times.items() if not name.startswith(" ")) / 1000
+
+
+def main(runs: int):
+    for args in COMMANDS:
+        walls = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, *args], cwd=ROOT, capture_output=True, check=True)
+            walls.append(time.perf_counter() - start)
+        times = import_times(args)
+        top = sorted(((us, name) for name, us in times.items() if not name.startswith(" ")), reverse=True)[:4]
+        print(f"{' '.join(args):28} wall {statistics.median(walls) * 1000:6.0f} ms   imports {total_import_ms(times):6.0f} ms")
+        print("    " + ", ".join(f"{name} {us / 1000:.0f}" for us, name in top))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
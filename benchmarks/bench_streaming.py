@@ -0,0 +1,59 @@
+'''
+Purpose: Measure time-to-first-render of the streamed plan against the fake server.
+
+Runs the same plan prompt through send_prompt twice: once waiting for the whole
+reply, and once streaming it with on_entry, where the first TODO goal can be
+rendered as soon as it has arrived.
+
+Usage: python benchmarks/bench_streaming.py [chunk_delay_seconds]
+'''
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core import agent
+from core.clients import ClientManager
+from core.jsonl_log import JsonlLog
+from benchmarks.fake_openai_server import start_server
+
+PLAN = {
+    "todo": {f"module_{i}.py": [f"Task {j} for module {i}" for j in range(4)] for i in range(10)},
+    "structure": {"project": {f"module_{i}.py": f"Docstring for module {i}" for i in range(10)}},
+}
+
+
+async def run(base_url: str) -> tuple[float, dict]:
+    agent.client_manager = ClientManager(api_key="fake", base_url=base_url)
+    try:
+        start = time.perf_counter()
+        await agent.send_prompt("plan", use_cache=False)
+        blocking = time.perf_counter() - start
+
+        await agent.send_prompt("plan", use_cache=False, on_entry=lambda path, value: None)
+        return blocking, dict(agent.stream_metrics)
+    finally:
+        await agent.close_clients()
+
+
+def main(chunk_delay: float):
+    server, base_url = start_server(json.dumps(PLAN, indent=2), chunk_delay=chunk_delay)
+    with tempfile.TemporaryDirectory() as tmp:
+        agent.session_log = JsonlLog(Path(tmp) / "session.jsonl")
+        try:
+            blocking, metrics = asyncio.run(run(base_url))
+        finally:
+            server.shutdown()
+
+    print(f"blocking send_prompt, time to first render: {blocking * 1000:.0f} ms")
+    print(f"streamed send_prompt, time to first token:  {metrics['time_to_first_token'] * 1000:.0f} ms")
+    print(f"streamed send_prompt, time to first render: {metrics['time_to_first_render'] * 1000:.0f} ms")
+    print(f"streamed send_prompt, total time:           {metrics['total_time'] * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 0.01)
@@ -0,0 +1,85 @@
+'''
+Purpose: Measure round trips per successful structured reply.
+
+Feeds send_prompt a fixed mix of plan replies with the defects seen in practice
+(trailing commas, bare keys, cut-off replies, a wrong or missing section) and
+counts requests. Before schema validation, any defect failed the whole build, so
+each defective reply cost at least one full re-run of the request; that lower
+bound is printed for comparison.
+
+Usage: python benchmarks/bench_structured.py
+'''
+import asyncio
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core import agent
+from core.jsonl_log import JsonlLog
+from core.prompts.prompt_loader import load_schema
+
+PLAN = {
+    "todo": {"main.py": ["Set up CLI", "Parse arguments"], "db.py": ["Create schema"]},
+    "structure": {"app": {"main.py": "Entry point", "db.py": "Database helpers"}},
+}
+VALID = json.dumps(PLAN, indent=2)
+REPLIES = [
+    VALID,
+    VALID,
+    VALID,
+    VALID.replace('"todo"', "todo"),                          # Bare key, as in the old prompt example
+    VALID.replace('"Create schema"', '"Create schema",'),     # Trailing comma
+    VALID[:-40],                                              # Cut off mid-reply
+    "```json\n" + VALID + "\n```",                            # Markdown fence
+    json.dumps({"todo": PLAN["todo"], "structure": "app/"}),  # Wrong type for one section
+    json.dumps({"todo": PLAN["todo"]}),                       # Missing section
+    "I could not produce a plan.",                            # No JSON at all
+]
+
+
+class ScriptedBackend:
+    '''
+    Answers the first request with a scripted reply and every re-ask with a valid plan.
+    '''
+    mode = "replay"
+    cacheable = False
+
+    def __init__(self, first: str):
+        self.first = first
+        self.calls = 0
+
+    async def complete(self, messages, model, temperature, estimated_tokens=0, response_format=None):
+        self.calls += 1
+        return self.first if self.calls == 1 else VALID
+
+
+async def run() -> tuple[int, int]:
+    schema = load_schema("plan_project")
+    calls = successes = 0
+    for first in REPLIES:
+        agent.backend = ScriptedBackend(first)
+        result = await agent.send_prompt("plan", use_cache=False, schema=schema)
+        calls += agent.backend.calls
+        successes += bool(result)
+    return calls, successes
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        agent.session_log = JsonlLog(Path(tmp) / "session.jsonl")
+        agent.console.quiet = True
+        calls, successes = asyncio.run(run())
+
+    defective = sum(1 for reply in REPLIES if reply != VALID)
+    before = len(REPLIES) + defective
+    print(f"{len(REPLIES)} replies, {defective} defective")
+    print(f"before, full re-run per defect (lower bound): {before / len(REPLIES):.2f} round trips/success")
+    print(f"after, local repair + targeted re-ask:       {calls / successes:.2f} round trips/success")
+    print(f"repaired locally: {agent.structured_stats['repaired']}, re-asks: {agent.structured_stats['reasks']}, failed: {agent.structured_stats['failed']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+'''
+Purpose: Compare the JSONL summaries store with the old whole-file YAML.
+
+Analyzes synthetic modules and writes their summaries both ways, then measures the time
+and peak Python memory to load everything, and to read a single file's summary.
+
+Usage: python benchmarks/bench_summaries.py [files]
+'''
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import yaml
+from core.project_analyzer import analyze_source
+from core.summary_store import SummaryStore, YamlDumper
+
+YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def fake_source(i: int) -> str:
+    functions = "".join(
+        f"def func_{j}(path: str, retries: int = 3) -> dict:\n"
+        f"    \"\"\"Does step {j} of module {i}.\"\"\"\n"
+        f"    return load(path, retries)\n\n"
+        for j in range(8)
+    )
+    return (
+        f'"""Module {i}."""\nimport json\nfrom pkg_{i % 100} import load\n\n'
+        f'class Model{i}(Base):\n    """A model."""\n\n    def save(self):\n        json.dump(self, open("x"))\n\n'
+        + functions
+    )
+
+
+def fake_summary(i: int) -> dict:
+    '''
+    A summary as analyze_project produces it, in the plain JSON form that both
+    the store and the old YAML file hold.
+    '''
+    result = analyze_source(Path(f"pkg_{i % 100}/module_{i}.py"), fake_source(i))
+    return json.loads(json.dumps(result))
+
+
+def measure(action) -> tuple[float, float]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    action()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1024 / 1024
+
+
+def main(files: int):
+    summaries = [fake_summary(i) for i in range(files)]
+    target = summaries[files // 2]["file"]
+    with tempfile.TemporaryDirectory() as tmp:
+        yaml_path = Path(tmp) / "summaries.yml"
+        store = SummaryStore(Path(tmp) / "summaries.jsonl")
+
+        write_yaml, _ = measure(lambda: yaml_path.write_text(yaml.dump(summaries, Dumper=YamlDumper)))
+        write_store, _ = measure(lambda: store.write(iter(summaries)))
+        load_yaml = measure(lambda: yaml.load(yaml_path.read_text(), Loader=YamlLoader))
+        load_store = measure(lambda: list(SummaryStore(store.path)))
+        one_yaml = measure(lambda: next(s for s in yaml.load(yaml_path.read_text(), Loader=YamlLoader) if s["file"] == target))
+        one_store = measure(lambda: SummaryStore(store.path).get(target))
+
+    print(f"{files} files")
+    print(f"write       yaml {write_yaml:7.2f}s            jsonl {write_store:7.2f}s")
+    print(f"load all    yaml {load_yaml[0]:7.2f}s {load_yaml[1]:7.1f} MB   jsonl {load_store[0]:7.2f}s {load_store[1]:7.1f} MB")
+    print(f"read one    yaml {one_yaml[0]:7.2f}s {one_yaml[1]:7.1f} MB   jsonl {one_store[0]:7.3f}s {one_store[1]:7.1f} MB")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,68 @@
+'''
+Purpose: Compare single-item updates in the SQLite TODO store with the old todo.yml.
+
+Fills both with many tasks, then times updating one task's status (plus re-rendering
+TODO.md for the store) against loading, scanning and rewriting the YAML list.
+
+Usage: python benchmarks/bench_todos.py [tasks]
+'''
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import yaml
+from core.todo_store import TodoStore
+
+UPDATES = 50
+YAML_UPDATES = 5  # Each one takes seconds at 10k tasks
+
+
+def yaml_update(path: Path, task: str, status: str):
+    with open(path) as f:
+        todos = yaml.safe_load(f) or []
+    for todo in todos:
+        if todo["task"] == task:
+            todo["status"] = status
+    with open(path, "w") as f:
+        yaml.safe_dump(todos, f)
+
+
+def timed(action, runs: int = UPDATES) -> float:
+    start = time.perf_counter()
+    for i in range(runs):
+        action(i)
+    return (time.perf_counter() - start) / runs * 1000
+
+
+def main(tasks: int):
+    todos = [{"category": f"Goal {i % 50}", "task": f"Task {i}", "status": "pending"} for i in range(tasks)]
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        yaml_path = tmp / "todo.yml"
+        yaml_path.write_text(yaml.safe_dump(todos))
+        with TodoStore(tmp / "todo.db") as store:
+            store.import_list(todos)
+            store.render(tmp / "TODO.md")
+            ids = [todo["id"] for todo in store.items()]
+
+            old = timed(lambda i: yaml_update(yaml_path, f"Task {i * 97 % tasks}", "done"), YAML_UPDATES)
+            by_id = timed(lambda i: store.set_status(ids[i * 97 % tasks], "done"))
+            by_task = timed(lambda i: store.set_status_by_task(f"Task {i * 89 % tasks}", "done"))
+            rendered = timed(lambda i: (store.set_status(ids[i * 83 % tasks], "done"), store.render(tmp / "TODO.md")))
+            bulk_start = time.perf_counter()
+            store.set_status(ids, "in progress")
+            bulk = (time.perf_counter() - bulk_start) * 1000
+
+    print(f"{tasks} tasks, mean time of one update")
+    print(f"todo.yml round trip      {old:8.2f} ms")
+    print(f"store by id              {by_id:8.2f} ms")
+    print(f"store by task            {by_task:8.2f} ms")
+    print(f"store + render TODO.md   {rendered:8.2f} ms")
+    print(f"bulk update of all tasks {bulk:8.2f} ms (one transaction)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
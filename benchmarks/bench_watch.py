@@ -0,0 +1,72 @@
+'''
+Purpose: Compare getting the project analysis from a warm daemon with analyzing again.
+
+Builds a synthetic project, then times a cold analyze_project, a run that hits
+the analysis cache, a daemon refresh after one file is edited, a client
+fetching the warm analysis over the socket, and build_index (what `add feature`
+runs first) with and without a daemon keeping the index current.
+
+Usage: python benchmarks/bench_watch.py [files]
+'''
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core import analysis_daemon, project_analyzer
+from core.analysis_daemon import AnalysisDaemon, fetch_results
+from core.project_analyzer import analyze_project
+from core.symbol_index import build_index, open_index
+from bench_analyze import make_project
+
+
+def timed(action) -> float:
+    start = time.perf_counter()
+    action()
+    return time.perf_counter() - start
+
+
+def main(files: int):
+    project_analyzer.console.quiet = True
+    analysis_daemon.console.quiet = True
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        make_project(root, files)
+
+        cold = timed(lambda: analyze_project(root, use_cache=False))
+        analyze_project(root)
+        cached = timed(lambda: analyze_project(root))
+
+        build_index(root)
+        index_cached = timed(lambda: build_index(root))
+
+        def update_index(results):
+            with open_index(root) as index:
+                index.update(results, root)
+
+        daemon = AnalysisDaemon(root, on_refresh=update_index)
+        daemon.refresh()
+        server = daemon.serve()
+        try:
+            edited = next(iter(daemon.results))
+            (root / edited).write_text((root / edited).read_text() + "\ndef extra():\n    pass\n")
+            refresh = timed(lambda: daemon.refresh({edited}))
+            fetch = timed(lambda: fetch_results(root))
+            index_daemon = timed(lambda: build_index(root))
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    print(f"{files} files")
+    print(f"analyze_project, no cache    {cold:8.3f}s")
+    print(f"analyze_project, warm cache  {cached:8.3f}s")
+    print(f"daemon refresh of one edit   {refresh:8.3f}s")
+    print(f"fetch from daemon            {fetch:8.3f}s")
+    print(f"build_index, warm cache      {index_cached:8.3f}s")
+    print(f"build_index, daemon running  {index_daemon:8.3f}s")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
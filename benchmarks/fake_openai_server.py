@@ -0,0 +1,107 @@
+'''
+Purpose: Local stand-in for the OpenAI chat completions API.
+
+Responsibilities:
+- Answer POST /v1/chat/completions with a canned JSON reply
+- Stream the reply as server-sent events when the request asks for stream=True
+- Keep HTTP/1.1 connections alive so client pooling can be measured offline
+
+Spec:
+- start_server(reply: str = DEFAULT_REPLY, port: int = 0, chunk_size: int = 16, chunk_delay: float = 0.0) -> (server, base_url)
+- python benchmarks/fake_openai_server.py [port]
+'''
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_REPLY = json.dumps({"name": "Benchmark", "stack": {"Language": ["Python"]}})
+
+
+def _completion(reply: str) -> dict:
+    return {
+        "id": "chatcmpl-fake",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": "fake",
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": reply},
+            "finish_reason": "stop",
+        }],
+        "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+    }
+
+
+def _chunk(piece: str) -> dict:
+    return {
+        "id": "chatcmpl-fake",
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": "fake",
+        "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}],
+    }
+
+
+def make_handler(reply: str, chunk_size: int = 16, chunk_delay: float = 0.0):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def _write_chunk(self, data: bytes):
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+
+        def _stream(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for start in range(0, len(reply), chunk_size):
+                # Delay every chunk to mimic the model generating tokens
+                time.sleep(chunk_delay)
+                event = json.dumps(_chunk(reply[start:start + chunk_size]))
+                self._write_chunk(f"data: {event}\n\n".encode("utf-8"))
+            self._write_chunk(b"data: [DONE]\n\n")
+            self.wfile.write(b"0\r\n\r\n")
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            if request.get("stream"):
+                self._stream()
+                return
+
+            # A non-streaming reply only arrives once the whole reply is generated
+            time.sleep(chunk_delay * -(-len(reply) // chunk_size))
+            body = json.dumps(_completion(reply)).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def start_server(reply: str = DEFAULT_REPLY, port: int = 0, chunk_size: int = 16, chunk_delay: float = 0.0):
+    '''
+    Start the fake server on a background thread and return it with its base URL.
+    chunk_delay is the time taken to "generate" each chunk_size characters.
+    '''
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(reply, chunk_size, chunk_delay))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+if __name__ == "__main__":
+    server, base_url = start_server(port=int(sys.argv[1]) if len(sys.argv) > 1 else 8765)
+    print(f"Fake OpenAI API listening on {base_url} (set OPENAI_BASE_URL to use it)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
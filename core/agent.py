@@ -9,22 +9,160 @@ Responsibilities:
 Spec:
 - run_prompt(prompt: str, context: dict) -> str
 - load_prompt_template(name: str) -> str
+- stream_prompt(prompt: str) -> AsyncIterator[str]
+- use_session(command: str)  # <project>/.coductor/sessions/<command>.jsonl
 '''
+import asyncio
 import os
-from dotenv import load_dotenv
-from openai import AsyncOpenAI
+import time
+from contextlib import aclosing
+from typing import AsyncIterator, Awaitable, Callable
 from pathlib import Path
-import tiktoken
 import json
 from rich.console import Console
+from core.cache import ResponseCache
+from core.clients import ClientManager
+from core.tokens import count_tokens, count_chat_tokens, count_message_tokens, annotate_token_counts, api_messages
+from core.budget import compact_history, get_budget, prompt_budget, SUMMARY_PREFIX
+from core.jsonl_log import JsonlLog
+from core.json_stream import IncrementalJSONParser
+from core.scheduler import RequestScheduler
+from core.backends import make_backend
+from core.structured import SchemaError, StructuredOutputError, validate, parse_json, failed_keys, reask_prompt, merge
 
-load_dotenv()
 API_KEY = os.getenv("OPENAI_API_KEY")
 PROMPTS_DIR = Path(__file__).parent / "prompts"
 DEFAULT_MODEL = "gpt-4o-mini"
-MAX_TOKENS = 128000  # adjust depending on the model
-SESSION_HISTORY_FILE = Path(__file__).parent.parent / ".coductor" / "session.json"
+DEFAULT_TEMPERATURE = 0.7
+SESSION_HISTORY_FILE = Path(__file__).parent.parent / ".coductor" / "session.jsonl"
+LEGACY_SESSION_FILE = Path(__file__).parent.parent / ".coductor" / "session.json"
+CACHE_DIR = Path(__file__).parent.parent / ".coductor" / "cache"
+CASSETTE_FILE = Path(os.getenv("CODUCTOR_CASSETTE", Path(__file__).parent.parent / ".coductor" / "cassettes" / "default.json"))
+BACKEND_MODE = os.getenv("CODUCTOR_BACKEND", "live")  # live, record or replay
+PROJECT_MARKERS = (".coductor", ".git")
+PREAMBLE_FILE_NAME = "preamble.md"  # Optional shared system prompt in <project>/.coductor/
+JSON_RESPONSE_FORMAT = {"type": "json_object"}
+MAX_REASKS = 2  # Follow-up requests for the invalid parts of a reply
+HISTORY_CHUNK = 64  # Messages read back from the end of the log at first, doubled until the budget is filled
+USE_CACHE = True
+SESSION_NAME = None       # Active project session, None for the global history
+SESSION_OVERRIDE = None   # Set by --session to share one thread across commands
 console = Console()
+response_cache = ResponseCache(CACHE_DIR)
+client_manager = ClientManager(api_key=API_KEY)
+session_log = JsonlLog(SESSION_HISTORY_FILE)
+scheduler = RequestScheduler()
+backend = make_backend(BACKEND_MODE, CASSETTE_FILE, client_manager, scheduler)
+stream_metrics = {}  # Timings of the last streamed prompt, in seconds
+structured_stats = {"replies": 0, "repaired": 0, "reasks": 0, "failed": 0}
+
+
+def set_cache_enabled(enabled: bool):
+    '''
+    Enable or disable the LLM response cache for this process (e.g. --no-cache).
+    '''
+    global USE_CACHE
+    USE_CACHE = enabled
+
+
+def set_backend(mode: str, cassette: Path | None = None):
+    '''
+    Switch between the live API, recording to a cassette and replaying one.
+    '''
+    global backend
+    backend = make_backend(mode, Path(cassette) if cassette else CASSETTE_FILE, client_manager, scheduler)
+
+
+def find_project_root(start: Path | None = None) -> Path:
+    '''
+    Return the nearest directory containing .coductor or .git, else the start directory.
+    '''
+    start = Path(start or Path.cwd()).resolve()
+    for directory in [start, *start.parents]:
+        if any((directory / marker).exists() for marker in PROJECT_MARKERS):
+            return directory
+    return start
+
+
+def session_path(name: str, root: Path | None = None) -> Path:
+    '''
+    Path of a named session log inside a project.
+    '''
+    if not name or not all(c.isalnum() or c in "-_." for c in name) or name.startswith("."):
+        raise ValueError(f"Invalid session name '{name}'. Use letters, digits, '-', '_' or '.'.")
+    return find_project_root(root) / ".coductor" / "sessions" / f"{name}.jsonl"
+
+
+def set_session_override(name: str | None):
+    '''
+    Use one named session for every command in this process (e.g. --session).
+    '''
+    global SESSION_OVERRIDE
+    SESSION_OVERRIDE = name
+
+
+def open_session(name: str, root: Path | None = None):
+    '''
+    Make a named session of the project the active history.
+    '''
+    global session_log, SESSION_NAME
+    session_log = JsonlLog(session_path(name, root))
+    SESSION_NAME = name
+
+
+def use_session(command: str, root: Path | None = None):
+    '''
+    Scope history to the project and command, so prompts only carry the
+    relevant thread. --session overrides the command's own thread.
+    '''
+    open_session(SESSION_OVERRIDE or command, root)
+
+
+_preamble_cache = {}
+
+
+def load_preamble(root: Path | None = None) -> list[dict]:
+    '''
+    Return the shared system preamble of the project as messages, if it has one.
+    The preamble is sent with every prompt but never stored in a session.
+    '''
+    path = find_project_root(root) / ".coductor" / PREAMBLE_FILE_NAME
+    try:
+        mtime = path.stat().st_mtime
+    except OSError:
+        return []
+    cached = _preamble_cache.get(path)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, {"role": "system", "content": path.read_text(encoding="utf-8").strip()})
+        _preamble_cache[path] = cached
+    return [cached[1]] if cached[1]["content"] else []
+
+
+def _cache_enabled(use_cache: bool | None) -> bool:
+    if use_cache is None:
+        use_cache = USE_CACHE
+    # Record and replay have to see every request, so they bypass the cache
+    return use_cache and backend.cacheable
+
+
+async def close_clients():
+    '''
+    Close the pooled LLM clients. Call once the command is finished.
+    '''
+    await client_manager.aclose()
+
+
+def run(main):
+    '''
+    Run a command coroutine, closing the pooled clients when it finishes.
+    '''
+    async def _run():
+        try:
+            return await main
+        finally:
+            await close_clients()
+
+    return asyncio.run(_run())
 
 
 # def load_prompt(name: str, context:dict) -> str:
@@ -39,87 +177,334 @@ console = Console()
 #     return [{"role": "system", "content": system}, {"role": "user", "content": user}]
 
 
-def load_history() -> list[dict]:
+def migrate_legacy_history(model: str = DEFAULT_MODEL) -> int:
     '''
-    Load the conversation history from a file.
+    Import the old whole-file session.json into the JSONL session log.
+    Returns the number of messages imported.
     '''
-    if not SESSION_HISTORY_FILE.exists():
-        # Create the session history file if it doesn't exist
-        SESSION_HISTORY_FILE.parent.mkdir(parents=True, exist_ok=True)
-        with open(SESSION_HISTORY_FILE, "w") as file:
-            json.dump([], file)
-        return []
-    with open(SESSION_HISTORY_FILE, "r") as file:
-        return json.load(file)
+    # The old file held the global history, so it never goes into a project session
+    if SESSION_NAME is not None or not LEGACY_SESSION_FILE.exists() or session_log.exists():
+        return 0
+    with open(LEGACY_SESSION_FILE, "r") as file:
+        history = json.load(file)
+
+    try:
+        # Count the imported messages in one batch so later prompts never re-encode them
+        annotate_token_counts(history, model)
+    except Exception:
+        pass  # Counts are filled in on the next prompt instead
+    session_log.rewrite(history)
+    LEGACY_SESSION_FILE.rename(LEGACY_SESSION_FILE.with_suffix(".json.bak"))
+    return len(history)
+
+
+def load_history(limit: int | None = None) -> list[dict]:
+    '''
+    Load the conversation history, or only its last `limit` messages.
+    '''
+    migrate_legacy_history()
+    if limit is not None:
+        return session_log.tail(limit)
+    return session_log.read_all()
+
+
+def append_history(messages: list[dict]):
+    '''
+    Append new messages to the conversation history.
+    '''
+    session_log.append(messages)
 
 
 def save_history(session_history: list[dict]):
     '''
-    Save the conversation history.
+    Replace the whole conversation history, e.g. after compaction.
     '''
-    with open(SESSION_HISTORY_FILE, "w") as file:
-        json.dump(session_history, file, indent=4)
+    session_log.rewrite(session_history)
+
+
+def _save_turn(session_history: list[dict], content: str, model: str, rewrite: bool):
+    '''
+    Record the assistant reply, appending the new turn unless older turns changed.
+    '''
+    session_history.append({"role": "assistant", "content": content})
+    count_message_tokens(session_history[-1], model)
+    if rewrite:
+        save_history(session_history)
+    else:
+        append_history(session_history[-2:])
 
 
-async def send_prompt(prompt: str, model: str = DEFAULT_MODEL) -> dict:
+def _estimate_tokens(prompt_tokens: int, model: str) -> int:
+    '''
+    Tokens a request is expected to use, to pace tokens per minute.
+    '''
+    return prompt_tokens + get_budget(model)["response_tokens"]
+
+
+def _prompt_tokens(session_history: list[dict], model: str) -> int:
+    '''
+    Tokens of the prompt that is sent: the project preamble plus the history.
+    '''
+    return count_chat_tokens(load_preamble() + session_history, model)
+
+
+def _recent_history(model: str, reserved: int) -> tuple[list[dict], int]:
+    '''
+    The newest messages that fill the prompt budget, read back from the end
+    of the log by their stored token counts, so a long log is never parsed
+    whole. Reading stops once the messages overflow the budget, leaving
+    compaction to drop them; older ones would be dropped anyway.
+    Returns the messages and how many of them had no stored count yet.
+    '''
+    migrate_legacy_history(model)
+    total = len(session_log)
+    available = prompt_budget(model) - 3 - reserved  # Every reply has priming tokens
+    count = HISTORY_CHUNK
+    while True:
+        history = session_log.tail(count)
+        counted = annotate_token_counts(history, model)
+        if len(history) >= total or sum(count_message_tokens(message, model) for message in history) > available:
+            break
+        count *= 2
+
+    if len(history) < total and get_budget(model)["strategy"] == "summarize":
+        # Keep carrying an earlier summary forward, even though the turns after it are not read
+        first = session_log.read(0)
+        if first["content"].startswith(SUMMARY_PREFIX):
+            counted += annotate_token_counts([first], model)
+            history.insert(0, first)
+    return history, counted
+
+
+def _prepare_history(prompt: str, model: str) -> tuple[list[dict], list[dict], bool]:
+    '''
+    Load the history with the new prompt, fitted to the model's token budget.
+    Returns the history, the messages to send and whether the log must be rewritten.
+    '''
+    # The preamble counts towards the budget but is not part of the history
+    preamble = load_preamble()
+    message = {"role": "user", "content": prompt}
+    reserved = sum(count_message_tokens(entry, model) for entry in [*preamble, message])
+    session_history, counted = _recent_history(model, reserved)
+    session_history.append(message)
+
+    # Only messages without a stored token count are encoded. If any of
+    # them needed counting, rewrite the log to store it.
+    stale = counted > 0
+
+    # Check the token budget before dispatch, compacting old turns if needed
+    compacted = compact_history(preamble + session_history, model)[len(preamble):]
+    rewrite = stale or compacted != session_history
+    return compacted, api_messages(preamble + compacted), rewrite
+
+
+def _check_reply(content: str, schema: dict | None) -> tuple[object, list[SchemaError]]:
+    '''
+    Parse a reply, repairing it locally if needed, and validate it against the schema.
+    '''
+    try:
+        value, repaired = parse_json(content)
+    except ValueError as e:
+        return None, [SchemaError((), f"invalid JSON ({e})")]
+    if repaired:
+        structured_stats["repaired"] += 1
+    return value, validate(value, schema) if schema else []
+
+
+async def _structured_reply(prompt: str, content: str, model: str, schema: dict | None) -> tuple[dict, str]:
+    '''
+    Turn a reply into a value that matches the schema, re-asking only for the
+    keys that are still invalid after local repair. The re-ask carries just the
+    prompt and the bad reply, not the history, so it stays cheap.
+    Returns the value and its JSON. Raises StructuredOutputError if it cannot be fixed.
+    '''
+    structured_stats["replies"] += 1
+    value, errors = _check_reply(content, schema)
+    attempts = 0
+    while errors and attempts < MAX_REASKS:
+        attempts += 1
+        structured_stats["reasks"] += 1
+        keys = failed_keys(value, errors)
+        followup = [
+            {"role": "user", "content": prompt},
+            {"role": "assistant", "content": content},
+            {"role": "user", "content": reask_prompt(errors, schema, keys)},
+        ]
+        estimated_tokens = _estimate_tokens(count_chat_tokens(followup, model), model)
+        content = await backend.complete(api_messages(followup), model, DEFAULT_TEMPERATURE, estimated_tokens, JSON_RESPONSE_FORMAT)
+        patch, patch_errors = _check_reply(content, None)
+        if patch_errors:
+            errors = patch_errors
+            continue
+        value = merge(value, patch, keys)
+        errors = validate(value, schema) if schema else []
+
+    if errors:
+        structured_stats["failed"] += 1
+        raise StructuredOutputError(errors)
+    return value, json.dumps(value)
+
+
+async def send_prompt(
+    prompt: str,
+    model: str = DEFAULT_MODEL,
+    use_cache: bool | None = None,
+    on_entry: Callable[[tuple, object], None] | None = None,
+    schema: dict | None = None,
+) -> dict:
     """
     Send a prompt to the LLM and return the response.
+    Identical requests are served from the response cache unless it is disabled.
+    If on_entry is given the reply is streamed, and on_entry(path, value) is
+    called for every second-level JSON entry as soon as it has arrived.
+    The reply is requested in JSON mode; if it is malformed or does not match
+    schema it is repaired locally, and only the invalid keys are asked for again.
+    Raises StructuredOutputError if it still does not match after MAX_REASKS.
     """
-    # Get the current session history
-    session_history = load_history()
-    session_history.append({"role": "user", "content": prompt})
-    
+    if on_entry is not None:
+        return await _send_prompt_streaming(prompt, model, use_cache, on_entry, schema)
+    use_cache = _cache_enabled(use_cache)
+
     try:
-        client = AsyncOpenAI(api_key=API_KEY)
-        # Initialize the OpenAI client
-        response = await client.chat.completions.create(
-            model=model,
-            messages=session_history,
-            stream=False,
-            temperature=0.7,
-        )
-
-        # Check if the context is too large
-        prompt_tokens = count_chat_tokens(session_history, model=DEFAULT_MODEL)
-        expected_response_tokens = 2048  # Estimate based on desired response length
-
-        if prompt_tokens + expected_response_tokens > MAX_TOKENS:
-            raise ValueError("Prompt too long! Please shorten input or reduce memory.")
-
-        
-        # Can be added later for streaming ai output
-        # if stream:
-        #     for chunk in response:
-        #         if "choices" in chunk and chunk.choices[0].delta.get("content"):
-        #             yield chunk.choices[0].delta.content
-        
+        session_history, messages, rewrite = _prepare_history(prompt, model)
+
+        content = response_cache.get(model, DEFAULT_TEMPERATURE, messages) if use_cache else None
+        if content is not None:
+            console.print("[dim]Using cached response.[/dim]")
+            _save_turn(session_history, content, model, rewrite)
+            return json.loads(content)
+
+        estimated_tokens = _estimate_tokens(_prompt_tokens(session_history, model), model)
+        content = await backend.complete(messages, model, DEFAULT_TEMPERATURE, estimated_tokens, JSON_RESPONSE_FORMAT)
+        result, content = await _structured_reply(prompt, content, model, schema)
+
         # Save messages to session history and return the response
-        session_history.append({"role": "assistant", "content": response.choices[0].message.content})
-        save_history(session_history)
-        return json.loads(response.choices[0].message.content)
+        if use_cache:
+            # Only cache replies that passed, so a bad reply is not served forever
+            response_cache.put(model, DEFAULT_TEMPERATURE, messages, content)
+        _save_turn(session_history, content, model, rewrite)
+        return result
     
+    except StructuredOutputError:
+        raise  # The caller cannot go on without a valid reply, so it reports this itself
     except Exception as e:
         console.print(f"[bold red]Error:[/bold red] {e}")
         return {}
 
 
+async def stream_prompt(
+    prompt: str,
+    model: str = DEFAULT_MODEL,
+    use_cache: bool | None = None,
+    finalize: Callable[[str], Awaitable[str]] | None = None,
+    response_format: dict | None = None,
+) -> AsyncIterator[str]:
+    """
+    Send a prompt to the LLM and yield the reply text as it streams in.
+    Once the stream ends the reply is passed to finalize (if given), which may
+    check or fix it and returns the text to cache and save to the session
+    history. A cached reply is yielded whole.
+    """
+    use_cache = _cache_enabled(use_cache)
+
+    session_history, messages, rewrite = _prepare_history(prompt, model)
+
+    content = response_cache.get(model, DEFAULT_TEMPERATURE, messages) if use_cache else None
+    if content is not None:
+        console.print("[dim]Using cached response.[/dim]")
+        yield content
+    else:
+        estimated_tokens = _estimate_tokens(_prompt_tokens(session_history, model), model)
+        parts = []
+        # Closed with this generator, so an abandoned stream gives its scheduler slot back
+        async with aclosing(backend.stream(messages, model, DEFAULT_TEMPERATURE, estimated_tokens, response_format)) as pieces:
+            async for piece in pieces:
+                parts.append(piece)
+                yield piece
+        content = "".join(parts)
 
-def count_tokens(text: str, model: str = DEFAULT_MODEL) -> int:
-    encoding = tiktoken.encoding_for_model(model)
-    return len(encoding.encode(text))
+    if finalize is not None:
+        content = await finalize(content)
+    if use_cache:
+        response_cache.put(model, DEFAULT_TEMPERATURE, messages, content)
+    _save_turn(session_history, content, model, rewrite)
 
 
-def count_chat_tokens(messages: list[dict], model: str = DEFAULT_MODEL) -> int:
-    encoding = tiktoken.encoding_for_model(model)
-    tokens_per_message = 3  # system, user, assistant structure
-    tokens_per_name = 1     # if 'name' is used in the message
+async def _send_prompt_streaming(
+    prompt: str,
+    model: str,
+    use_cache: bool | None,
+    on_entry: Callable[[tuple, object], None],
+    schema: dict | None = None,
+) -> dict:
+    '''
+    Stream a JSON reply, rendering entries early, and record timing in stream_metrics.
+    Entries that are only fixed by a re-ask are not rendered.
+    '''
+    parser = IncrementalJSONParser()
+    start = time.perf_counter()
+    metrics = {"time_to_first_token": None, "time_to_first_render": None, "total_time": None}
+    reply = {}
+
+    async def finalize(content: str) -> str:
+        reply["value"], content = await _structured_reply(prompt, content, model, schema)
+        return content
+
+    try:
+        async for delta in stream_prompt(prompt, model, use_cache, finalize, JSON_RESPONSE_FORMAT):
+            if metrics["time_to_first_token"] is None:
+                metrics["time_to_first_token"] = time.perf_counter() - start
+            for path, value in parser.feed(delta):
+                if metrics["time_to_first_render"] is None:
+                    metrics["time_to_first_render"] = time.perf_counter() - start
+                on_entry(path, value)
+        return reply["value"]
 
-    num_tokens = 0
-    for message in messages:
-        num_tokens += tokens_per_message
-        for key, value in message.items():
-            num_tokens += len(encoding.encode(value))
-            if key == "name":
-                num_tokens += tokens_per_name
-    num_tokens += 3         # Every reply has priming tokens
-    return num_tokens
\ No newline at end of file
+    except StructuredOutputError:
+        raise
+    except Exception as e:
+        console.print(f"[bold red]Error:[/bold red] {e}")
+        return {}
+
+    finally:
+        metrics["total_time"] = time.perf_counter() - start
+        stream_metrics.update(metrics)
+
+
+async def _send_standalone(prompt: str, model: str, use_cache: bool, schema: dict | None) -> dict:
+    '''
+    Send one prompt on its own, without reading or writing the session history.
+    '''
+    messages = [{"role": "user", "content": prompt}]
+    try:
+        content = response_cache.get(model, DEFAULT_TEMPERATURE, messages) if use_cache else None
+        if content is not None:
+            return json.loads(content)
+
+        estimated_tokens = _estimate_tokens(count_tokens(prompt, model), model)
+        content = await backend.complete(messages, model, DEFAULT_TEMPERATURE, estimated_tokens, JSON_RESPONSE_FORMAT)
+        result, content = await _structured_reply(prompt, content, model, schema)
+        if use_cache:
+            response_cache.put(model, DEFAULT_TEMPERATURE, messages, content)
+        return result
+
+    except StructuredOutputError:
+        raise
+    except Exception as e:
+        console.print(f"[bold red]Error:[/bold red] {e}")
+        return {}
+
+
+async def send_many(
+    prompts: list[str],
+    model: str = DEFAULT_MODEL,
+    use_cache: bool | None = None,
+    schema: dict | None = None,
+) -> list[dict]:
+    """
+    Send independent prompts concurrently, e.g. one per file, and return the
+    responses in the same order. The scheduler keeps the requests within the
+    account's rate limits. These prompts do not use the session history.
+    """
+    use_cache = _cache_enabled(use_cache)
+    return await asyncio.gather(*(_send_standalone(prompt, model, use_cache, schema) for prompt in prompts))
@@ -0,0 +1,127 @@
+'''
+Purpose: Persistent cache of per-file analysis results.
+
+Responsibilities:
+- Store each file's analyze_file result under .coductor/
+- Key entries on path, mtime, size and content hash, so only changed files
+  are parsed again and a touched but unchanged file is not
+- Drop entries for files that no longer exist
+- Report cache hits and the analysis time they saved
+
+Spec:
+- AnalysisCache(path: Path)
+- AnalysisCache.lookup(key: str, filepath: Path) -> tuple[dict | None, bytes | None]
+- AnalysisCache.store(key: str, filepath: Path, sha256: str, result: dict, seconds: float)
+- AnalysisCache.prune(seen: set[str]) -> int
+- AnalysisCache.save()
+- AnalysisCache.report() -> dict
+'''
+import hashlib
+import json
+import os
+from pathlib import Path
+
+CACHE_VERSION = 3  # Bump when the shape of analyze_file results changes
+
+
+class AnalysisCache:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.removed = 0
+        self.saved_seconds = 0.0
+        self._dirty = False
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == CACHE_VERSION:
+                self.entries = data["files"]
+        except (OSError, ValueError, KeyError):
+            pass  # A missing or unreadable cache just means a full analysis
+
+    @staticmethod
+    def digest(source: bytes) -> str:
+        return hashlib.sha256(source).hexdigest()
+
+    def lookup(self, key: str, filepath: Path) -> tuple[dict | None, bytes | None]:
+        '''
+        Return the cached result for a file, or None on a miss.
+        A file without an entry is not read here; whoever analyzes it reads
+        and hashes it. Files whose mtime or size changed are read and hashed;
+        their bytes are returned so a miss does not have to read the file again.
+        '''
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None, None
+        stat = filepath.stat()
+        if entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            return self._hit(entry), None
+
+        source = filepath.read_bytes()
+        if entry["sha256"] == self.digest(source):
+            # Touched but unchanged, e.g. by a checkout: refresh the stat fields
+            entry["mtime_ns"], entry["size"] = stat.st_mtime_ns, stat.st_size
+            self._dirty = True
+            return self._hit(entry), source
+
+        self.misses += 1
+        return None, source
+
+    def _hit(self, entry: dict) -> dict:
+        self.hits += 1
+        self.saved_seconds += entry.get("seconds", 0.0)
+        return entry["result"]
+
+    def store(self, key: str, filepath: Path, sha256: str, result: dict, seconds: float):
+        '''
+        Record a fresh analysis result, the hash of the source it came from and
+        how long it took.
+        '''
+        stat = filepath.stat()
+        self.entries[key] = {
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha256": sha256,
+            "seconds": seconds,
+            "result": result,
+        }
+        self._dirty = True
+
+    def prune(self, seen: set[str]) -> int:
+        '''
+        Drop entries for files that were not seen in this run (deleted or excluded).
+        '''
+        stale = [key for key in self.entries if key not in seen]
+        for key in stale:
+            del self.entries[key]
+        self.removed += len(stale)
+        self._dirty = self._dirty or bool(stale)
+        return len(stale)
+
+    def save(self):
+        '''
+        Write the cache atomically if anything changed.
+        '''
+        if not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        # dumps() encodes in C; dump() to a file falls back to the pure Python encoder
+        data = json.dumps({"version": CACHE_VERSION, "files": self.entries}, separators=(",", ":"))
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
+    def report(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "removed": self.removed,
+            "hit_rate": self.hits / total if total else 0.0,
+            "saved_seconds": self.saved_seconds,
+        }
@@ -0,0 +1,259 @@
+'''
+Purpose: Keep a project's analysis warm in memory and serve it to other commands.
+
+Responsibilities:
+- Analyze the project once, then re-analyze only the files the watcher reports
+- Keep the on-disk analysis cache current, so runs without the daemon stay warm too
+- Serve the current results over a Unix socket under .coductor/ (or the
+  user's runtime directory for deep paths), and only trust sockets the
+  current user owns
+- Run an optional hook after each refresh, e.g. to keep the symbol index current
+- Let clients fall back to a normal analysis when no daemon is running
+
+Spec:
+- AnalysisDaemon(root: Path, extensions: tuple[str, ...], workers: int | None, on_refresh: Callable | None)
+- AnalysisDaemon.refresh(changed: set[str] | None) -> dict
+- AnalysisDaemon.serve() -> socketserver.BaseServer
+- AnalysisDaemon.watch(watcher, stop: threading.Event | None)
+- fetch_results(root: Path) -> list[dict] | None
+- daemon_status(root: Path) -> dict | None
+- socket_path(root: Path) -> Path
+- runtime_dir() -> Path
+'''
+import hashlib
+import json
+import os
+import socket
+import socketserver
+import stat
+import tempfile
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List
+from rich.console import Console
+from core.analysis_cache import AnalysisCache
+from core.project_analyzer import (
+    ANALYSIS_CACHE_FILE, ANALYZE_WORKERS, SOURCE_EXTENSIONS, _analyze_many, get_source_files,
+)
+
+console = Console()
+
+SOCKET_FILE = Path(".coductor") / "analyze.sock"  # Relative to the project root
+MAX_SOCKET_PATH = 100  # sun_path is 108 bytes on Linux, 104 on macOS
+DAEMON_TIMEOUT = float(os.getenv("CODUCTOR_DAEMON_TIMEOUT", "5.0"))
+
+
+def runtime_dir() -> Path:
+    '''
+    A directory only the current user can use, for sockets that do not fit
+    under the project: $XDG_RUNTIME_DIR, or else coductor-<uid> in the temp directory.
+    Raises RuntimeError if the latter exists but is not private to the user.
+    '''
+    runtime = os.getenv("XDG_RUNTIME_DIR")
+    if runtime and os.path.isdir(runtime):
+        return Path(runtime)
+    path = Path(tempfile.gettempdir()) / f"coductor-{os.getuid()}"
+    path.mkdir(mode=0o700, exist_ok=True)
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise RuntimeError(f"{path} is not a private directory of the current user")
+    return path
+
+
+def socket_path(root: Path) -> Path:
+    '''
+    The daemon's socket for a project. Deep project paths get a socket in the
+    user's runtime directory instead, named after the project, to fit the length limit.
+    '''
+    root = Path(root).resolve()
+    path = root / SOCKET_FILE
+    if len(os.fsencode(str(path))) > MAX_SOCKET_PATH:
+        digest = hashlib.sha1(os.fsencode(str(root))).hexdigest()[:16]
+        path = runtime_dir() / f"coductor-{digest}.sock"
+    return path
+
+
+def _owned_socket(path: Path) -> bool:
+    '''
+    Whether path is a socket of the current user. Anything else may be another
+    user's listener, whose replies must not reach prompts.
+    '''
+    try:
+        info = os.lstat(path)
+    except OSError:
+        return False
+    return stat.S_ISSOCK(info.st_mode) and info.st_uid == os.getuid()
+
+
+def _encode(reply: dict) -> bytes:
+    return json.dumps(reply, separators=(",", ":")).encode("utf-8")
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline())
+        except ValueError:
+            return
+        self.wfile.write(self.server.daemon.handle(request) + b"\n")
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class AnalysisDaemon:
+    '''
+    `on_refresh` is called with the full results after every refresh; the
+    status reply tells clients whether it has caught up.
+    '''
+    def __init__(
+        self,
+        root: Path,
+        extensions: tuple[str, ...] = SOURCE_EXTENSIONS,
+        workers: int | None = None,
+        on_refresh: Callable[[List[Dict]], None] | None = None,
+    ):
+        self.root = Path(root).resolve()
+        self.extensions = tuple(extensions)
+        self.workers = workers or ANALYZE_WORKERS
+        self.cache = AnalysisCache(self.root / ANALYSIS_CACHE_FILE)
+        self.results = {}  # Relative path -> analysis result, in discovery order
+        self._encoded = _encode({"results": {}})  # The results reply, encoded once per refresh
+        self.on_refresh = on_refresh
+        self.refreshes = 0
+        self.hooked = 0  # Refreshes that on_refresh has seen
+        self.lock = threading.Lock()
+
+    def refresh(self, changed: set[str] | None = None) -> dict:
+        '''
+        Bring the results up to date. `changed` holds paths relative to root;
+        None checks every file. The tree is only walked again when files may
+        have been added or removed.
+        '''
+        known = self.results
+        if changed is None or any(key not in known or not (self.root / key).is_file() for key in changed):
+            files = get_source_files(self.root, self.extensions)
+            keys = [file.relative_to(self.root).as_posix() for file in files]
+        else:
+            keys = list(known)
+            files = [self.root / key for key in keys]
+
+        fresh = {}
+        pending = []
+        for key, file in zip(keys, files):
+            if changed is not None and key in known and key not in changed:
+                continue
+            try:
+                result, source = self.cache.lookup(key, file)
+            except OSError:
+                result, source = None, None
+            if result is None:
+                pending.append((key, file, source))
+            else:
+                fresh[key] = {**result, "file": str(file)}  # Cached under whatever root it was analyzed from
+
+        outputs = _analyze_many([(file, source) for _, file, source in pending], self.workers)
+        for (key, file, _), (result, seconds, digest) in zip(pending, outputs):
+            if digest is not None:
+                self.cache.store(key, file, digest, result, seconds)
+            fresh[key] = result
+            if result.get("error"):
+                console.print(f"[yellow]Skipped {key}: {result['error']}[/yellow]")
+
+        results = {key: fresh.get(key, known.get(key)) for key in keys}
+        removed = len(known.keys() - results.keys())
+        self.cache.prune(set(keys))
+        self.cache.save()
+        encoded = _encode({"results": results})  # Here rather than on a client's request
+        with self.lock:
+            self.results = results
+            self._encoded = encoded
+            self.refreshes += 1
+            refreshes = self.refreshes
+        if self.on_refresh:
+            self.on_refresh(list(results.values()))
+            with self.lock:
+                self.hooked = refreshes
+        return {"analyzed": len(pending), "removed": removed, "files": len(results)}
+
+    def handle(self, request: dict) -> bytes:
+        '''
+        Answer one request with an encoded JSON reply.
+        '''
+        op = request.get("op") if isinstance(request, dict) else None
+        with self.lock:
+            if op == "results":
+                return self._encoded
+            if op == "status":
+                return _encode({
+                    "root": str(self.root),
+                    "pid": os.getpid(),
+                    "files": len(self.results),
+                    "refreshes": self.refreshes,
+                    "current": bool(self.on_refresh) and self.hooked == self.refreshes,
+                })
+        return _encode({"error": f"unknown op: {op}"})
+
+    def serve(self) -> socketserver.BaseServer:
+        '''
+        Start answering requests on the project's socket, in a background thread.
+        Raises RuntimeError if another daemon already serves this project.
+        '''
+        path = socket_path(self.root)
+        if path.exists():
+            if daemon_status(self.root) is not None:
+                raise RuntimeError(f"An analysis daemon is already running for {self.root}")
+            path.unlink()  # Left behind by a daemon that did not shut down cleanly
+        path.parent.mkdir(parents=True, exist_ok=True)
+        server = _Server(str(path), _Handler)
+        server.daemon = self
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+    def watch(self, watcher, stop: threading.Event | None = None):
+        '''
+        Apply the watcher's batches of changes until `stop` is set.
+        '''
+        while stop is None or not stop.is_set():
+            changed = watcher.changes(timeout=1.0)
+            if changed is None or changed:
+                counts = self.refresh(changed)
+                console.print(
+                    f"[dim]Re-analyzed {counts['analyzed']} files, {counts['removed']} removed, "
+                    f"{counts['files']} total[/dim]"
+                )
+
+
+def _request(root: Path, request: dict, timeout: float = DAEMON_TIMEOUT) -> dict | None:
+    try:
+        path = socket_path(root)
+    except (OSError, RuntimeError):
+        return None  # No private place for a socket, so no daemon to trust either
+    if not _owned_socket(path):
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(str(path))
+            sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+            with sock.makefile("rb") as reply:
+                return json.loads(reply.read())  # The daemon closes the connection after replying
+    except (OSError, ValueError):
+        return None  # No daemon listening, or it went away mid-reply
+
+
+def daemon_status(root: Path) -> dict | None:
+    return _request(root, {"op": "status"})
+
+
+def fetch_results(root: Path) -> List[Dict] | None:
+    '''
+    The warm analysis from a running daemon, in the same shape as
+    analyze_project(root), or None if no daemon is serving this project.
+    '''
+    reply = _request(root, {"op": "results"})
+    if not reply or "results" not in reply:
+        return None
+    root = Path(root)
+    return [{**result, "file": str(root / key)} for key, result in reply["results"].items()]
@@ -0,0 +1,179 @@
+'''
+Purpose: Pluggable backends that answer chat completions for the agent.
+
+Responsibilities:
+- Live: send requests to the OpenAI API through the pooled clients and scheduler
+- Record: send requests live and save each request/response pair to a cassette
+- Replay: answer from a cassette with no network access at all
+
+Spec:
+- Cassette(path: Path)
+- LiveBackend.complete(messages, model, temperature, prompt_tokens, response_format) -> str
+- LiveBackend.stream(messages, model, temperature, prompt_tokens, response_format) -> AsyncIterator[str]
+- make_backend(mode: str, cassette_path: Path, clients, scheduler) -> backend
+'''
+import json
+import os
+from contextlib import aclosing
+from pathlib import Path
+from typing import AsyncIterator
+from core.cache import ResponseCache
+
+BACKEND_MODES = ("live", "record", "replay")
+
+
+class CassetteMissError(LookupError):
+    '''
+    Raised in replay mode when the cassette has no response for a request.
+    '''
+
+
+class Cassette:
+    '''
+    JSON file of recorded request/response pairs, keyed like the response cache.
+    '''
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.interactions = []
+        self._by_key = {}
+        self._used = set()
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.interactions = json.load(f).get("interactions", [])
+        for i, interaction in enumerate(self.interactions):
+            self._by_key.setdefault(interaction["key"], i)
+
+    @staticmethod
+    def _last_user_message(messages: list[dict]) -> str | None:
+        for message in reversed(messages):
+            if message["role"] == "user":
+                return message["content"]
+        return None
+
+    def find(self, model: str, temperature: float, messages: list[dict]) -> str:
+        '''
+        Return the recorded response for a request.
+        An exact match is preferred; otherwise the next unused interaction with
+        the same final user prompt is served, so replay still works when the
+        history that preceded the prompt differs from the recording.
+        '''
+        index = self._by_key.get(ResponseCache.make_key(model, temperature, messages))
+        if index is None:
+            prompt = self._last_user_message(messages)
+            index = next(
+                (i for i, interaction in enumerate(self.interactions)
+                 if i not in self._used and interaction["model"] == model
+                 and self._last_user_message(interaction["messages"]) == prompt),
+                None,
+            )
+        if index is None:
+            raise CassetteMissError(f"No recorded response in {self.path} for this request.")
+        self._used.add(index)
+        return self.interactions[index]["response"]
+
+    def record(self, model: str, temperature: float, messages: list[dict], response: str):
+        '''
+        Add an interaction and save the cassette.
+        '''
+        key = ResponseCache.make_key(model, temperature, messages)
+        self._by_key.setdefault(key, len(self.interactions))
+        self.interactions.append({
+            "key": key,
+            "model": model,
+            "temperature": temperature,
+            "messages": messages,
+            "response": response,
+        })
+        self.save()
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            # Indented so recorded cassettes are readable in code review
+            json.dump({"interactions": self.interactions}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+class LiveBackend:
+    mode = "live"
+    cacheable = True
+
+    def __init__(self, clients, scheduler):
+        self.clients = clients
+        self.scheduler = scheduler
+
+    def _call(self, messages: list[dict], model: str, temperature: float, stream: bool, response_format: dict | None):
+        # Reuse the pooled client so the connection is kept alive across prompts
+        client = self.clients.get_client(model)
+        options = {"response_format": response_format} if response_format else {}
+        return lambda: client.chat.completions.create(
+            model=model,
+            messages=messages,
+            stream=stream,
+            temperature=temperature,
+            **options,
+        )
+
+    async def complete(self, messages: list[dict], model: str, temperature: float, estimated_tokens: int = 0, response_format: dict | None = None) -> str:
+        call = self._call(messages, model, temperature, False, response_format)
+        response = await self.scheduler.submit(call, estimated_tokens=estimated_tokens)
+        return response.choices[0].message.content
+
+    async def stream(self, messages: list[dict], model: str, temperature: float, estimated_tokens: int = 0, response_format: dict | None = None) -> AsyncIterator[str]:
+        call = self._call(messages, model, temperature, True, response_format)
+        # The request holds its scheduler slot until the stream is read to the end or closed
+        async with aclosing(self.scheduler.stream(call, estimated_tokens=estimated_tokens)) as chunks:
+            async for chunk in chunks:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+
+
+class RecordBackend:
+    mode = "record"
+    cacheable = False  # A cache hit would leave the request out of the cassette
+
+    def __init__(self, inner: LiveBackend, cassette: Cassette):
+        self.inner = inner
+        self.cassette = cassette
+
+    async def complete(self, messages: list[dict], model: str, temperature: float, estimated_tokens: int = 0, response_format: dict | None = None) -> str:
+        content = await self.inner.complete(messages, model, temperature, estimated_tokens, response_format)
+        self.cassette.record(model, temperature, messages, content)
+        return content
+
+    async def stream(self, messages: list[dict], model: str, temperature: float, estimated_tokens: int = 0, response_format: dict | None = None) -> AsyncIterator[str]:
+        parts = []
+        async with aclosing(self.inner.stream(messages, model, temperature, estimated_tokens, response_format)) as pieces:
+            async for piece in pieces:
+                parts.append(piece)
+                yield piece
+        self.cassette.record(model, temperature, messages, "".join(parts))
+
+
+class ReplayBackend:
+    mode = "replay"
+    cacheable = False
+
+    def __init__(self, cassette: Cassette):
+        self.cassette = cassette
+
+    async def complete(self, messages: list[dict], model: str, temperature: float, estimated_tokens: int = 0, response_format: dict | None = None) -> str:
+        return self.cassette.find(model, temperature, messages)
+
+    async def stream(self, messages: list[dict], model: str, temperature: float, estimated_tokens: int = 0, response_format: dict | None = None) -> AsyncIterator[str]:
+        yield self.cassette.find(model, temperature, messages)
+
+
+def make_backend(mode: str, cassette_path: Path, clients, scheduler):
+    '''
+    Build the backend for a mode: live, record or replay.
+    '''
+    if mode not in BACKEND_MODES:
+        raise ValueError(f"Unknown backend '{mode}'. Choose from {', '.join(BACKEND_MODES)}.")
+    live = LiveBackend(clients, scheduler)
+    if mode == "record":
+        return RecordBackend(live, Cassette(cassette_path))
+    if mode == "replay":
+        return ReplayBackend(Cassette(cassette_path))
+    return live
@@ -0,0 +1,123 @@
+'''
+Purpose: Pre-flight token budgeting and history compaction.
+
+Responsibilities:
+- Hold the context budget and compaction strategy for each model
+- Check a request fits its budget before it is sent
+- Compact chat history that is over budget by dropping or summarizing old turns
+
+Spec:
+- get_budget(model: str) -> dict
+- configure_budget(model: str, **settings)
+- compact_history(messages: list[dict], model: str) -> list[dict]
+'''
+from core.tokens import count_message_tokens
+
+MAX_TOKENS = 128000  # default context window, adjust per model below
+SUMMARY_PREFIX = "Summary of earlier conversation:"
+COMPACTION_STRATEGIES = ("drop_oldest", "summarize")
+
+# max_tokens: context window of the model
+# response_tokens: tokens reserved for the reply
+# summary_tokens: cap on the stored summary when strategy is "summarize"
+MODEL_BUDGETS = {
+    "default": {"max_tokens": MAX_TOKENS, "response_tokens": 2048, "strategy": "drop_oldest", "summary_tokens": 1024},
+    "gpt-4o-mini": {"max_tokens": 128000},
+    "gpt-4o": {"max_tokens": 128000},
+    "gpt-4-turbo": {"max_tokens": 128000},
+    "gpt-3.5-turbo": {"max_tokens": 16385},
+}
+
+
+def get_budget(model: str) -> dict:
+    '''
+    Return the budget for a model, filled in with the defaults.
+    '''
+    return {**MODEL_BUDGETS["default"], **MODEL_BUDGETS.get(model, {})}
+
+
+def configure_budget(model: str, **settings):
+    '''
+    Override the budget or compaction strategy for a model.
+    '''
+    strategy = settings.get("strategy")
+    if strategy is not None and strategy not in COMPACTION_STRATEGIES:
+        raise ValueError(f"Unknown compaction strategy '{strategy}'. Choose from {', '.join(COMPACTION_STRATEGIES)}.")
+    MODEL_BUDGETS.setdefault(model, {}).update(settings)
+
+
+def prompt_budget(model: str) -> int:
+    '''
+    Tokens available for the prompt once the reply is reserved.
+    '''
+    budget = get_budget(model)
+    return budget["max_tokens"] - budget["response_tokens"]
+
+
+def _summarize(messages: list[dict], max_tokens: int, model: str) -> dict:
+    '''
+    Build a summary message from dropped turns, keeping the newest lines that fit.
+    '''
+    lines = []
+    for message in messages:
+        if message["content"].startswith(SUMMARY_PREFIX):
+            # Carry an earlier summary forward instead of summarizing it again
+            lines.extend(message["content"][len(SUMMARY_PREFIX):].strip().splitlines())
+            continue
+        first_line = message["content"].strip().split("\n", 1)[0][:200]
+        lines.append(f"- {message['role']}: {first_line}")
+
+    summary = {"role": "system", "content": SUMMARY_PREFIX}
+    kept = []
+    for line in reversed(lines):
+        candidate = {"role": "system", "content": "\n".join([SUMMARY_PREFIX, line, *kept])}
+        if count_message_tokens(candidate, model) > max_tokens:
+            break
+        kept.insert(0, line)
+        summary = candidate
+    return summary
+
+
+def compact_history(messages: list[dict], model: str) -> list[dict]:
+    '''
+    Return the history trimmed to fit the model's prompt budget.
+    Leading system messages and the newest message are always kept; the oldest
+    turns are dropped, or folded into a summary message, until the rest fits.
+    Raises ValueError if the request cannot fit even after compaction.
+    '''
+    budget = get_budget(model)
+    available = prompt_budget(model) - 3  # Every reply has priming tokens
+
+    counts = [count_message_tokens(message, model) for message in messages]
+    if sum(counts) <= available:
+        return messages
+
+    # Split into the fixed system preamble and the conversation that can be compacted
+    start = 0
+    while start < len(messages) - 1 and messages[start]["role"] == "system" \
+            and not messages[start]["content"].startswith(SUMMARY_PREFIX):
+        start += 1
+    preamble, conversation, conversation_counts = messages[:start], messages[start:], counts[start:]
+
+    summarize = budget["strategy"] == "summarize"
+    reserve = budget["summary_tokens"] if summarize else 0
+    total = sum(counts[:start]) + sum(conversation_counts)
+
+    # Drop the oldest turns until the remainder and the summary reserve fit
+    cut = 0
+    while cut < len(conversation) - 1 and total + reserve > available:
+        total -= conversation_counts[cut]
+        cut += 1
+
+    dropped, kept = conversation[:cut], conversation[cut:]
+    compacted = preamble
+    if summarize and dropped:
+        summary_tokens = min(budget["summary_tokens"], max(available - total, 0))
+        summary = _summarize(dropped, summary_tokens, model)
+        total += count_message_tokens(summary, model)
+        compacted = compacted + [summary]
+    compacted = compacted + kept
+
+    if total > available:
+        raise ValueError("Prompt too long! Please shorten input or reduce memory.")
+    return compacted
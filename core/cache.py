@@ -0,0 +1,126 @@
+'''
+Purpose: Content-addressed on-disk cache for LLM responses.
+
+Responsibilities:
+- Key responses on model, temperature and the full message list
+- Persist entries under .coductor/cache/
+- Evict least recently used entries by total size and age
+- Track hit/miss counters
+
+Spec:
+- ResponseCache.get(model: str, temperature: float, messages: list[dict]) -> str | None
+- ResponseCache.put(model: str, temperature: float, messages: list[dict], content: str)
+- ResponseCache.stats() -> dict
+'''
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024  # 50 MB
+DEFAULT_MAX_AGE = 7 * 24 * 60 * 60    # one week, in seconds
+
+
+class ResponseCache:
+    def __init__(self, cache_dir: Path, max_bytes: int = DEFAULT_MAX_BYTES, max_age: float = DEFAULT_MAX_AGE):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(model: str, temperature: float, messages: list[dict]) -> str:
+        '''
+        Hash the request into a stable cache key.
+        '''
+        payload = json.dumps(
+            {"model": model, "temperature": temperature, "messages": messages},
+            sort_keys=True,
+            separators=(",", ":"),
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, model: str, temperature: float, messages: list[dict]) -> str | None:
+        '''
+        Return the cached response content, or None on a miss.
+        '''
+        path = self._entry_path(self.make_key(model, temperature, messages))
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        if time.time() - entry.get("created", 0) > self.max_age:
+            path.unlink(missing_ok=True)
+            self.misses += 1
+            return None
+
+        # Touch the entry so eviction sees it as recently used
+        os.utime(path)
+        self.hits += 1
+        return entry["content"]
+
+    def put(self, model: str, temperature: float, messages: list[dict], content: str):
+        '''
+        Store a response and evict old entries if the cache is over budget.
+        '''
+        path = self._entry_path(self.make_key(model, temperature, messages))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        entry = {"model": model, "temperature": temperature, "created": time.time(), "content": content}
+
+        # Write to a temp file first so a crash never leaves a half-written entry
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def evict(self):
+        '''
+        Remove expired entries, then least recently used ones until under max_bytes.
+        '''
+        if not self.cache_dir.exists():
+            return
+
+        now = time.time()
+        entries = []
+        total = 0
+        for path in self.cache_dir.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if now - stat.st_mtime > self.max_age:
+                path.unlink(missing_ok=True)
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def clear(self):
+        '''
+        Remove every cached response.
+        '''
+        for path in self.cache_dir.glob("*/*.json"):
+            path.unlink(missing_ok=True)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
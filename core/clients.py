@@ -0,0 +1,104 @@
+'''
+Purpose: Process-wide pool of OpenAI clients.
+
+Responsibilities:
+- Keep one AsyncOpenAI client per model/base URL instead of one per request
+- Share HTTP keep-alive connections with configurable pool limits
+- Close every client cleanly at shutdown, and the clients of an earlier
+  event loop when a new one starts
+
+Spec:
+- ClientManager.get_client(model: str, base_url: str | None = None) -> AsyncOpenAI
+- ClientManager.aclose()
+'''
+import asyncio
+import os
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+MAX_CONNECTIONS = int(os.getenv("CODUCTOR_MAX_CONNECTIONS", "20"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("CODUCTOR_MAX_KEEPALIVE_CONNECTIONS", "10"))
+KEEPALIVE_EXPIRY = float(os.getenv("CODUCTOR_KEEPALIVE_EXPIRY", "30"))
+REQUEST_TIMEOUT = float(os.getenv("CODUCTOR_REQUEST_TIMEOUT", "600"))
+
+
+class ClientManager:
+    def __init__(
+        self,
+        api_key: str | None = None,
+        base_url: str | None = None,
+        model_base_urls: dict[str, str] | None = None,
+        max_connections: int = MAX_CONNECTIONS,
+        max_keepalive_connections: int = MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: float = KEEPALIVE_EXPIRY,
+    ):
+        self.api_key = api_key
+        # OPENAI_BASE_URL lets a local stand-in server replace the real API
+        self.base_url = base_url or os.getenv("OPENAI_BASE_URL")
+        self.model_base_urls = model_base_urls or {}
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self._clients: dict[tuple[str, str | None], "AsyncOpenAI"] = {}
+        self._loop = None
+        self._closing: set[asyncio.Task] = set()  # Closes of clients from an earlier event loop
+
+    def get_client(self, model: str, base_url: str | None = None) -> "AsyncOpenAI":
+        '''
+        Return the pooled client for a model, creating it on first use.
+        openai and httpx are imported here rather than at startup, since cached
+        and replayed responses never need them.
+        '''
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Connections belong to the event loop that opened them, so clients
+            # left over from a previous asyncio.run() cannot be reused.
+            self._retire(loop)
+            self._loop = loop
+
+        base_url = base_url or self.model_base_urls.get(model) or self.base_url
+        key = (model, base_url)
+        if key not in self._clients:
+            import httpx
+            from openai import AsyncOpenAI
+            limits = httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive_connections,
+                keepalive_expiry=self.keepalive_expiry,
+            )
+            http_client = httpx.AsyncClient(limits=limits, timeout=REQUEST_TIMEOUT, follow_redirects=True)
+            # Retries are handled by the request scheduler, which also honors rate limits
+            self._clients[key] = AsyncOpenAI(api_key=self.api_key, base_url=base_url, http_client=http_client, max_retries=0)
+        return self._clients[key]
+
+    def _retire(self, loop: asyncio.AbstractEventLoop):
+        '''
+        Close the clients of an earlier event loop in the background on `loop`,
+        so their sockets are released instead of left for the garbage collector.
+        '''
+        for client in self._clients.values():
+            task = loop.create_task(self._close_quietly(client))
+            self._closing.add(task)
+            task.add_done_callback(self._closing.discard)
+        self._clients.clear()
+
+    @staticmethod
+    async def _close_quietly(client: "AsyncOpenAI"):
+        try:
+            await client.close()
+        except Exception:
+            pass  # Its event loop is gone, so the connections cannot be used anyway
+
+    async def aclose(self):
+        '''
+        Close every pooled client and its connections.
+        '''
+        clients = list(self._clients.values())
+        self._clients.clear()
+        self._loop = None
+        for client in clients:
+            await client.close()
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*[task for task in self._closing if task.get_loop() is loop])
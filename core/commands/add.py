@@ -3,6 +3,7 @@ Purpose: Adds a new feature across the project intelligently.
 
 Responsibilities:
 - Accept natural language feature request
+- Retrieve the project context relevant to the feature
 - Analyze structure and update/create files
 - Append tasks to TODO list
 
@@ -11,35 +12,49 @@ Spec:
 '''
 import typer
 from rich.console import Console
-from core.prompts.prompt_loader import load_prompt
-from core.agent import send_prompt
+from core.prompts.prompt_loader import load_prompt, load_schema
+from core.agent import send_prompt, run, use_session, find_project_root
+from core.retrieval import retrieve_context
 from pathlib import Path
 from core.file_writer import append_to_todo, create_structure_from_dict
+from core.structured import StructuredOutputError
 
 app = typer.Typer()
 console = Console()
 
-def ask_coductor_to_add_feature(feature: str) -> dict:
+async def ask_coductor_to_add_feature(feature: str) -> dict:
     '''
     Ask Coductor to add a feature to the project.
     '''
     # Load the prompt template for adding a feature
     template = load_prompt("add_feature")
-    prompt = template.render(feature=feature)
+
+    # Include only the files and symbols relevant to the feature, within a token budget
+    context = retrieve_context(feature, find_project_root())
+    prompt = template.render(feature=feature, context=context)
 
     # Send the prompt to Coductor and get the response
-    return send_prompt(prompt)
+    return await send_prompt(prompt, schema=load_schema("add_feature"))
 
 
-app.command("feature")
+@app.command("feature")
 def add_feature(feature: str):
     '''
     Add a new feature to the project.
     '''
+    use_session("add")
+    run(_add_feature(feature))
+
+
+async def _add_feature(feature: str):
     console.print(f"[bold green]Adding feature:[/bold green] {feature}")
 
     # Run the prompt to add the feature to the project
-    plan = ask_coductor_to_add_feature(feature)
+    try:
+        plan = await ask_coductor_to_add_feature(feature)
+    except StructuredOutputError as e:
+        console.print(f"[bold red]Coductor's reply was still invalid after asking again.[/bold red] {e}")
+        raise typer.Exit(1)
 
     # Update or create files as needed
     create_structure_from_dict(plan["structure"])
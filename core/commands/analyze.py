@@ -0,0 +1,86 @@
+'''
+Purpose: Analyzes the project, once or continuously.
+
+Responsibilities:
+- Analyze the project and save its file summaries
+- With --watch, keep the analysis and symbol index warm in a daemon that
+  re-analyzes touched files and serves the results to other commands over a
+  local socket
+
+Spec:
+@app.callback() - Ex: coductor analyze --watch
+@app.command("status") - Ex: coductor analyze status
+'''
+import signal
+import threading
+import typer
+from pathlib import Path
+from rich.console import Console
+from core.analysis_daemon import AnalysisDaemon, daemon_status
+from core.project_analyzer import iter_analysis, save_summaries, export_summaries_yaml, SUMMARIES_FILE, SUMMARIES_YAML_FILE
+from core.symbol_index import open_index
+from core.watcher import open_watcher
+
+app = typer.Typer()
+console = Console()
+
+
+@app.callback(invoke_without_command=True)
+def analyze(
+    ctx: typer.Context,
+    root: Path = typer.Option(Path("."), "--root", help="Project root to analyze."),
+    watch: bool = typer.Option(False, "--watch", help="Keep the analysis warm and serve it to other commands."),
+    poll: bool = typer.Option(False, "--poll", help="Poll for changes instead of using inotify."),
+):
+    '''
+    Analyze the project and save its file summaries.
+    '''
+    if ctx.invoked_subcommand:
+        return
+    if not watch:
+        # Summaries are written as the analysis produces them, not once it is all done
+        store = save_summaries(iter_analysis(root), root / SUMMARIES_FILE)
+        export_summaries_yaml(root / SUMMARIES_FILE, root / SUMMARIES_YAML_FILE)
+        console.print(f"[green]Analyzed {len(store)} files.[/green]")
+        return
+
+    def update_index(results: list[dict]):
+        with open_index(daemon.root) as index:
+            index.update(results, daemon.root)
+
+    daemon = AnalysisDaemon(root, on_refresh=update_index)
+    counts = daemon.refresh()
+    try:
+        server = daemon.serve()
+    except RuntimeError as e:
+        console.print(f"[red]{e}[/red]")
+        raise typer.Exit(1)
+    watcher = open_watcher(daemon.root, daemon.extensions, poll=poll)
+    console.print(
+        f"[green]Watching {counts['files']} files with {type(watcher).__name__}.[/green] "
+        "Other commands now use this analysis. Press Ctrl+C to stop."
+    )
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    try:
+        daemon.watch(watcher, stop)
+    except KeyboardInterrupt:
+        stop.set()
+    finally:
+        watcher.close()
+        server.shutdown()
+        server.server_close()
+        Path(server.server_address).unlink(missing_ok=True)
+        console.print("[dim]Stopped watching.[/dim]")
+
+
+@app.command("status")
+def status(root: Path = typer.Option(Path("."), "--root", help="Project root.")):
+    '''
+    Show whether an analysis daemon is serving this project.
+    '''
+    info = daemon_status(root)
+    if info is None:
+        console.print("[yellow]No analysis daemon is running for this project.[/yellow]")
+        return
+    console.print(f"[green]Daemon {info['pid']}[/green] is watching {info['files']} files in {info['root']} ({info['refreshes']} refreshes)")
@@ -13,13 +13,15 @@ Spec:
 
 Output: Project directory with scaffolding + summaries
 '''
-import asyncio
 import typer
+from pathlib import Path
 from rich.console import Console
 from rich.prompt import Prompt, Confirm
-from core.agent import send_prompt
+from core.agent import send_prompt, run, use_session
 from core.file_writer import safe_write_file, create_structure_from_dict
-from core.prompts.prompt_loader import load_prompt
+from core.prompts.prompt_loader import load_prompt, load_schema
+from core.structured import StructuredOutputError
+from core.todo_store import open_todos
 
 # Init typer app and rich console
 app = typer.Typer()
@@ -38,7 +40,7 @@ async def ask_coductor_for_name_and_stack(idea: str) -> dict[str, str]:
     '''
     template = load_prompt("generate_name_and_stack")
     prompt = template.render(idea=idea)
-    return await send_prompt(prompt)
+    return await send_prompt(prompt, schema=load_schema("generate_name_and_stack"))
 
 
 
@@ -55,27 +57,63 @@ def confirm_name_and_stack(name: str, stack: str) -> bool:
     return Confirm.ask("[bold cyan]\nDo you want to proceed with this name and stack?[/bold cyan]")
 
 
-async def ask_coductor_to_plan(idea: str, name: str, stack: str) -> dict:
+async def ask_coductor_to_plan(idea: str, name: str, stack: str, on_entry=None) -> dict:
     '''
     Ask Coductor to plan the project.
+    If on_entry is given, the plan is streamed and each entry passed to it as it arrives.
     '''
     template = load_prompt("plan_project")
     prompt = template.render(idea=idea, stack=stack, name=name)
-    return await send_prompt(prompt)
+    return await send_prompt(prompt, on_entry=on_entry, schema=load_schema("plan_project"))
 
 
-def confirm_plan(plan: dict) -> bool:
+class PlanRenderer:
+    '''
+    Render TODO goals and structure entries while the plan is still streaming.
+    '''
+    def __init__(self):
+        self.sections = set()
+        self.goals = 0
+        self.shown = {}  # Section -> {name: value} of the entries printed so far
+
+    def __call__(self, path: tuple, value):
+        section, name = path
+        self.shown.setdefault(section, {})[name] = value
+        if section == "todo":
+            if section not in self.sections:
+                console.print("\n[bold cyan]TODO:[/bold cyan]")
+            self.goals += 1
+            console.print(f"{self.goals}. {name}")
+            for task in value:
+                console.print(f"- [ ] {task}")
+        elif section == "structure":
+            if section not in self.sections:
+                console.print(f"\n[bold cyan]File Structure:[/bold cyan]")
+            console.print({name: value})
+        self.sections.add(section)
+
+    def shows(self, plan: dict) -> bool:
+        '''
+        Whether what was printed is the whole final plan. A reply that was
+        repaired or re-asked for after streaming may differ from it.
+        '''
+        return all(self.shown.get(section) == plan.get(section) for section in ("todo", "structure"))
+
+
+def confirm_plan(plan: dict, rendered: bool = False) -> bool:
     '''
     Confirm the plan with the user.
+    Pass rendered=True if the plan was already shown while it streamed in.
     '''
-    console.print("\n[bold cyan]TODO:[/bold cyan]")
-    for i, (goal, tasks) in enumerate(plan['todo'].items(), 1):
-        console.print(f"{i}. {goal}")
-        for task in tasks:
-            console.print(f"- [ ] {task}")
+    if not rendered:
+        console.print("\n[bold cyan]TODO:[/bold cyan]")
+        for i, (goal, tasks) in enumerate(plan['todo'].items(), 1):
+            console.print(f"{i}. {goal}")
+            for task in tasks:
+                console.print(f"- [ ] {task}")
 
-    console.print(f"\n[bold cyan]File Structure:[/bold cyan]")
-    console.print(plan['structure'])
+        console.print(f"\n[bold cyan]File Structure:[/bold cyan]")
+        console.print(plan['structure'])
 
     return Confirm.ask("\n[bold cyan]Do you want to proceed with this plan?[/bold cyan]")
 
@@ -102,17 +140,16 @@ def generate_readme(project_name: str, idea: str, tech_stack: str, project_root:
     safe_write_file(project_root + "README.md", readme_content)
 
 
-def generate_todo(todo_dict: dict, parent_path: str) -> str:
+def generate_todo(todo_dict: dict, parent_path: str) -> None:
     '''
-    Generate a TODO.md file based on the project name and plan.
+    Seed the new project's TODO store with the plan's goals and tasks, and
+    render TODO.md from it, so later features extend the same list.
     '''
-    todo_content = "# TODO"
-    for goal, tasks in todo_dict.items():
-        todo_content += f"\n\n## {goal}"
-        for task in tasks:
-            todo_content += f"\n- [ ] {task}"
-
-    safe_write_file(parent_path + "TODO.md", todo_content)
+    project_root = Path(parent_path)
+    with open_todos(project_root) as todos:
+        for goal, tasks in todo_dict.items():
+            todos.add(goal, tasks)
+        todos.render(project_root / "TODO.md")
 
 def print_title_message():
     title = """                             
@@ -136,7 +173,8 @@ with a README, TODO list, and docstrings to help you get started.
 
 @app.command("new")
 def build_new(parent_path: str = "./"):
-    asyncio.run(_build_new(parent_path))
+    use_session("build")
+    run(_build_new(parent_path))
 
 async def _build_new(parent_path: str):
     try:
@@ -153,11 +191,12 @@ async def _build_new(parent_path: str):
             console.print("[red]Aborted by user.[/red]")
             raise typer.Abort()
 
-        # Ask Coductor to plan the project
-        plan = await ask_coductor_to_plan(idea, name_stack["name"], name_stack["stack"])
+        # Ask Coductor to plan the project, showing entries as they stream in
+        renderer = PlanRenderer()
+        plan = await ask_coductor_to_plan(idea, name_stack["name"], name_stack["stack"], on_entry=renderer)
 
-        # Confirm the plan with the user
-        if not confirm_plan(plan):
+        # Confirm the plan with the user, showing it again if a repair or re-ask changed what streamed in
+        if not confirm_plan(plan, rendered=renderer.shows(plan)):
             console.print("[red]Aborted by user.[/red]")
             raise typer.Abort()
 
@@ -168,5 +207,8 @@ async def _build_new(parent_path: str):
         generate_todo(plan['todo'], md_file_path)
 
         console.print("[green]Project initialized successfully![/green]")
+    except StructuredOutputError as e:
+        console.print(f"[bold red]Coductor's reply was still invalid after asking again.[/bold red] {e}")
+        raise typer.Exit(1)
     except Exception as e:
         raise typer.Abort()
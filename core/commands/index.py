@@ -0,0 +1,82 @@
+'''
+Purpose: Builds and queries the project's symbol index.
+
+Responsibilities:
+- Index definitions, imports and call references from the project analysis
+- Answer "where is X defined", "who calls X" and "what is in module Y"
+
+Spec:
+@app.command("build") - Ex: coductor index build
+@app.command("defs") - Ex: coductor index defs send_prompt
+@app.command("callers") - Ex: coductor index callers send_prompt
+@app.command("module") - Ex: coductor index module core.agent
+@app.command("importers") - Ex: coductor index importers core.agent
+'''
+import typer
+from pathlib import Path
+from rich.console import Console
+from rich.table import Table
+from core.symbol_index import build_index, open_index
+
+app = typer.Typer()
+console = Console()
+
+
+def print_rows(title: str, rows: list[dict], columns: list[str]):
+    if not rows:
+        console.print(f"[yellow]No results for {title}.[/yellow]")
+        return
+    table = Table(title=title)
+    for column in columns:
+        table.add_column(column)
+    for row in rows:
+        table.add_row(*(str(row[column]) if row[column] is not None else "" for column in columns))
+    console.print(table)
+
+
+@app.command("build")
+def build(root: Path = typer.Argument(Path("."), help="Project root to index.")):
+    '''
+    Build or update the symbol index in .coductor/index.db.
+    '''
+    counts = build_index(root)
+    console.print(
+        f"[green]Index updated:[/green] {counts['updated']} files indexed, "
+        f"{counts['unchanged']} unchanged, {counts['removed']} removed"
+    )
+
+
+@app.command("defs")
+def definitions(name: str, root: Path = Path(".")):
+    '''
+    Show where a symbol is defined.
+    '''
+    with open_index(root) as index:
+        print_rows(f"definitions of {name}", index.definitions(name), ["path", "qualname", "kind", "line", "end_line"])
+
+
+@app.command("callers")
+def callers(name: str, root: Path = Path(".")):
+    '''
+    Show who calls or subclasses a symbol.
+    '''
+    with open_index(root) as index:
+        print_rows(f"callers of {name}", index.callers(name), ["path", "caller", "target", "kind", "line"])
+
+
+@app.command("module")
+def module(name: str, root: Path = Path(".")):
+    '''
+    Show what is defined in a module (dotted name or path).
+    '''
+    with open_index(root) as index:
+        print_rows(f"symbols in {name}", index.module_symbols(name), ["qualname", "kind", "line", "end_line"])
+
+
+@app.command("importers")
+def importers(name: str, root: Path = Path(".")):
+    '''
+    Show which files import a module.
+    '''
+    with open_index(root) as index:
+        print_rows(f"importers of {name}", index.imports_of(name), ["path", "module", "name", "line"])
@@ -0,0 +1,71 @@
+'''
+Purpose: Maintains the local conversation history.
+
+Responsibilities:
+- List the project's sessions (one per command, or named with --session)
+- Repair session logs after an interrupted write
+- Compact session logs, optionally trimming them to the model's token budget
+
+Spec:
+@app.command("list") - Ex: coductor session list
+@app.command("compact") - Ex: coductor session compact build --budget
+'''
+import typer
+from rich.console import Console
+from core import agent
+from core.agent import load_history, save_history, migrate_legacy_history, DEFAULT_MODEL
+from core.budget import compact_history
+from core.tokens import annotate_token_counts
+
+app = typer.Typer()
+console = Console()
+
+
+def project_sessions() -> list[str]:
+    '''
+    Names of the sessions stored in the current project.
+    '''
+    sessions_dir = agent.find_project_root() / ".coductor" / "sessions"
+    return sorted(path.stem for path in sessions_dir.glob("*.jsonl"))
+
+
+@app.command("list")
+def list_sessions():
+    '''
+    List the sessions of the current project.
+    '''
+    names = project_sessions()
+    if not names:
+        console.print("[yellow]No sessions in this project yet.[/yellow]")
+    for name in names:
+        agent.open_session(name)
+        console.print(f"{name}: {len(agent.session_log)} messages")
+
+
+@app.command("compact")
+def compact_session(
+    name: str = typer.Argument(None, help="Session to compact. Defaults to every session in the project, or --session."),
+    model: str = DEFAULT_MODEL,
+    budget: bool = typer.Option(False, "--budget", help="Also drop old turns that exceed the model's token budget."),
+):
+    '''
+    Rewrite session logs, dropping corrupt records and rebuilding their index.
+    '''
+    # The old session.json held the global history, so import it before a project session is opened
+    migrated = migrate_legacy_history(model)
+    if migrated:
+        console.print(f"[green]Imported {migrated} messages from the old session.json.[/green]")
+
+    name = name or agent.SESSION_OVERRIDE
+    for session_name in [name] if name else project_sessions():
+        agent.open_session(session_name)
+        before = len(agent.session_log)
+        dropped = agent.session_log.compact()
+
+        if budget:
+            history = load_history()
+            annotate_token_counts(history, model)
+            save_history(compact_history(history, model))
+
+        after = len(agent.session_log)
+        console.print(f"[green]Session {session_name} compacted:[/green] {before} -> {after} messages ({dropped} corrupt records dropped)")
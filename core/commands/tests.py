@@ -7,28 +7,56 @@ Produce pytest stubs or YAML test plans
 Place in tests/ directory
 
 Spec:
-@app.command("gen")
-- Options: --mode [stubs|specs|full]
+@app.command("gen") - Ex: coductor tests gen core/jsonl_log.py --symbol JsonlLog.append
+- Options: --symbol NAME, or --line-start/--line-end, --mode [stubs|specs|full]
 - Output: tests/test_<module>.py
 '''
 
 import typer
 from pathlib import Path
-from core.prompts.prompt_loader import load_prompt
+from core.prompts.prompt_loader import load_prompt, load_schema
 from rich.console import Console
-from core.agent import send_prompt
+from core.agent import send_prompt, run, use_session
+from core.project_analyzer import analyze_file, find_symbol
+from core.structured import StructuredOutputError
 
 app = typer.Typer()
 console = Console()
 
 @app.command("gen")
-def generate_tests(line_start: int, line_end: int, file_path: str, mode: str = "stubs"):
+def generate_tests(
+    file_path: str,
+    symbol: str = typer.Option(None, "--symbol", help="Function, class or method to test, e.g. JsonlLog.append."),
+    line_start: int = typer.Option(None, "--line-start", help="First line to test, if not using --symbol."),
+    line_end: int = typer.Option(None, "--line-end", help="Last line to test, if not using --symbol."),
+    mode: str = "stubs",
+):
     """
     Generate test stubs or specs based on project code.
 
     Args:
+        file_path (str): The file to test. Without --symbol or lines, the whole file.
+        symbol (str): Name or qualified name of the definition to test; its lines are found for you.
         mode (str): The mode of generation. Options are 'stubs', 'specs', or 'full'.
     """
+    use_session("tests")
+    run(_generate_tests(line_start, line_end, file_path, mode, symbol))
+
+
+def symbol_span(file_path: Path, symbol: str) -> tuple[int, int]:
+    '''
+    First and last line of a definition, decorators included.
+    '''
+    matches = find_symbol(analyze_file(file_path), symbol)
+    if not matches:
+        raise ValueError(f"No function, class or method named {symbol} in {file_path}.")
+    if len(matches) > 1:
+        names = ", ".join(f"{s.qualname} (line {s.line})" for s in matches)
+        raise ValueError(f"{symbol} is ambiguous in {file_path}: {names}. Use the qualified name.")
+    return matches[0].line, matches[0].end_line
+
+
+async def _generate_tests(line_start: int | None, line_end: int | None, file_path: str, mode: str, symbol: str | None = None):
     if mode not in ["stubs", "specs", "full"]:
         raise ValueError("Invalid mode. Choose from 'stubs', 'specs', or 'full'.")
 
@@ -36,20 +64,30 @@ def generate_tests(line_start: int, line_end: int, file_path: str, mode: str = "
     file_path = Path(file_path)
     if not file_path.exists():
         raise FileNotFoundError(f"File {file_path} does not exist.")
+    if symbol:
+        line_start, line_end = symbol_span(file_path, symbol)
     with open(file_path, "r") as f:
         file_content = f.readlines()
     # Extract the relevant lines
-    relevant_lines = file_content[line_start-1:line_end]
+    relevant_lines = file_content[(line_start or 1) - 1:line_end]
 
     # Load prompt
     template = load_prompt("generate_tests")
     prompt = template.render(
         mode=mode,
-        code="\n".join(relevant_lines)
+        code="".join(relevant_lines)
     )
 
     # Send the prompt to Coductor and get the response
-    response = send_prompt(prompt)
+    try:
+        response = await send_prompt(prompt, schema=load_schema("generate_tests"))
+    except StructuredOutputError as e:
+        console.print(f"[bold red]Coductor's reply was still invalid after asking again.[/bold red] {e}")
+        raise typer.Exit(1)
+    tests_code = response.get("tests")
+    if not tests_code:
+        console.print("[bold red]Coductor did not return any tests.[/bold red]")
+        return
 
     # Create the tests directory if it doesn't exist
     tests_dir = Path("tests")
@@ -59,10 +97,10 @@ def generate_tests(line_start: int, line_end: int, file_path: str, mode: str = "
     test_file_path = tests_dir / f"test_{file_path.stem}.py"
     if not test_file_path.exists():
         with open(test_file_path, "w") as f:
-            f.write(response)
+            f.write(tests_code)
         console.print(f"[bold green]Test file created:[/bold green] {test_file_path}")
     else:
         # Append to the existing test file
         with open(test_file_path, "a") as f:
-            f.write("\n" + response)
+            f.write("\n" + tests_code)
         console.print(f"[bold yellow]Test file already exists. Appended to:[/bold yellow] {test_file_path}")
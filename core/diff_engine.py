@@ -0,0 +1,244 @@
+'''
+Purpose: Diff file contents for write previews, quickly and within bounds.
+
+Responsibilities:
+- Tell identical contents apart by hash before any diff is built
+- Diff small files with difflib, and large ones with Myers over hashed lines,
+  which runs in linear time when the edits are few
+- Fall back to a one-line summary when the files are too large or too
+  different to diff usefully
+- Render unified diffs lazily, a page at a time
+- Let other diff algorithms be plugged in by name
+
+Spec:
+- same_content(old: str, new: str) -> bool
+- opcodes(a: list[str], b: list[str], algorithm: str | None) -> list[tuple] | None
+- unified_lines(old: str, new: str, path: str, context: int, algorithm: str | None) -> Iterator[str]
+- show_diff(old: str, new: str, path: str, console: Console, page_lines: int)
+- register_differ(name: str, differ: Callable)
+'''
+import hashlib
+import os
+from collections import Counter
+from difflib import SequenceMatcher
+from itertools import islice
+from typing import Callable, Iterator
+from rich.console import Console
+from rich.prompt import Confirm
+
+console = Console()
+
+DIFF_ALGORITHM = os.getenv("CODUCTOR_DIFF_ALGORITHM", "auto")          # auto, difflib, myers or a registered name
+SMALL_DIFF_LINES = 2000                                                # auto uses difflib up to this many lines
+MAX_DIFF_LINES = int(os.getenv("CODUCTOR_DIFF_MAX_LINES", "500000"))   # Larger files are only summarized
+MAX_EDIT_DISTANCE = int(os.getenv("CODUCTOR_DIFF_MAX_EDITS", "1000"))  # Myers gives up beyond this many changed lines
+PAGE_LINES = int(os.getenv("CODUCTOR_DIFF_PAGE_LINES", "200"))
+
+
+def _digest(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+def same_content(old: str, new: str) -> bool:
+    '''
+    Whether two contents match, ignoring leading and trailing whitespace.
+    Contents of different lengths are told apart without hashing.
+    '''
+    old, new = old.strip(), new.strip()
+    return len(old) == len(new) and _digest(old) == _digest(new)
+
+
+def difflib_opcodes(a: list[str], b: list[str]) -> list[tuple]:
+    return SequenceMatcher(None, a, b).get_opcodes()
+
+
+def _myers(a: list[int], b: list[int], max_edits: int) -> list[tuple[int, int, int]] | None:
+    '''
+    Matching runs (i, j, length) of a shortest edit script, or None if it
+    takes more than max_edits insertions and deletions.
+    '''
+    n, m = len(a), len(b)
+    offset = max_edits + 1
+    v = [0] * (2 * max_edits + 3)
+    trace = []  # v around the diagonals reachable at each step, before that step
+    for d in range(max_edits + 1):
+        trace.append(v[offset - d - 1:offset + d + 2])
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[offset + k - 1] < v[offset + k + 1]):
+                x = v[offset + k + 1]  # Down: insert from b
+            else:
+                x = v[offset + k - 1] + 1  # Right: delete from a
+            y = x - k
+            while x < n and y < m and a[x] == b[y]:
+                x += 1
+                y += 1
+            v[offset + k] = x
+            if x >= n and y >= m:
+                return _backtrack(trace, x, y, d)
+    return None
+
+
+def _backtrack(trace: list[list[int]], x: int, y: int, edits: int) -> list[tuple[int, int, int]]:
+    runs = []
+    for d in range(edits, 0, -1):
+        before = trace[d]  # Index k + d + 1 holds diagonal k
+        k = x - y
+        if k == -d or (k != d and before[k - 1 + d + 1] < before[k + 1 + d + 1]):
+            prev_k = k + 1
+            start_x = before[prev_k + d + 1]
+        else:
+            prev_k = k - 1
+            start_x = before[prev_k + d + 1] + 1
+        if x > start_x:
+            runs.append((start_x, start_x - k, x - start_x))
+        x = before[prev_k + d + 1]
+        y = x - prev_k
+    if x > 0:
+        runs.append((0, 0, x))
+    runs.reverse()
+    return runs
+
+
+def myers_opcodes(a: list[str], b: list[str], max_edits: int = MAX_EDIT_DISTANCE) -> list[tuple] | None:
+    '''
+    difflib-style opcodes from Myers' algorithm. Lines are hashed to ints once,
+    and a common prefix and suffix are matched before the search starts.
+    Returns None when more than max_edits lines differ.
+    '''
+    ids = {}
+    a = [ids.setdefault(line, len(ids)) for line in a]
+    b = [ids.setdefault(line, len(ids)) for line in b]
+    n, m = len(a), len(b)
+    if sum(((Counter(a) - Counter(b)) + (Counter(b) - Counter(a))).values()) > max_edits:
+        return None  # Lines that only one side has must each be an edit
+
+    prefix = 0
+    while prefix < n and prefix < m and a[prefix] == b[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < n - prefix and suffix < m - prefix and a[n - 1 - suffix] == b[m - 1 - suffix]:
+        suffix += 1
+    runs = _myers(a[prefix:n - suffix], b[prefix:m - suffix], max_edits)
+    if runs is None:
+        return None
+
+    blocks = [(0, 0, prefix)] + [(i + prefix, j + prefix, size) for i, j, size in runs]
+    blocks += [(n - suffix, m - suffix, suffix), (n, m, 0)]
+    codes = []
+    i = j = 0
+    for block_i, block_j, size in blocks:
+        if i < block_i and j < block_j:
+            codes.append(("replace", i, block_i, j, block_j))
+        elif i < block_i:
+            codes.append(("delete", i, block_i, j, block_j))
+        elif j < block_j:
+            codes.append(("insert", i, block_i, j, block_j))
+        if size:
+            if codes and codes[-1][0] == "equal":
+                _, i1, _, j1, _ = codes.pop()
+                codes.append(("equal", i1, block_i + size, j1, block_j + size))
+            else:
+                codes.append(("equal", block_i, block_i + size, block_j, block_j + size))
+        i, j = block_i + size, block_j + size
+    return codes
+
+
+DIFFERS: dict[str, Callable[[list[str], list[str]], list[tuple] | None]] = {
+    "difflib": difflib_opcodes,
+    "myers": myers_opcodes,
+}
+
+
+def register_differ(name: str, differ: Callable[[list[str], list[str]], list[tuple] | None]):
+    '''
+    Make a diff algorithm available by name. It returns difflib-style opcodes,
+    or None to have the change summarized instead.
+    '''
+    DIFFERS[name] = differ
+
+
+def opcodes(a: list[str], b: list[str], algorithm: str | None = None) -> list[tuple] | None:
+    '''
+    Opcodes turning lines a into lines b, or None when they are too large or
+    too different to diff.
+    '''
+    if len(a) + len(b) > MAX_DIFF_LINES:
+        return None
+    algorithm = algorithm or DIFF_ALGORITHM
+    if algorithm == "auto":
+        algorithm = "difflib" if len(a) + len(b) <= SMALL_DIFF_LINES else "myers"
+    return DIFFERS[algorithm](a, b)
+
+
+def _grouped(codes: list[tuple], context: int) -> Iterator[list[tuple]]:
+    '''
+    Hunks of changes with `context` lines around them, as SequenceMatcher.get_grouped_opcodes.
+    '''
+    codes = list(codes) or [("equal", 0, 1, 0, 1)]
+    if codes[0][0] == "equal":
+        tag, i1, i2, j1, j2 = codes[0]
+        codes[0] = tag, max(i1, i2 - context), i2, max(j1, j2 - context), j2
+    if codes[-1][0] == "equal":
+        tag, i1, i2, j1, j2 = codes[-1]
+        codes[-1] = tag, i1, min(i2, i1 + context), j1, min(j2, j1 + context)
+    group = []
+    for tag, i1, i2, j1, j2 in codes:
+        if tag == "equal" and i2 - i1 > 2 * context:
+            group.append((tag, i1, min(i2, i1 + context), j1, min(j2, j1 + context)))
+            yield group
+            group = []
+            i1, j1 = max(i1, i2 - context), max(j1, j2 - context)
+        group.append((tag, i1, i2, j1, j2))
+    if group and not (len(group) == 1 and group[0][0] == "equal"):
+        yield group
+
+
+def _range(start: int, stop: int) -> str:
+    length = stop - start
+    if length == 1:
+        return f"{start + 1}"
+    return f"{start if not length else start + 1},{length}"
+
+
+def unified_lines(old: str, new: str, path: str, context: int = 3, algorithm: str | None = None) -> Iterator[str]:
+    '''
+    A unified diff, one line at a time, in the format of difflib.unified_diff.
+    Yields a single summary line instead when the contents cannot be diffed.
+    '''
+    a, b = old.splitlines(), new.splitlines()
+    codes = opcodes(a, b, algorithm)
+    if codes is None:
+        yield f"{path}: {len(a)} lines -> {len(b)} lines ({len(old)} -> {len(new)} characters), too large to diff"
+        return
+    started = False
+    for group in _grouped(codes, context):
+        if not started:
+            started = True
+            yield f"--- {path}"
+            yield f"+++ {path}"
+        first, last = group[0], group[-1]
+        yield f"@@ -{_range(first[1], last[2])} +{_range(first[3], last[4])} @@"
+        for tag, i1, i2, j1, j2 in group:
+            if tag == "equal":
+                for line in a[i1:i2]:
+                    yield " " + line
+                continue
+            for line in a[i1:i2]:
+                yield "-" + line
+            for line in b[j1:j2]:
+                yield "+" + line
+
+
+def show_diff(old: str, new: str, path: str, console: Console = console, page_lines: int = PAGE_LINES):
+    '''
+    Print a diff a page at a time. On a terminal each further page is offered;
+    otherwise only the first page is printed.
+    '''
+    lines = unified_lines(old, new, str(path))
+    page = list(islice(lines, page_lines))
+    while page:
+        console.print("\n".join(page), style="bold", markup=False, highlight=False)
+        page = list(islice(lines, page_lines))
+        if page and not (console.is_terminal and Confirm.ask("Show more of the diff?", default=True)):
+            console.print("[dim](rest of the diff not shown)[/dim]")
+            return
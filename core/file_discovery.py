@@ -0,0 +1,195 @@
+'''
+Purpose: Fast discovery of a project's source files.
+
+Responsibilities:
+- Walk the tree with os.scandir, pruning excluded directories before entering them
+- Honor .gitignore and .coductorignore files at any depth
+- Follow directory symlinks without looping forever
+- Match any set of file extensions
+
+Spec:
+- discover_files(root: Path, extensions: tuple[str, ...]) -> list[Path]
+- IgnoreRules.parse(text: str, base: str) -> IgnoreRules
+- IgnoreRules.ignored(path: str, is_dir: bool) -> bool | None
+'''
+import os
+import re
+from pathlib import Path
+from typing import NamedTuple
+
+DEFAULT_EXCLUDED_DIRS = {".git", ".hg", ".svn", "venv", ".venv", ".coductor", "__pycache__", "node_modules", ".tox", ".mypy_cache", ".pytest_cache"}
+IGNORE_FILES = (".gitignore", ".coductorignore")
+
+
+class IgnoreRule(NamedTuple):
+    regex: re.Pattern
+    negate: bool
+    dir_only: bool
+    anchored: bool  # Matched against the path from the ignore file, not just the name
+
+
+def _translate(pattern: str) -> re.Pattern:
+    '''
+    Turn a gitignore glob into a regex over a /-separated relative path.
+    '''
+    if pattern == "**":
+        return re.compile(r".*\Z")
+    out = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            out.append(r"(?:.*/)?")
+            i += 3
+        elif pattern.startswith("/**", i) and i + 3 == len(pattern):
+            out.append(r"/.*")
+            i += 3
+        elif pattern[i] == "*":
+            out.append(r"[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            out.append(r"[^/]")
+            i += 1
+        elif pattern[i] == "[" and "]" in pattern[i + 2:]:
+            end = pattern.index("]", i + 2)
+            chars = pattern[i + 1:end]
+            if chars.startswith("!"):
+                chars = "^" + chars[1:]
+            out.append(f"[{chars}]")
+            i = end + 1
+        elif pattern[i] == "\\" and i + 1 < len(pattern):
+            out.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            out.append(re.escape(pattern[i]))
+            i += 1
+    return re.compile("".join(out) + r"\Z")
+
+
+class IgnoreRules:
+    '''
+    Ignore patterns from one file, relative to the directory (`base`) it is in.
+    '''
+    def __init__(self, rules: list[IgnoreRule], base: str = ""):
+        self.rules = rules
+        self.base = base
+
+    @classmethod
+    def parse(cls, text: str, base: str = "") -> "IgnoreRules":
+        rules = []
+        for line in text.splitlines():
+            line = line.rstrip()
+            if not line or line.startswith("#"):
+                continue
+            negate = line.startswith("!")
+            if negate:
+                line = line[1:]
+            elif line.startswith("\\"):
+                line = line[1:]  # Escaped leading "#" or "!"
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            if not line:
+                continue
+            # A slash anywhere but the end ties the pattern to the ignore file's directory
+            anchored = "/" in line
+            rules.append(IgnoreRule(_translate(line.lstrip("/")), negate, dir_only, anchored))
+        return cls(rules, base)
+
+    def ignored(self, path: str, is_dir: bool) -> bool | None:
+        '''
+        Whether a path relative to the project root is ignored by these rules,
+        or None if no rule applies. The last matching rule wins.
+        '''
+        if self.base:
+            if not path.startswith(self.base + "/"):
+                return None
+            path = path[len(self.base) + 1:]
+        name = path.rsplit("/", 1)[-1]
+        verdict = None
+        for rule in self.rules:
+            if rule.dir_only and not is_dir:
+                continue
+            if rule.regex.match(path if rule.anchored else name):
+                verdict = not rule.negate
+        return verdict
+
+
+def _is_ignored(rule_sets: tuple, path: str, is_dir: bool) -> bool:
+    # Deeper ignore files come later and take precedence, as in git
+    verdict = False
+    for rules in rule_sets:
+        result = rules.ignored(path, is_dir)
+        if result is not None:
+            verdict = result
+    return verdict
+
+
+def _read_ignore_files(directory: str, names: set[str], rel: str) -> list[IgnoreRules]:
+    rule_sets = []
+    for ignore_file in IGNORE_FILES:
+        if ignore_file in names:
+            try:
+                with open(os.path.join(directory, ignore_file), "r", encoding="utf-8", errors="replace") as f:
+                    rule_sets.append(IgnoreRules.parse(f.read(), rel))
+            except OSError:
+                pass
+    return rule_sets
+
+
+def discover_files(
+    root: Path,
+    extensions: tuple[str, ...] = (".py",),
+    excluded_dirs: set[str] = DEFAULT_EXCLUDED_DIRS,
+    use_ignore_files: bool = True,
+) -> list[Path]:
+    '''
+    Return the files under root with one of the given extensions, in a stable
+    order. Excluded and ignored directories are never entered, and a directory
+    reached twice through symlinks is only walked once.
+    '''
+    root = Path(root)
+    extensions = tuple(extensions)
+    files = []
+    try:
+        root_stat = root.stat()
+    except OSError:
+        return files
+    visited = {(root_stat.st_dev, root_stat.st_ino)}
+
+    # Each entry: directory path, its path relative to root, the ignore rules in effect
+    stack = [(str(root), "", ())]
+    while stack:
+        directory, rel, rule_sets = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError:
+            continue  # Unreadable directory, e.g. no permission
+
+        if use_ignore_files:
+            rule_sets = rule_sets + tuple(_read_ignore_files(directory, {entry.name for entry in entries}, rel))
+
+        subdirs = []
+        for entry in entries:
+            entry_rel = f"{rel}/{entry.name}" if rel else entry.name
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                continue
+            if is_dir:
+                if entry.name in excluded_dirs or _is_ignored(rule_sets, entry_rel, True):
+                    continue
+                try:
+                    stat = entry.stat()  # Follows symlinks, so a loop leads back to a visited directory
+                except OSError:
+                    continue
+                key = (stat.st_dev, stat.st_ino)
+                if key in visited:
+                    continue  # Symlink loop or a directory already walked
+                visited.add(key)
+                subdirs.append((entry.path, entry_rel, rule_sets))
+            elif entry.name.endswith(extensions) and entry.is_file() and not _is_ignored(rule_sets, entry_rel, False):
+                files.append(Path(entry.path))
+
+        # Walk subdirectories in name order after this directory's files
+        stack.extend(reversed(subdirs))
+    return files
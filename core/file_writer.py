@@ -5,20 +5,31 @@ Responsibilities:
 - Prevent overwrite unless approved
 - Ensure directories exist
 - Apply templates
+- Scaffold a whole structure as one reviewed, all-or-nothing transaction
 
 Spec:
 - write_file(path: str, content: str)
 - create_folder(path: str)
 - backup_existing(path: str)
+- plan_structure(file_structure: dict, base_path: str) -> WritePlan
+- review_plan(plan: WritePlan, force: bool) -> bool
+- commit_plan(plan: WritePlan, workers: int)
 '''
 
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import NamedTuple
 from rich.console import Console
 from rich.prompt import Confirm
-from difflib import unified_diff
+from core.diff_engine import same_content, show_diff
+from core.todo_store import open_todos
 
 console = Console()
 
+WRITE_WORKERS = int(os.getenv("CODUCTOR_WRITE_WORKERS", "0")) or min(32, (os.cpu_count() or 1) + 4)
+
 file_type_to_multi_line_comment = {
     '.py': {'start': '"""', 'end': '"""'},
     '.js': {'start': '/*', 'end': '*/'},
@@ -51,6 +62,29 @@ file_type_to_multi_line_comment = {
     '.class': {'start': '/*', 'end': '*/'},
 }
 
+# Other header comments that are recognised, and replaced, in existing files.
+# For line comments the header is the run of leading lines that start with one.
+file_type_to_other_comments = {
+    '.py': [{'start': "'''", 'end': "'''"}, {'start': 'r"""', 'end': '"""'}, {'start': "r'''", 'end': "'''"}],
+    '.js': [{'start': '//', 'end': '//'}],
+    '.ts': [{'start': '//', 'end': '//'}],
+    '.java': [{'start': '/*', 'end': '*/'}, {'start': '//', 'end': '//'}],
+    '.c': [{'start': '//', 'end': '//'}],
+    '.cpp': [{'start': '//', 'end': '//'}],
+    '.h': [{'start': '//', 'end': '//'}],
+    '.hpp': [{'start': '//', 'end': '//'}],
+    '.go': [{'start': '//', 'end': '//'}],
+    '.php': [{'start': '//', 'end': '//'}, {'start': '#', 'end': '#'}],
+    '.swift': [{'start': '//', 'end': '//'}],
+    '.rb': [{'start': '#', 'end': '#'}],
+    '.lua': [{'start': '--[[', 'end': ']]'}, {'start': '--', 'end': '--'}],
+    '.sql': [{'start': '--', 'end': '--'}],
+}
+
+LINE_COMMENTS = {'#', '//', '--'}
+HEADER_SCAN_BYTES = 64 * 1024  # Only this much of a file is read to find its header
+COPY_CHUNK = 1024 * 1024
+
 def safe_write_file(filepath: str, new_content: str, force: bool = False):
     filepath = Path(filepath)
     old_content = ""
@@ -58,20 +92,13 @@ def safe_write_file(filepath: str, new_content: str, force: bool = False):
     if filepath.exists():
         old_content = filepath.read_text(encoding='utf-8')
 
-        if old_content.strip() == new_content.strip():
+        if same_content(old_content, new_content):
             console.print(f"[green]No changes needed for {filepath}[/green]")
             return
 
         # Show diff
-        diff = unified_diff(
-            old_content.splitlines(),
-            new_content.splitlines(),
-            fromfile=str(filepath),
-            tofile=str(filepath),
-            lineterm=""
-        )
         console.print(f"[yellow]Proposed changes to {filepath}:[/yellow]\n")
-        console.print("\n".join(diff), style="bold")
+        show_diff(old_content, new_content, filepath, console)
 
         if not force:
             confirm = Confirm.ask(f"Overwrite {filepath}?")
@@ -95,87 +122,301 @@ def append_to_file(filepath: str, content_to_append: str):
     console.print(f"[green]Appended to {filepath}[/green]")
 
 
+def _render_header(suffix: str, docstring: str) -> str:
+    comment = file_type_to_multi_line_comment.get(suffix, {'start': '', 'end': ''})
+    start_comment, end_comment = comment['start'], comment['end']
+    if start_comment in LINE_COMMENTS:
+        # Line comments: mark every line, so a multi-line docstring stays a comment
+        return "".join(f"{start_comment} {line}".rstrip() + '\n' for line in docstring.splitlines() or [""])
+    return start_comment + docstring + end_comment + '\n'
+
+
+def _comment_styles(suffix: str) -> list[tuple[bytes, bytes | None]]:
+    '''
+    (start, end) of each header comment form for a file type; end is None for line comments.
+    '''
+    comments = [file_type_to_multi_line_comment[suffix]] if suffix in file_type_to_multi_line_comment else []
+    comments += file_type_to_other_comments.get(suffix, [])
+    styles = [
+        (comment['start'].encode(), None if comment['start'] in LINE_COMMENTS else comment['end'].encode())
+        for comment in comments
+    ]
+    return sorted(styles, key=lambda style: style[1] is None)  # Block comments first: '--[[' before '--'
+
+
+def _find_header(head: bytes, styles: list[tuple[bytes, bytes | None]], complete: bool) -> tuple[int, int]:
+    '''
+    Byte offsets (start, end) of the header comment at the top of `head`, the
+    first bytes of a file; start == end when there is none. A shebang line stays
+    above the header. `complete` is True when head is the whole file.
+    '''
+    start = 0
+    if head.startswith(b"#!"):
+        newline = head.find(b"\n")
+        start = len(head) if newline == -1 else newline + 1
+    for start_comment, end_comment in styles:
+        if not head.startswith(start_comment, start):
+            continue
+        if end_comment is None:
+            end = start
+            while head.startswith(start_comment, end):
+                newline = head.find(b"\n", end)
+                if newline == -1:
+                    end = len(head) if complete else end  # A line cut off by the scan is left alone
+                    break
+                end = newline + 1
+            return start, end
+        close = head.find(end_comment, start + len(start_comment))
+        if close == -1:
+            continue  # Not closed within the scan: leave it alone
+        end = close + len(end_comment)
+        for line_break in (b"\r\n", b"\n"):
+            if head.startswith(line_break, end):
+                return start, end + len(line_break)  # The new header brings its own line break
+        return start, end
+    return start, start
+
+
 def append_docstring(filepath: str, docstring: str):
     '''
-    Append a docstring to the beginning of a file.
-    TODO: Add support for non-python files.
+    Append a docstring to the beginning of a file, replacing its header
+    comment if it has one. Only the head of the file is read; the rest is
+    copied across as it is.
     '''
     # If there is no docstring, add the docstring to the begging of the file.
     filepath = Path(filepath)
     filepath.parent.mkdir(parents=True, exist_ok=True)
 
-    # Get file extension
-    file_extension = filepath.suffix
-    start_comment = file_type_to_multi_line_comment.get(file_extension, {"start": ""})['start']
-    end_comment = file_type_to_multi_line_comment.get(file_extension, {"end": ""})['end']
-
-    # If the file does not exist, create it with the docstring.
-    if not filepath.exists():
-        filepath.write_text(start_comment + docstring + end_comment + '\n')
-        console.print(f"[green]Created file with docstring:[/green]{filepath}")
+    write = _plan_file(filepath, docstring)
+    if write is None:
+        console.print(f"[green]No changes needed for {filepath}[/green]")
         return
 
-    # If the file exists, read it and check if there is a docstring.
-    # TODO: Add support for ''' docstrings.
-    content = filepath.read_text()
-    if content.startswith(start_comment):
-        # There is likely a docstring, so we will need to overwrite it.
-        # Find the end of the docstring
-        end_index = content.find(end_comment, len(start_comment)) + len(end_comment)
-        if end_index == -1:
-            raise ValueError(f"Docstring not closed in {filepath}")
-    else:
-        end_index = 0
-    new_content = start_comment + docstring + end_comment + '\n' + content[end_index:]
-
     # If there was a docstring, show diff and ask for confirmation
-    if end_index != 0:
-        # Show diff and ask for confirmation
-        diff = unified_diff(
-            content.splitlines(),
-            new_content.splitlines(),
-            fromfile=str(filepath),
-            tofile=str(filepath),
-            lineterm=""
-        )
+    if write.old:
         console.print(f"[yellow]Proposed changes to {filepath}:[/yellow]\n")
-        console.print("\n".join(diff), style="bold")
+        show_diff(write.old, write.new, filepath, console)
         if not Confirm.ask(f"Overwrite {filepath}?"):
             console.print(f"[red]Aborted write to {filepath}[/red]")
             return
 
-    # Write the file
-    filepath.write_text(new_content)
-    console.print(f"[green]Wrote to {filepath}[/green]")
+    commit_plan(WritePlan([], [write]), workers=1)
+    if write.old is None:
+        console.print(f"[green]Created file with docstring:[/green]{filepath}")
+    else:
+        console.print(f"[green]Wrote to {filepath}[/green]")
+
+
+class PlannedWrite(NamedTuple):
+    '''
+    A new header for a file. The rest of an existing file, from byte `rest`
+    on, is copied across unchanged.
+    '''
+    path: Path
+    old: str | None  # The header being replaced ("" if none), None when the file is new
+    new: str
+    keep: bytes = b""  # Kept above the header, e.g. a shebang line
+    rest: int = 0
+
+
+class WritePlan(NamedTuple):
+    directories: list[Path]  # To create, parents before children
+    writes: list[PlannedWrite]  # Only files whose content changes
 
+    @property
+    def changed(self) -> list[PlannedWrite]:
+        return [write for write in self.writes if write.old is not None]
 
-def create_structure_from_dict(file_structure: dict, base_path: str = './'):
+
+def _plan_file(path: Path, docstring: str) -> PlannedWrite | None:
+    new = _render_header(path.suffix, docstring)
+    try:
+        with open(path, "rb") as file:
+            head = file.read(HEADER_SCAN_BYTES)
+    except FileNotFoundError:
+        return PlannedWrite(path, None, new)
+    start, end = _find_header(head, _comment_styles(path.suffix), complete=len(head) < HEADER_SCAN_BYTES)
+    old = head[start:end].decode('utf-8', errors='replace')
+    return None if old == new else PlannedWrite(path, old, new, head[:start], end)
+
+
+def plan_structure(file_structure: dict, base_path: str = './', workers: int = WRITE_WORKERS) -> WritePlan:
     '''
-    Create a directory structure based on a dictionary.
+    Work out every folder and file a structure needs, with the new header of
+    each file, without changing anything on disk.
     '''
     base_path = Path(base_path)
-    for name, content in file_structure.items():
-        path = base_path / name
-        if isinstance(content, dict):
-            # If the content is a dictionary, create a folder and recurse
-            path.mkdir(parents=True, exist_ok=True)
-            create_structure_from_dict(content, path)
-        else:
-            if not path.exists():
-                # Create a file with the content
-                append_docstring(str(path), content)
+    directories = []
+    missing = base_path
+    while not missing.is_dir() and missing != missing.parent:
+        directories.insert(0, missing)
+        missing = missing.parent
+
+    files = []
+    stack = [(base_path, file_structure)]
+    while stack:
+        parent, structure = stack.pop()
+        for name, content in structure.items():
+            path = parent / name
+            if isinstance(content, dict):
+                if not path.is_dir():
+                    directories.append(path)
+                stack.append((path, content))
             else:
-                # Add the docstring to the begging if the file exists
-                append_docstring(path, content)
+                files.append((path, content))
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        writes = [write for write in pool.map(lambda file: _plan_file(*file), files) if write]
+    return WritePlan(directories, writes)
+
+
+def review_plan(plan: WritePlan, force: bool = False) -> bool:
+    '''
+    Show the plan and ask once before any existing file is changed.
+    '''
+    changed = plan.changed
+    console.print(
+        f"[cyan]Scaffold:[/cyan] {len(plan.directories)} new folders, "
+        f"{len(plan.writes) - len(changed)} new files, {len(changed)} changed files"
+    )
+    for write in changed:
+        console.print(f"[yellow]Proposed changes to {write.path}:[/yellow]\n")
+        show_diff(write.old, write.new, write.path, console)
+    if not changed or force:
+        return True
+    return Confirm.ask(f"Apply changes to {len(changed)} existing files?")
+
+
+def _write_temp(write: PlannedWrite) -> Path:
+    '''
+    Write a file's new content next to it under a temporary name, streaming
+    the unchanged rest of an existing file, with the file's permissions, and
+    fsync it.
+    '''
+    temp = write.path.with_name(f".{write.path.name}.{os.getpid()}.tmp")
+    fd = os.open(temp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)  # The umask applies, as for any new file
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(write.keep + write.new.encode('utf-8'))
+            if write.old is not None:
+                with open(write.path, "rb") as source:
+                    source.seek(write.rest)
+                    shutil.copyfileobj(source, file, COPY_CHUNK)
+                    os.chmod(temp, os.fstat(source.fileno()).st_mode & 0o7777)
+            file.flush()
+            os.fsync(file.fileno())  # On disk before it is renamed over anything
+    except BaseException:
+        temp.unlink(missing_ok=True)
+        raise
+    return temp
+
+
+def _backup(path: Path) -> Path:
+    '''
+    Keep the current file under another name until the plan is committed.
+    '''
+    backup = path.with_name(f".{path.name}.{os.getpid()}.bak")
+    try:
+        os.link(path, backup)  # No copy on filesystems with hard links
+    except OSError:
+        shutil.copy2(path, backup)
+    return backup
+
+
+def _sync_directories(directories: set[Path]):
+    '''
+    fsync each directory once, so the renames and new entries in it survive a crash.
+    '''
+    if os.name == "nt":
+        return  # Directories cannot be opened for fsync on Windows
+    for directory in directories:
+        fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+def commit_plan(plan: WritePlan, workers: int = WRITE_WORKERS):
+    '''
+    Apply a plan all at once. Every file is written to a temporary file and
+    fsynced in parallel, then renamed over its target, and each directory
+    touched is fsynced once. If anything fails, files and folders are put back
+    as they were and the error is raised.
+    '''
+    created = []
+    temps = {}  # Target path -> temporary file not yet renamed
+    backups = {}  # Target path -> the file it replaced
+    replaced = []
+    try:
+        for directory in plan.directories:
+            directory.mkdir()
+            created.append(directory)
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [(write, pool.submit(_write_temp, write)) for write in plan.writes]
+        error = None
+        for write, future in futures:
+            try:
+                temps[write.path] = future.result()
+            except Exception as e:
+                error = error or e
+        if error:
+            raise error
+
+        for write in plan.writes:
+            if write.old is not None:
+                backups[write.path] = _backup(write.path)
+            os.replace(temps[write.path], write.path)
+            del temps[write.path]
+            replaced.append(write)
+        _sync_directories({write.path.parent for write in plan.writes} | {directory.parent for directory in created})
+    except BaseException:
+        for temp in temps.values():
+            temp.unlink(missing_ok=True)
+        for write in reversed(replaced):
+            if write.old is None:
+                write.path.unlink(missing_ok=True)
+            else:
+                os.replace(backups.pop(write.path), write.path)
+        for directory in reversed(created):
+            try:
+                directory.rmdir()
+            except OSError:
+                pass  # Something else was put there meanwhile
+        raise
+    finally:
+        for backup in backups.values():
+            backup.unlink(missing_ok=True)
+
+
+def create_structure_from_dict(file_structure: dict, base_path: str = './', force: bool = False):
+    '''
+    Create a directory structure based on a dictionary. Each file gets its
+    entry as a docstring. Existing files are only changed after one review of
+    the whole plan, and the structure is written completely or not at all.
+    '''
+    plan = plan_structure(file_structure, base_path)
+    if not plan.directories and not plan.writes:
+        console.print(f"[green]No changes needed for {base_path}[/green]")
+        return
+    if not review_plan(plan, force):
+        console.print(f"[red]Aborted scaffolding {base_path}[/red]")
+        return
+    try:
+        commit_plan(plan)
+    except OSError as e:
+        console.print(f"[red]Scaffolding failed, nothing was changed: {e}[/red]")
+        raise
+    console.print(f"[green]Wrote {len(plan.writes)} files in {base_path}[/green]")
 
 
 def append_to_todo(category: str, tasks: list[str]):
     '''
-    Append a TODO to the TODO list in project root.
+    Add TODOs to the project's TODO store and update their view in TODO.md.
     '''
     filepath = Path("./TODO.md")
-    filepath.parent.mkdir(parents=True, exist_ok=True)
-    with open(filepath, "a") as f:
-        f.write("\n\n" + category)
-        f.write("\n" + "\n".join(tasks))
+    with open_todos(Path(".")) as todos:
+        todos.add(category, tasks)
+        todos.render(filepath)
     console.print(f"[green]Appended to {filepath}[/green]")
@@ -0,0 +1,147 @@
+'''
+Purpose: Incremental JSON parsing for streamed LLM replies.
+
+Responsibilities:
+- Accept a JSON reply in arbitrary chunks as it streams in
+- Report each entry at a chosen depth as soon as it is complete, so callers
+  can render it before the rest of the reply has arrived
+- Tolerate text before the first brace and bare (unquoted) object keys
+
+Spec:
+- IncrementalJSONParser(emit_depth: int = 2)
+- IncrementalJSONParser.feed(chunk: str) -> list[tuple[tuple, object]]
+- IncrementalJSONParser.result() -> dict
+'''
+import json
+
+SCALAR_END = ",}]: \t\r\n"
+
+
+class _Frame:
+    __slots__ = ("kind", "path", "start", "key", "expect_key", "index")
+
+    def __init__(self, kind: str, path: tuple, start: int):
+        self.kind = kind
+        self.path = path
+        self.start = start
+        self.key = None
+        self.expect_key = kind == "object"
+        self.index = 0
+
+    def child_path(self) -> tuple:
+        return self.path + ((self.key,) if self.kind == "object" else (self.index,))
+
+
+class IncrementalJSONParser:
+    '''
+    Feed chunks of a JSON object and get back (path, value) pairs for every
+    value at `emit_depth` as soon as it closes. With the default depth of 2,
+    a plan like {"todo": {"goal": [...]}} yields (("todo", "goal"), [...]).
+    '''
+
+    def __init__(self, emit_depth: int = 2):
+        self.emit_depth = emit_depth
+        self.buffer = ""
+        self.done = False
+        self._pos = 0
+        self._start = None          # Offset of the root object
+        self._end = None            # Offset just past the root object
+        self._stack: list[_Frame] = []
+        self._in_string = False
+        self._escape = False
+        self._token_start = None    # Start of the string or scalar being read
+        self._token_is_key = False
+
+    def feed(self, chunk: str) -> list[tuple[tuple, object]]:
+        '''
+        Consume a chunk and return the entries it completed.
+        '''
+        self.buffer += chunk
+        events = []
+        buf = self.buffer
+        i = self._pos
+        while i < len(buf) and not self.done:
+            c = buf[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    self._end_token(i + 1, events)
+                i += 1
+                continue
+
+            if self._start is None:
+                # Skip anything before the root object, such as a markdown fence
+                if c == "{":
+                    self._start = i
+                    self._stack.append(_Frame("object", (), i))
+                i += 1
+                continue
+
+            if self._token_start is not None and c in SCALAR_END:
+                # A bare scalar or unquoted key ends at the first delimiter
+                self._end_token(i, events)
+
+            frame = self._stack[-1]
+            if c == '"':
+                self._begin_token(i, frame)
+                self._in_string = True
+            elif c in "{[":
+                self._stack.append(_Frame("object" if c == "{" else "array", frame.child_path(), i))
+            elif c in "}]":
+                closed = self._stack.pop()
+                if not self._stack:
+                    self.done = True
+                    self._end = i + 1
+                else:
+                    self._emit(self._stack[-1], closed.start, i + 1, events)
+            elif c == ":":
+                frame.expect_key = False
+            elif c == ",":
+                if frame.kind == "object":
+                    frame.expect_key = True
+                else:
+                    frame.index += 1
+            elif not c.isspace() and self._token_start is None:
+                self._begin_token(i, frame)
+            i += 1
+
+        self._pos = i
+        return events
+
+    def _begin_token(self, start: int, frame: _Frame):
+        self._token_start = start
+        self._token_is_key = frame.kind == "object" and frame.expect_key
+
+    def _end_token(self, end: int, events: list):
+        start, self._token_start = self._token_start, None
+        frame = self._stack[-1]
+        text = self.buffer[start:end]
+        if self._token_is_key:
+            frame.key = json.loads(text) if text.startswith('"') else text.strip()
+        else:
+            self._emit(frame, start, end, events)
+
+    def _emit(self, parent: _Frame, start: int, end: int, events: list):
+        '''
+        Report a completed value if it sits at the emit depth.
+        '''
+        path = parent.child_path()
+        if len(path) != self.emit_depth:
+            return
+        try:
+            events.append((path, json.loads(self.buffer[start:end])))
+        except ValueError:
+            pass  # Not valid JSON on its own, the full reply is parsed at the end
+
+    def result(self) -> dict:
+        '''
+        Parse the complete reply.
+        '''
+        if self._start is None:
+            return json.loads(self.buffer)
+        return json.loads(self.buffer[self._start:self._end])
@@ -0,0 +1,246 @@
+'''
+Purpose: Append-only JSONL log with an offset index.
+
+Responsibilities:
+- Append records with a single write instead of rewriting the whole file
+- Keep a binary index of record offsets so any record, or the last N, can be
+  read without parsing the whole file
+- Recover from a crash mid-write by truncating partial records and rebuilding
+  the index
+- Rewrite or compact the log atomically
+
+Spec:
+- JsonlLog(path: Path)
+- JsonlLog.append(records: list[dict]) -> list[int]
+- JsonlLog.read(index: int) -> dict
+- JsonlLog.tail(count: int) -> list[dict]
+- JsonlLog.read_all() -> list[dict]
+- iter(JsonlLog) -> Iterator[dict]
+- JsonlLog.rewrite(records: list[dict])
+- JsonlLog.compact() -> int
+'''
+import json
+import os
+import struct
+from pathlib import Path
+
+OFFSET = struct.Struct("<Q")
+
+
+class JsonlLog:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.index_path = self.path.with_name(self.path.name + ".idx")
+        self._recovered = False
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def _ensure(self):
+        '''
+        Create the log on first use and repair it after an interrupted write.
+        '''
+        if self._recovered:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.touch(exist_ok=True)
+        self.recover()
+        self._recovered = True
+
+    def __len__(self) -> int:
+        self._ensure()
+        return self.index_path.stat().st_size // OFFSET.size
+
+    def recover(self) -> bool:
+        '''
+        Truncate a partially written last record and rebuild the index if it does
+        not match the data file. Returns True if anything was repaired.
+        '''
+        repaired = False
+        size = self.path.stat().st_size
+        if size:
+            with open(self.path, "rb+") as f:
+                f.seek(size - 1)
+                if f.read(1) != b"\n":
+                    # The last write was interrupted, so drop the partial line
+                    end = self._last_newline(f, size)
+                    f.truncate(end)
+                    size = end
+                    repaired = True
+
+        if not self._index_matches(size):
+            self._rebuild_index()
+            repaired = True
+        return repaired
+
+    @staticmethod
+    def _last_newline(f, size: int) -> int:
+        '''
+        Return the offset just after the last newline in the file, or 0.
+        '''
+        position = size
+        while position > 0:
+            step = min(65536, position)
+            position -= step
+            f.seek(position)
+            chunk = f.read(step)
+            found = chunk.rfind(b"\n")
+            if found != -1:
+                return position + found + 1
+        return 0
+
+    def _index_matches(self, size: int) -> bool:
+        if not self.index_path.exists():
+            return False
+        index_size = self.index_path.stat().st_size
+        if index_size % OFFSET.size:
+            return False
+        if index_size == 0:
+            return size == 0
+
+        # The index is valid if its last offset points at the final line
+        with open(self.index_path, "rb") as f:
+            f.seek(index_size - OFFSET.size)
+            (last,) = OFFSET.unpack(f.read(OFFSET.size))
+        if last >= size:
+            return False
+        with open(self.path, "rb") as f:
+            if last:
+                f.seek(last - 1)
+                if f.read(1) != b"\n":
+                    return False
+            f.seek(last)
+            f.readline()
+            return f.tell() == size
+
+    def _rebuild_index(self):
+        offsets = []
+        position = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                offsets.append(position)
+                position += len(line)
+        self._write_index(self.index_path, offsets)
+
+    @staticmethod
+    def _write_index(path: Path, offsets: list[int]):
+        with open(path, "wb") as f:
+            f.write(b"".join(OFFSET.pack(offset) for offset in offsets))
+
+    @staticmethod
+    def _encode(record: dict) -> bytes:
+        return (json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8")
+
+    def append(self, records: list[dict]) -> list[int]:
+        '''
+        Append records with one write to the log and one to the index.
+        Returns the offsets of the new records.
+        '''
+        self._ensure()
+        lines = [self._encode(record) for record in records]
+        with open(self.path, "ab") as f:
+            position = f.seek(0, os.SEEK_END)
+            f.write(b"".join(lines))
+
+        offsets = []
+        for line in lines:
+            offsets.append(position)
+            position += len(line)
+        with open(self.index_path, "ab") as f:
+            f.write(b"".join(OFFSET.pack(offset) for offset in offsets))
+        return offsets
+
+    def read_at(self, offset: int) -> dict:
+        '''
+        Read the record stored at a byte offset.
+        '''
+        self._ensure()
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            return json.loads(f.readline())
+
+    def read(self, index: int) -> dict:
+        '''
+        Read a single record by position, negative positions count from the end.
+        '''
+        count = len(self)
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            raise IndexError(f"Record {index} out of range for {self.path}")
+        with open(self.index_path, "rb") as f:
+            f.seek(index * OFFSET.size)
+            (offset,) = OFFSET.unpack(f.read(OFFSET.size))
+        return self.read_at(offset)
+
+    def tail(self, count: int) -> list[dict]:
+        '''
+        Read the last `count` records without parsing the rest of the file.
+        '''
+        self._ensure()
+        total = len(self)
+        if count <= 0 or total == 0:
+            return []
+        start = max(total - count, 0)
+        with open(self.index_path, "rb") as f:
+            f.seek(start * OFFSET.size)
+            (offset,) = OFFSET.unpack(f.read(OFFSET.size))
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            return [json.loads(line) for line in f]
+
+    def read_all(self) -> list[dict]:
+        self._ensure()
+        with open(self.path, "rb") as f:
+            return [json.loads(line) for line in f]
+
+    def __iter__(self):
+        '''
+        Stream records one line at a time.
+        '''
+        self._ensure()
+        with open(self.path, "rb") as f:
+            for line in f:
+                yield json.loads(line)
+
+    def rewrite(self, records: list[dict]):
+        '''
+        Atomically replace the whole log with `records`.
+        '''
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        lines = [self._encode(record) for record in records]
+        offsets = []
+        position = 0
+        for line in lines:
+            offsets.append(position)
+            position += len(line)
+
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        tmp_index = self.index_path.with_name(self.index_path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(b"".join(lines))
+            f.flush()
+            os.fsync(f.fileno())
+        self._write_index(tmp_index, offsets)
+
+        # If a crash lands between the two renames, recover() rebuilds the index
+        os.replace(tmp_path, self.path)
+        os.replace(tmp_index, self.index_path)
+        self._recovered = True
+
+    def compact(self) -> int:
+        '''
+        Rewrite the log keeping only records that parse.
+        Returns the number of records dropped.
+        '''
+        self._ensure()
+        records = []
+        dropped = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    dropped += 1
+        self.rewrite(records)
+        return dropped
@@ -2,61 +2,129 @@
 Purpose: Local memory manager for todos, project state, and logs.
 
 Responsibilities:
-- Persist and retrieve todos
+- Persist and retrieve todos, through the project's TodoStore
 - Log interactions
-- Store project state
+- Store project state, parsed once and cached until memory.yml changes on disk
+- Batch memory changes into a single write
 
 Spec:
-- save_todo(item: dict)
-- get_todos() -> list[dict]
-- mark_complete(index: int)
-- save_log(entry: str)
+- add_todo(task: str, status: str, category: str)
+- load_todos() -> list[dict]
+- update_todo_status(task: str, status: str)
+- load_memory() -> dict
+- update_memory(key: str, value)
+- transaction() - Ex: with memory.transaction(): ...
 '''
 
+import os
 import yaml
+from contextlib import contextmanager
 from pathlib import Path
+from core.todo_store import TodoStore, TODO_FILE
+
+YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+YamlDumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+
+def _stamp(path: Path) -> tuple[int, int, int] | None:
+    '''
+    Changes whenever the file is written or replaced.
+    '''
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
 
 class MemoryManager:
     def __init__(self, base_path: Path = Path(".")):
         self.memory_dir = base_path / ".coductor"
-        self.todo_path = self.memory_dir / "todo.yml"
+        self.todo_path = self.memory_dir / "todo.yml"  # Old format, imported into the store once
         self.memory_path = self.memory_dir / "memory.yml"
         self.memory_dir.mkdir(parents=True, exist_ok=True)
+        self.todos = TodoStore(base_path / TODO_FILE)
+        self._memory = None  # Parsed memory.yml, valid while its stamp matches the file
+        self._stamp = None
+        self._depth = 0  # Open transactions
+        self._dirty = False  # Changes waiting for the outermost transaction to end
 
         # Ensure files exist, else crete them with default values
-        for path in [self.todo_path, self.memory_path]:
-            if not path.exists():
-                path.write_text(yaml.dump([] if "todo" in str(path) else {}))
+        if not self.memory_path.exists():
+            self.memory_path.write_text(yaml.dump({}, Dumper=YamlDumper))
+        if self.todo_path.exists():
+            with open(self.todo_path, 'r') as f:
+                self.todos.import_list(yaml.load(f, Loader=YamlLoader) or [])
+            self.todo_path.rename(self.todo_path.with_suffix(".yml.imported"))
+
+    def close(self):
+        self.todos.close()
 
     def load_todos(self):
-        with open(self.todo_path, 'r') as f:
-            return yaml.safe_load(f) or []
+        return self.todos.items()
 
     def save_todos(self, todos):
-        with open(self.todo_path, 'w') as f:
-            yaml.safe_dump(todos, f)
+        '''
+        Replace every todo, in one transaction.
+        '''
+        self.todos.import_list(todos, replace=True)
 
-    def add_todo(self, task: str, status: str = "pending"):
-        todos = self.load_todos()
-        todos.append({"task": task, "status": status})
-        self.save_todos(todos)
+    def add_todo(self, task: str, status: str = "pending", category: str = "General"):
+        self.todos.add(category, [task], status)
 
     def update_todo_status(self, task: str, status: str):
-        todos = self.load_todos()
-        for t in todos:
-            if t["task"] == task:
-                t["status"] = status
-        self.save_todos(todos)
+        self.todos.set_status_by_task(task, status)
 
     def load_memory(self):
-        with open(self.memory_path, 'r') as f:
-            return yaml.safe_load(f) or {}
+        '''
+        The project memory. memory.yml is only parsed again after it changes on
+        disk. The dict is shared with the cache: change it through save_memory
+        or update_memory.
+        '''
+        if self._dirty:
+            return self._memory  # Inside a transaction, its changes win
+        stamp = _stamp(self.memory_path)
+        if self._memory is None or stamp != self._stamp:
+            with open(self.memory_path, 'r') as f:
+                self._memory = yaml.load(f, Loader=YamlLoader) or {}
+            self._stamp = stamp
+        return self._memory
 
     def save_memory(self, memory_data: dict):
-        with open(self.memory_path, 'w') as f:
-            yaml.safe_dump(memory_data, f)
+        self._memory = memory_data
+        if self._depth:
+            self._dirty = True
+            return
+        self._write_memory()
+
+    def _write_memory(self):
+        temp = self.memory_path.with_name(f".{self.memory_path.name}.{os.getpid()}.tmp")
+        with open(temp, 'w') as f:
+            yaml.dump(self._memory, f, Dumper=YamlDumper)
+        os.replace(temp, self.memory_path)
+        self._stamp = _stamp(self.memory_path)  # Our own write keeps the cache valid
+        self._dirty = False
 
     def update_memory(self, key: str, value):
         memory = self.load_memory()
         memory[key] = value
         self.save_memory(memory)
+
+    @contextmanager
+    def transaction(self):
+        '''
+        Batch memory changes: memory.yml is written once, when the outermost
+        transaction ends, and left untouched if it raises.
+        '''
+        self._depth += 1
+        try:
+            yield self
+        except BaseException:
+            if self._depth == 1:
+                self._memory, self._dirty = None, False  # Read back from disk next time
+            raise
+        else:
+            if self._depth == 1 and self._dirty:
+                self._write_memory()
+        finally:
+            self._depth -= 1
@@ -5,82 +5,388 @@ Responsibilities:
 - Walk the directory tree
 - Read and parse files (imports, docstrings, functions)
 - Generate file summaries
+- Reuse results for unchanged files from the analysis cache
+- Spread the remaining files across a process pool
 
 Spec:
 - get_file_structure(root: str) -> dict
 - summarize_file(path: str) -> str
+- save_summaries(summaries: Iterable[Dict], path: Path) -> SummaryStore
+- load_summary(file: str, path: Path) -> Dict | None
+- analyze_source(filepath: Path, source: str) -> Dict
+- records(result: Dict, key: str) -> list[Symbol | Import | Reference]
+- find_symbol(result: Dict, name: str) -> List[Symbol]
+- iter_analysis(root: Path, use_cache: bool = True, workers: int | None = None, extensions: tuple = (".py",)) -> Iterator[Dict]
+- analyze_project(root: Path, use_cache: bool = True, workers: int | None = None, extensions: tuple = (".py",)) -> List[Dict]
 '''
 
 import ast
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import List, Dict
+from typing import Iterable, Iterator, List, Dict, NamedTuple
 from rich.console import Console
-import yaml
+from rich.progress import Progress
+from core.analysis_cache import AnalysisCache
+from core.file_discovery import discover_files, DEFAULT_EXCLUDED_DIRS
+from core.summary_store import SummaryStore
 
 console = Console()
 
-EXCLUDED_DIRS = {".git", "venv", ".coductor", "__pycache__"}
+EXCLUDED_DIRS = DEFAULT_EXCLUDED_DIRS
+SOURCE_EXTENSIONS = (".py",)  # Other extensions get a line-count summary instead of a parse
+ANALYSIS_CACHE_FILE = Path(".coductor") / "analysis_cache.json"  # Relative to the project root
+SUMMARIES_FILE = Path(".coductor") / "summaries.jsonl"
+SUMMARIES_YAML_FILE = Path(".coductor") / "summaries.yml"  # Readable export
+ANALYZE_WORKERS = int(os.getenv("CODUCTOR_ANALYZE_WORKERS", "0")) or os.cpu_count() or 1
+PARALLEL_THRESHOLD = 64  # Below this many files a process pool costs more than it saves
+CHUNKS_PER_WORKER = 4    # Enough chunks to balance uneven files without much IPC
 
 def get_python_files(root: Path) -> List[Path]:
-    return [
-        f for f in root.rglob("*.py")
-        if not any(excluded in f.parts for excluded in EXCLUDED_DIRS)
-    ]
+    return get_source_files(root, (".py",))
+
+def get_source_files(root: Path, extensions: tuple[str, ...] = SOURCE_EXTENSIONS) -> List[Path]:
+    '''
+    Files to analyze, skipping excluded directories and anything in .gitignore/.coductorignore.
+    '''
+    return discover_files(root, extensions, EXCLUDED_DIRS)
 
 def analyze_file(filepath: Path) -> Dict:
     with open(filepath, "r", encoding="utf-8") as f:
         source = f.read()
+    return analyze_source(filepath, source)
 
-    tree = ast.parse(source, filename=str(filepath))
+class Symbol(NamedTuple):
+    name: str
+    qualname: str           # e.g. JsonlLog.append, or outer.<locals>.inner for nested functions
+    kind: str               # class, function or method
+    parent: str | None      # qualname of the enclosing definition
+    line: int               # First line, including decorators
+    end_line: int
+    signature: str          # e.g. (self, records: list[dict]) -> list[int], or the bases of a class
+    decorators: tuple[str, ...]
+    is_async: bool
+    docstring: str | None
+
+class Import(NamedTuple):
+    module: str
+    name: str | None
+    alias: str | None
+    line: int
+
+class Reference(NamedTuple):
+    caller: str
+    target: str
+    name: str
+    kind: str               # call or inherits
+    line: int
+
+def _decode_symbol(row: list) -> Symbol:
+    return Symbol(*row[:7], tuple(row[7]), *row[8:])  # JSON turned the decorators into a list
+
+RECORD_TYPES = {"symbols": Symbol, "imports": Import, "references": Reference}
+DECODERS = {Symbol: _decode_symbol, Import: Import._make, Reference: Reference._make}
+
+def records(result: Dict, key: str) -> list:
+    '''
+    The symbols, imports or references of a result as records. Results that went
+    through JSON (the analysis cache, the daemon) hold them as plain lists.
+    '''
+    record_type = RECORD_TYPES[key]
+    decode = DECODERS[record_type]
+    return [row if isinstance(row, record_type) else decode(row) for row in result.get(key, [])]
+
+def _empty_result(filepath: Path, summary: str) -> Dict:
+    return {
+        "file": str(filepath),
+        "docstring": None,
+        "symbols": [],
+        "imports": [],
+        "references": [],
+        "summary": summary,
+    }
+
+def _dotted_name(node: ast.AST) -> str | None:
+    '''
+    Source text of a name or attribute chain such as `self.store.save`.
+    '''
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if isinstance(node, ast.Name):
+        parts.append(node.id)
+    elif isinstance(node, ast.Call):
+        parts.append("()")  # e.g. get_client().close
+    else:
+        return None
+    return ".".join(reversed(parts))
+
+def _signature(node) -> str:
+    if isinstance(node, ast.ClassDef):
+        bases = [ast.unparse(base) for base in node.bases + node.keywords]
+        return f"({', '.join(bases)})" if bases else ""
+    signature = f"({ast.unparse(node.args)})"
+    if node.returns:
+        signature += f" -> {ast.unparse(node.returns)}"
+    return signature
+
+class _Collector(ast.NodeVisitor):
+    '''
+    Collect definitions, imports and call/inheritance references in one pass.
+    '''
+    def __init__(self):
+        self.scope = []   # Symbols of the enclosing definitions
+        self.symbols = []
+        self.imports = []
+        self.references = []
+
+    def _define(self, node, kind: str):
+        parent = self.scope[-1] if self.scope else None
+        if parent is None:
+            qualname = node.name
+        elif parent.kind == "class":
+            qualname = f"{parent.qualname}.{node.name}"
+        else:
+            qualname = f"{parent.qualname}.<locals>.{node.name}"
+        decorators = node.decorator_list
+        symbol = Symbol(
+            node.name,
+            qualname,
+            kind,
+            parent.qualname if parent else None,
+            decorators[0].lineno if decorators else node.lineno,
+            node.end_lineno,
+            _signature(node),
+            tuple(ast.unparse(decorator) for decorator in decorators),
+            isinstance(node, ast.AsyncFunctionDef),
+            ast.get_docstring(node),
+        )
+        self.symbols.append(symbol)
+        self.scope.append(symbol)
+        self.generic_visit(node)
+        self.scope.pop()
+
+    def _reference(self, node: ast.AST, kind: str, line: int):
+        target = _dotted_name(node)
+        if target:
+            caller = self.scope[-1].qualname if self.scope else "<module>"
+            self.references.append(Reference(caller, target, target.rsplit(".", 1)[-1], kind, line))
+
+    def visit_ClassDef(self, node: ast.ClassDef):
+        for base in node.bases:
+            self._reference(base, "inherits", node.lineno)
+        self._define(node, "class")
 
-    classes = []
-    functions = []
-
-    for node in ast.walk(tree):
-        if isinstance(node, ast.FunctionDef):
-            functions.append({
-                "name": node.name,
-                "docstring": ast.get_docstring(node)
-            })
-        elif isinstance(node, ast.ClassDef):
-            classes.append({
-                "name": node.name,
-                "docstring": ast.get_docstring(node)
-            })
+    def visit_FunctionDef(self, node):
+        in_class = bool(self.scope) and self.scope[-1].kind == "class"
+        self._define(node, "method" if in_class else "function")
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_Import(self, node: ast.Import):
+        for alias in node.names:
+            self.imports.append(Import(alias.name, None, alias.asname, node.lineno))
+
+    def visit_ImportFrom(self, node: ast.ImportFrom):
+        module = "." * node.level + (node.module or "")
+        for alias in node.names:
+            self.imports.append(Import(module, alias.name, alias.asname, node.lineno))
+
+    def visit_Call(self, node: ast.Call):
+        self._reference(node.func, "call", node.lineno)
+        self.generic_visit(node)
+
+def analyze_source(filepath: Path, source: str) -> Dict:
+    if filepath.suffix != ".py":
+        return _empty_result(filepath, f"{filepath.name}: {len(source.splitlines())} lines")
+
+    tree = ast.parse(source, filename=str(filepath))
+    collector = _Collector()
+    collector.visit(tree)
 
     return {
         "file": str(filepath),
-        "classes": classes,
-        "functions": functions,
-        "summary": summarize_structure(filepath, classes, functions),
+        "docstring": ast.get_docstring(tree),
+        "symbols": collector.symbols,
+        "imports": collector.imports,
+        "references": collector.references,
+        "summary": summarize_structure(filepath, collector.symbols),
     }
 
-def summarize_structure(filepath, classes, functions) -> str:
+def find_symbol(result: Dict, name: str) -> List[Symbol]:
+    '''
+    Symbols in a result matching a qualified name (JsonlLog.append), or failing
+    that a plain name (append).
+    '''
+    symbols = records(result, "symbols")
+    return [s for s in symbols if s.qualname == name] or [s for s in symbols if s.name == name]
+
+def summarize_structure(filepath, symbols: List[Symbol]) -> str:
     summary = f"{filepath.name} defines:\n"
-    if classes:
-        summary += "- Classes: " + ", ".join(c['name'] for c in classes) + "\n"
-    if functions:
-        summary += "- Functions: " + ", ".join(f['name'] for f in functions) + "\n"
+    for label, kind in (("Classes", "class"), ("Functions", "function"), ("Methods", "method")):
+        # Nested functions are implementation details of their parent
+        names = [s.qualname for s in symbols if s.kind == kind and "<locals>" not in s.qualname]
+        if names:
+            summary += f"- {label}: " + ", ".join(names) + "\n"
     return summary.strip()
 
-def analyze_project(root: Path) -> List[Dict]:
-    py_files = get_python_files(root)
-    results = []
+def _failed_result(filepath: Path, error: Exception) -> Dict:
+    if isinstance(error, SyntaxError):
+        message = f"SyntaxError: {error.msg} (line {error.lineno})"
+    else:
+        message = f"{type(error).__name__}: {error}"
+    result = _empty_result(filepath, f"{filepath.name} could not be parsed: {message}")
+    result["error"] = message
+    return result
+
+def _analyze_worker(filepath: str, source: bytes | None) -> tuple[Dict, float, str | None]:
+    '''
+    Read, hash and analyze one file in a worker process. A file that cannot be
+    read or parsed yields a result with an "error" entry instead of failing the
+    whole run. Returns the result, the seconds it took and the sha256 of the
+    source, or None if the file could not be read.
+    '''
+    start = time.perf_counter()
+    path = Path(filepath)
+    digest = None
+    try:
+        if source is None:
+            source = path.read_bytes()
+        digest = AnalysisCache.digest(source)
+        result = analyze_source(path, source.decode("utf-8"))
+    except (OSError, SyntaxError, UnicodeDecodeError, ValueError) as e:
+        result = _failed_result(path, e)
+    return result, time.perf_counter() - start, digest
+
+def _analyze_chunk(paths: List[str], sources: List[bytes | None]) -> List[tuple[Dict, float, str | None]]:
+    return [_analyze_worker(path, source) for path, source in zip(paths, sources)]
+
+def _analyze_unordered(items: List[tuple[Path, bytes | None]], workers: int) -> Iterator[tuple[int, Dict, float, str | None]]:
+    '''
+    Analyze files across a process pool when there are enough of them, yielding
+    (position in items, result, seconds, sha256) as each chunk finishes, with
+    one progress bar for the whole batch. A file without its source is read
+    by the worker, so the parent never holds the sources of a cold run.
+    '''
+    if not items:
+        return
+    paths = [str(path) for path, _ in items]
+    sources = [source for _, source in items]
+    with Progress(console=console, transient=True) as progress:
+        task = progress.add_task("Analyzing", total=len(items))
+        if workers <= 1 or len(items) < PARALLEL_THRESHOLD:
+            for i, output in enumerate(map(_analyze_worker, paths, sources)):
+                progress.advance(task)
+                yield i, *output
+            return
+        chunksize = max(1, len(items) // (workers * CHUNKS_PER_WORKER))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(_analyze_chunk, paths[start:start + chunksize], sources[start:start + chunksize]): start
+                for start in range(0, len(items), chunksize)
+            }
+            for future in as_completed(futures):
+                outputs = future.result()
+                progress.advance(task, len(outputs))
+                for offset, output in enumerate(outputs):
+                    yield futures[future] + offset, *output
+
+def _analyze_many(items: List[tuple[Path, bytes | None]], workers: int) -> List[tuple[Dict, float, str | None]]:
+    '''
+    Analyze files, returning their results in the order of items.
+    '''
+    outputs = [None] * len(items)
+    for i, *output in _analyze_unordered(items, workers):
+        outputs[i] = tuple(output)
+    return outputs
+
+def iter_analysis(
+    root: Path,
+    use_cache: bool = True,
+    workers: int | None = None,
+    extensions: tuple[str, ...] = SOURCE_EXTENSIONS,
+) -> Iterator[Dict]:
+    '''
+    Analyze every source file under root, yielding the results in a stable
+    (file) order, each as soon as it and every file before it are ready.
+    Unless use_cache is False, unchanged files are served from the analysis
+    cache. The rest are spread over `workers` processes
+    (CODUCTOR_ANALYZE_WORKERS, default: one per CPU). The cache is saved once
+    the last result has been yielded.
+    '''
+    files = get_source_files(root, extensions)
+    cache = AnalysisCache(root / ANALYSIS_CACHE_FILE) if use_cache else None
+    ready = {}  # Position -> result, held until every earlier file has been yielded
+    pending = []
+    for i, file in enumerate(files):
+        key = file.relative_to(root).as_posix()
+        try:
+            result, source = cache.lookup(key, file) if cache else (None, None)
+        except OSError:
+            result, source = None, None  # Reported by the worker that tries to read it
+        if result is None:
+            pending.append((i, key, file, source))
+        else:
+            # The cache is keyed relative to root, so report the path as given this run
+            ready[i] = {**result, "file": str(file)}
+
+    position = 0
+    while position in ready:
+        yield ready.pop(position)
+        position += 1
+    for j, result, seconds, digest in _analyze_unordered([(file, source) for _, _, file, source in pending], workers or ANALYZE_WORKERS):
+        i, key, file, _ = pending[j]
+        if cache and digest is not None:
+            cache.store(key, file, digest, result, seconds)
+        if result.get("error"):
+            console.print(f"[yellow]Skipped {result['file']}: {result['error']}[/yellow]")
+        ready[i] = result
+        while position in ready:
+            yield ready.pop(position)
+            position += 1
+
+    if cache:
+        cache.prune({file.relative_to(root).as_posix() for file in files})
+        cache.save()
+        print_cache_report(cache.report())
+
+def analyze_project(
+    root: Path,
+    use_cache: bool = True,
+    workers: int | None = None,
+    extensions: tuple[str, ...] = SOURCE_EXTENSIONS,
+) -> List[Dict]:
+    '''
+    Every result of iter_analysis, as a list.
+    '''
+    return list(iter_analysis(root, use_cache, workers, extensions))
+
+def print_cache_report(report: Dict):
+    console.print(
+        f"[dim]Analysis cache: {report['hits']} unchanged, {report['misses']} analyzed, "
+        f"{report['removed']} removed ({report['hit_rate']:.0%} hits, ~{report['saved_seconds']:.2f}s saved)[/dim]"
+    )
 
-    for file in py_files:
-        console.print(f"[cyan]Analyzing {file}[/cyan]")
-        result = analyze_file(file)
-        results.append(result)
+def save_summaries(summaries: Iterable[Dict], path: Path = SUMMARIES_FILE) -> SummaryStore:
+    '''
+    Stream summaries into the JSONL summaries store.
+    '''
+    store = SummaryStore(path)
+    store.write(summaries)
+    return store
 
-    return results
+def load_summary(file: str, path: Path = SUMMARIES_FILE) -> Dict | None:
+    '''
+    Read a single file's summary without loading the rest.
+    '''
+    return SummaryStore(path).get(file)
 
-def save_summaries(summaries: List[Dict], path: Path = Path(".coductor/summaries.yml")):
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with open(path, "w") as f:
-        yaml.dump(summaries, f)
+def export_summaries_yaml(path: Path = SUMMARIES_FILE, yaml_path: Path = SUMMARIES_YAML_FILE) -> int:
+    return SummaryStore(path).export_yaml(yaml_path)
 
 if __name__ == "__main__":
     root = Path(".")  # current repo
-    summaries = analyze_project(root)
-    save_summaries(summaries)
+    save_summaries(iter_analysis(root))
+    export_summaries_yaml()
@@ -1,12 +1,133 @@
+'''
+Purpose: Load the prompt templates and reply schemas in core/prompts/.
+
+Responsibilities:
+- Parse each template file and compile its prompt once per process, through
+  one shared Jinja Environment
+- Keep compiled templates in a bytecode cache in the user's cache directory,
+  so a cold start skips compiling
+- Fail a render on an undefined variable instead of sending a broken prompt
+- Reload a template when its file changes
+
+Spec:
+- load_prompt(name: str) -> Template
+- load_schema(name: str) -> dict | None
+- PromptRegistry(directory: Path, bytecode_dir: Path | None, bytecode_cache: bool)
+- get_registry() -> PromptRegistry
+'''
+import os
 import yaml
-from jinja2 import Template
+from jinja2 import BaseLoader, Environment, FileSystemBytecodeCache, StrictUndefined, Template, TemplateNotFound
 from pathlib import Path
 
+PROMPTS_DIR = Path(__file__).parent
+YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def bytecode_cache_dir() -> Path:
+    '''
+    Where compiled templates are kept: CODUCTOR_TEMPLATE_CACHE_DIR, else
+    coductor/templates in the user's cache directory ($XDG_CACHE_HOME or ~/.cache).
+    '''
+    configured = os.getenv("CODUCTOR_TEMPLATE_CACHE_DIR")
+    if configured:
+        return Path(configured)
+    return Path(os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache") / "coductor" / "templates"
+
+
+class _PromptLoader(BaseLoader):
+    '''
+    Serves the `prompt` entry of <name>.yml as the template source.
+    '''
+    def __init__(self, registry: "PromptRegistry"):
+        self.registry = registry
+
+    def get_source(self, environment: Environment, template: str):
+        path = self.registry.path(template)
+        try:
+            mtime = path.stat().st_mtime_ns
+        except OSError:
+            raise TemplateNotFound(template)
+        source = self.registry.spec(template)["prompt"]
+
+        def uptodate() -> bool:
+            try:
+                return path.stat().st_mtime_ns == mtime
+            except OSError:
+                return False
+
+        return source, str(path), uptodate
+
+
+class PromptRegistry:
+    '''
+    `bytecode_dir` defaults to bytecode_cache_dir(); with bytecode_cache off,
+    templates are only compiled in memory.
+    '''
+    def __init__(self, directory: Path = PROMPTS_DIR, bytecode_dir: Path | None = None, bytecode_cache: bool = True):
+        self.directory = Path(directory)
+        self._specs = {}  # name -> (mtime_ns, parsed file)
+        cache = None
+        if bytecode_cache:
+            try:
+                bytecode_dir = Path(bytecode_dir or bytecode_cache_dir())
+                bytecode_dir.mkdir(parents=True, exist_ok=True)
+                cache = FileSystemBytecodeCache(str(bytecode_dir))
+            except (OSError, RuntimeError):
+                pass  # No writable cache directory (or no home): compile in memory only
+        self.env = Environment(
+            loader=_PromptLoader(self),
+            undefined=StrictUndefined,
+            bytecode_cache=cache,
+            auto_reload=True,  # Checks the loader's uptodate() on each lookup
+        )
+
+    def path(self, name: str) -> Path:
+        return self.directory / f"{name}.yml"
+
+    def spec(self, name: str) -> dict:
+        '''
+        The parsed template file, read again only when its mtime changes.
+        '''
+        path = self.path(name)
+        mtime = path.stat().st_mtime_ns
+        cached = self._specs.get(name)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        with open(path, "r") as file:
+            spec = yaml.load(file, Loader=YamlLoader)
+        self._specs[name] = (mtime, spec)
+        return spec
+
+    def names(self) -> list[str]:
+        return sorted(path.stem for path in self.directory.glob("*.yml"))
+
+    def template(self, name: str) -> Template:
+        return self.env.get_template(name)
+
+
+_registry = None
+
+
+def get_registry() -> PromptRegistry:
+    '''
+    The process-wide registry, created on first use rather than at import.
+    '''
+    global _registry
+    if _registry is None:
+        _registry = PromptRegistry()
+    return _registry
+
+
 def load_prompt(name: str) -> Template:
     '''
     Load a prompt from the prompts directory.
     '''
-    path = Path(__file__).parent / f"{name}.yml"
-    with open(path, "r") as file:
-        template = yaml.safe_load(file)
-    return Template(template['prompt'])
\ No newline at end of file
+    return get_registry().template(name)
+
+
+def load_schema(name: str) -> dict | None:
+    '''
+    Load the JSON schema of a prompt's reply, if the prompt defines one.
+    '''
+    return get_registry().spec(name).get('schema')
@@ -0,0 +1,70 @@
+'''
+Purpose: Select the project context that is relevant to a request.
+
+Responsibilities:
+- Rank file summaries and symbol docstrings from the symbol index with BM25
+- Keep the top results that fit a token budget, so prompts carry the relevant
+  code instead of the whole tree
+- Work fully offline; the index only re-indexes files that changed
+
+Spec:
+- retrieve(query: str, root: Path, max_tokens: int, top_k: int) -> list[dict]
+- format_context(hits: list[dict]) -> str
+- retrieve_context(query: str, root: Path) -> str
+'''
+import os
+from pathlib import Path
+from core.symbol_index import build_index, open_index
+from core.tokens import count_tokens, DEFAULT_MODEL
+
+CONTEXT_TOKENS = int(os.getenv("CODUCTOR_CONTEXT_TOKENS", "1500"))
+CONTEXT_TOP_K = int(os.getenv("CODUCTOR_CONTEXT_TOP_K", "8"))
+CANDIDATES_PER_RESULT = 4  # Extra candidates so small snippets can fill the budget
+
+
+def format_hit(hit: dict) -> str:
+    location = hit["path"]
+    if hit["line"]:
+        location += f":{hit['line']}-{hit['end_line']}"
+    return f"- {location}\n  " + hit["text"].replace("\n", "\n  ")
+
+
+def format_context(hits: list[dict]) -> str:
+    return "\n".join(format_hit(hit) for hit in hits)
+
+
+def retrieve(
+    query: str,
+    root: Path,
+    max_tokens: int = CONTEXT_TOKENS,
+    top_k: int = CONTEXT_TOP_K,
+    model: str = DEFAULT_MODEL,
+    update: bool = True,
+) -> list[dict]:
+    '''
+    Return up to top_k of the most relevant files and symbols for a query,
+    in rank order, whose formatted text fits within max_tokens.
+    '''
+    if update:
+        build_index(root)
+    with open_index(root) as index:
+        candidates = index.search(query, limit=top_k * CANDIDATES_PER_RESULT)
+
+    selected = []
+    used = 0
+    for hit in candidates:
+        if len(selected) >= top_k:
+            break
+        tokens = count_tokens(format_hit(hit), model)
+        if used + tokens > max_tokens:
+            continue  # A smaller, lower-ranked snippet may still fit
+        selected.append(hit)
+        used += tokens
+    return selected
+
+
+def retrieve_context(query: str, root: Path, **options) -> str:
+    '''
+    Relevant project context for a prompt, formatted as a list of snippets.
+    '''
+    return format_context(retrieve(query, root, **options))
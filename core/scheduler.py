@@ -0,0 +1,216 @@
+'''
+Purpose: Rate-limit-aware scheduling of concurrent LLM requests.
+
+Responsibilities:
+- Bound the number of requests in flight, counting a streamed request until
+  its stream is consumed or closed
+- Pace requests and tokens per minute with token buckets, so bursts stay
+  under the account's limits instead of triggering 429 storms
+- Retry rate-limited and transient failures with jittered exponential
+  backoff, honoring the server's Retry-After header
+
+Spec:
+- TokenBucket.acquire(amount: float)
+- RequestScheduler.submit(call: Callable[[], Awaitable], estimated_tokens: int)
+- RequestScheduler.stream(call: Callable[[], Awaitable[AsyncIterator]], estimated_tokens: int) -> AsyncIterator
+- retry_after(error: Exception) -> float | None
+- retryable_errors() -> tuple[type[Exception], ...]
+'''
+import asyncio
+import os
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+MAX_CONCURRENCY = int(os.getenv("CODUCTOR_MAX_CONCURRENCY", "8"))
+REQUESTS_PER_MINUTE = int(os.getenv("CODUCTOR_REQUESTS_PER_MINUTE", "500"))
+TOKENS_PER_MINUTE = int(os.getenv("CODUCTOR_TOKENS_PER_MINUTE", "200000"))
+MAX_RETRIES = int(os.getenv("CODUCTOR_MAX_RETRIES", "5"))
+
+
+def retryable_errors() -> tuple:
+    '''
+    The openai errors worth retrying. openai is imported on first use, not at startup.
+    '''
+    import openai
+    return (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError)
+
+
+def is_rate_limit(error: Exception) -> bool:
+    import openai
+    return isinstance(error, openai.RateLimitError)
+
+
+def retry_after(error: Exception) -> float | None:
+    '''
+    Return the delay in seconds the server asked for, if any.
+    '''
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        # Retry-After may also be an HTTP date
+        return max((parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    '''
+    Token bucket refilled continuously up to `capacity` per minute.
+    '''
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = None
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reset_lock(self):
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, amount: float = 1):
+        '''
+        Wait until `amount` tokens are available, then take them.
+        Requests larger than the bucket wait for a full bucket.
+        '''
+        amount = min(amount, self.capacity)
+        if self._lock is None:
+            self.reset_lock()
+        # Waiters queue on the lock, so they are served in arrival order
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+    def drain(self):
+        '''
+        Empty the bucket, e.g. after the server reported a rate limit.
+        '''
+        self._refill()
+        self.tokens = 0.0
+
+
+class RequestScheduler:
+    def __init__(
+        self,
+        max_concurrency: int = MAX_CONCURRENCY,
+        requests_per_minute: int = REQUESTS_PER_MINUTE,
+        tokens_per_minute: int = TOKENS_PER_MINUTE,
+        max_retries: int = MAX_RETRIES,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        retryable: tuple | None = None,  # Default: retryable_errors()
+    ):
+        self.max_concurrency = max_concurrency
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._retryable = retryable
+        self.paused_until = 0.0
+        self.stats = {"requests": 0, "retries": 0, "rate_limited": 0}
+        self._semaphore = None
+        self._loop = None
+
+    def _bind_loop(self):
+        # asyncio primitives belong to one event loop, so make new ones when
+        # the scheduler is reused from a later asyncio.run()
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self.requests.reset_lock()
+            self.tokens.reset_lock()
+
+    @property
+    def retryable(self) -> tuple:
+        if self._retryable is None:
+            self._retryable = retryable_errors()
+        return self._retryable
+
+    def backoff(self, attempt: int) -> float:
+        '''
+        Full-jitter exponential backoff for the given retry attempt.
+        '''
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    async def _wait_for_pause(self):
+        delay = self.paused_until - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _attempt(self, call, estimated_tokens: int):
+        attempt = 0
+        while True:
+            await self._wait_for_pause()
+            await self.requests.acquire(1)
+            await self.tokens.acquire(estimated_tokens)
+            self.stats["requests"] += 1
+            try:
+                return await call()
+            except self.retryable as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = retry_after(e)
+                if delay is None:
+                    delay = self.backoff(attempt)
+                if is_rate_limit(e):
+                    # Hold every request, not just this one, until the limit resets
+                    self.stats["rate_limited"] += 1
+                    self.paused_until = max(self.paused_until, time.monotonic() + delay)
+                    self.requests.drain()
+                self.stats["retries"] += 1
+                attempt += 1
+                await asyncio.sleep(delay)
+
+    async def submit(self, call, estimated_tokens: int = 0):
+        '''
+        Run `call()` once capacity allows, retrying retryable failures.
+        estimated_tokens is what the request is expected to use (prompt + reply).
+        '''
+        self._bind_loop()
+        async with self._semaphore:
+            return await self._attempt(call, estimated_tokens)
+
+    async def stream(self, call, estimated_tokens: int = 0):
+        '''
+        Like submit, for a call that returns a stream: its items are yielded and
+        the request keeps its slot until the stream is exhausted or closed.
+        Only opening the stream is retried.
+        '''
+        self._bind_loop()
+        async with self._semaphore:
+            stream = await self._attempt(call, estimated_tokens)
+            try:
+                async for item in stream:
+                    yield item
+            finally:
+                # openai's streams have close(), async generators aclose()
+                close = getattr(stream, "aclose", None) or getattr(stream, "close", None)
+                if close is not None:
+                    await close()
@@ -0,0 +1,277 @@
+'''
+Purpose: Schema-checked JSON replies from the LLM.
+
+Responsibilities:
+- Validate replies against the small JSON Schema subset used by the prompt templates
+- Repair common defects locally (text around the object, bare keys, trailing
+  commas, truncated strings and brackets) before spending another round trip
+- Build a re-ask prompt for only the keys that failed, and merge the answer back
+
+Spec:
+- validate(value, schema: dict) -> list[SchemaError]
+- repair_json(text: str) -> str
+- parse_json(text: str) -> tuple[object, bool]
+- failed_keys(value, errors: list[SchemaError]) -> list[str] | None
+- reask_prompt(errors: list[SchemaError], schema: dict | None, keys: list[str] | None) -> str
+- merge(value, patch, keys: list[str] | None) -> object
+'''
+import json
+from typing import NamedTuple
+
+TYPES = {
+    "object": dict,
+    "array": list,
+    "string": str,
+    "integer": int,
+    "number": (int, float),
+    "boolean": bool,
+    "null": type(None),
+}
+LITERALS = {"True": "true", "False": "false", "None": "null"}
+TRUNCATED_LITERALS = {"true": "true", "false": "false", "null": "null", **LITERALS}
+WORD_END = ',:{}[]"'
+
+
+class SchemaError(NamedTuple):
+    path: tuple
+    message: str
+
+    def __str__(self) -> str:
+        return f"{'.'.join(map(str, self.path)) or '<reply>'}: {self.message}"
+
+
+class StructuredOutputError(ValueError):
+    '''
+    Raised when a reply still does not match its schema after repair and re-asking.
+    '''
+    def __init__(self, errors: list[SchemaError]):
+        self.errors = errors
+        super().__init__("Invalid reply from the LLM: " + "; ".join(map(str, errors)))
+
+
+def _is_type(value, name: str) -> bool:
+    if isinstance(value, bool) and name in ("integer", "number"):
+        return False
+    return isinstance(value, TYPES[name])
+
+
+def validate(value, schema: dict, path: tuple = ()) -> list[SchemaError]:
+    '''
+    Check a value against a schema. Supports type, enum, required, properties,
+    additionalProperties, minProperties, items, minItems and minLength.
+    '''
+    expected = schema.get("type")
+    if expected is not None:
+        names = [expected] if isinstance(expected, str) else expected
+        if not any(_is_type(value, name) for name in names):
+            return [SchemaError(path, f"expected {' or '.join(names)}, got {type(value).__name__}")]
+
+    errors = []
+    if "enum" in schema and value not in schema["enum"]:
+        errors.append(SchemaError(path, f"must be one of {schema['enum']}"))
+
+    if isinstance(value, dict):
+        for key in schema.get("required", []):
+            if key not in value:
+                errors.append(SchemaError(path + (key,), "missing"))
+        if len(value) < schema.get("minProperties", 0):
+            errors.append(SchemaError(path, f"needs at least {schema['minProperties']} entries"))
+        properties = schema.get("properties", {})
+        extra = schema.get("additionalProperties", True)
+        for key, item in value.items():
+            if key in properties:
+                errors += validate(item, properties[key], path + (key,))
+            elif isinstance(extra, dict):
+                errors += validate(item, extra, path + (key,))
+            elif extra is False:
+                errors.append(SchemaError(path + (key,), "unexpected key"))
+
+    elif isinstance(value, list):
+        if len(value) < schema.get("minItems", 0):
+            errors.append(SchemaError(path, f"needs at least {schema['minItems']} items"))
+        if "items" in schema:
+            for i, item in enumerate(value):
+                errors += validate(item, schema["items"], path + (i,))
+
+    elif isinstance(value, str) and len(value) < schema.get("minLength", 0):
+        errors.append(SchemaError(path, "must not be empty"))
+
+    return errors
+
+
+def _after_value(stack: list):
+    '''
+    Advance the enclosing container once a key or value has been written.
+    '''
+    if stack:
+        frame = stack[-1]
+        frame[1] = "colon" if frame[0] == "}" and frame[1] == "key" else "comma"
+
+
+def _drop_trailing_comma(out: list):
+    while out and out[-1].isspace():
+        out.pop()
+    if out and out[-1] == ",":
+        out.pop()
+
+
+def _close(frame: list, out: list):
+    _drop_trailing_comma(out)
+    if frame[1] == "colon":
+        out.append(": null")
+    elif frame[1] == "value" and frame[0] == "}":
+        out.append(" null")
+    out.append(frame[0])
+
+
+def _complete_word(word: str) -> str:
+    '''
+    Finish a literal or number the reply was cut off in: tru -> true, 1. -> 1.
+    Anything that cannot be finished becomes null.
+    '''
+    for literal, value in TRUNCATED_LITERALS.items():
+        if literal.startswith(word):
+            return value
+    number = word.rstrip(".eE+-")
+    try:
+        float(number)
+    except ValueError:
+        return "null"
+    return number
+
+
+def repair_json(text: str) -> str:
+    '''
+    Best-effort fix of a malformed JSON reply: drops text around the root value,
+    quotes bare keys, removes trailing commas, escapes raw newlines in strings
+    and closes a reply that was cut off, finishing a truncated literal or
+    number. Missing values become null.
+    '''
+    starts = [i for i in (text.find("{"), text.find("[")) if i != -1]
+    if not starts:
+        return text
+
+    out = []
+    stack = []  # [closer, state] per open container
+    in_string = escape = False
+    i = min(starts)
+    while i < len(text):
+        c = text[i]
+        if in_string:
+            if escape:
+                escape = False
+            elif c == "\\":
+                escape = True
+            elif c == '"':
+                in_string = False
+                _after_value(stack)
+            elif c == "\n":
+                c = "\\n"
+            out.append(c)
+            i += 1
+            continue
+
+        if c.isspace():
+            out.append(c)
+        elif c == '"':
+            in_string = True
+            out.append(c)
+        elif c in "{[":
+            stack.append(["}", "key"] if c == "{" else ["]", "value"])
+            out.append(c)
+        elif c in "}]":
+            _close(stack.pop(), out)
+            if not stack:
+                break  # Ignore anything after the root value
+            _after_value(stack)
+        elif c == ":":
+            out.append(c)
+            stack[-1][1] = "value"
+        elif c == ",":
+            if stack[-1][1] == "comma":
+                out.append(c)
+                stack[-1][1] = "key" if stack[-1][0] == "}" else "value"
+        else:
+            # A bare word: an unquoted key, a literal or a number
+            end = i
+            while end < len(text) and text[end] not in WORD_END and not text[end].isspace():
+                end += 1
+            word = text[i:end]
+            if stack[-1][0] == "}" and stack[-1][1] == "key":
+                out.append(json.dumps(word))
+            elif end == len(text):
+                out.append(_complete_word(word))
+            else:
+                out.append(LITERALS.get(word, word))
+            _after_value(stack)
+            i = end
+            continue
+        i += 1
+
+    if in_string:
+        if escape:
+            out.pop()
+        out.append('"')
+        _after_value(stack)
+    while stack:
+        _close(stack.pop(), out)
+        _after_value(stack)
+    return "".join(out)
+
+
+def parse_json(text: str) -> tuple[object, bool]:
+    '''
+    Parse a reply, repairing it locally if needed.
+    Returns the value and whether it had to be repaired. Raises ValueError if
+    the reply is beyond repair.
+    '''
+    try:
+        return json.loads(text), False
+    except ValueError:
+        pass
+    return json.loads(repair_json(text)), True
+
+
+def failed_keys(value, errors: list[SchemaError]) -> list[str] | None:
+    '''
+    Top-level keys that need to be asked for again, or None for the whole reply.
+    '''
+    if not isinstance(value, dict) or any(not error.path for error in errors):
+        return None
+    return list(dict.fromkeys(error.path[0] for error in errors))
+
+
+def reask_prompt(errors: list[SchemaError], schema: dict | None, keys: list[str] | None) -> str:
+    '''
+    Follow-up prompt asking only for the parts of the reply that failed.
+    '''
+    problems = "\n".join(f"- {error}" for error in errors)
+    if keys is None:
+        request = "Return the whole reply again as a single valid JSON object."
+        part = schema
+    else:
+        request = f"Return only a JSON object with corrected values for these keys: {', '.join(keys)}. Do not repeat the other keys."
+        schema = schema or {}
+        extra = schema.get("additionalProperties")
+        part = {
+            "type": "object",
+            "required": keys,
+            "properties": {key: schema.get("properties", {}).get(key, extra if isinstance(extra, dict) else {}) for key in keys},
+        }
+    prompt = f"Your previous reply had these problems:\n{problems}\n\n{request}"
+    if part:
+        prompt += f"\nIt must match this JSON schema:\n{json.dumps(part)}"
+    return prompt + "\nDo not use markdown format."
+
+
+def merge(value, patch, keys: list[str] | None):
+    '''
+    Apply a re-ask answer: replace the failed keys, or the whole reply.
+    '''
+    if keys is None:
+        return patch
+    if not isinstance(patch, dict):
+        return value
+    merged = dict(value)
+    merged.update({key: patch[key] for key in keys if key in patch})
+    return merged
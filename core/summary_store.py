@@ -0,0 +1,115 @@
+'''
+Purpose: Compact store of per-file analysis summaries.
+
+Responsibilities:
+- Write summaries as JSONL, streaming records to disk in batches
+- Keep a per-file key list next to the log's offset index, so one file's
+  summary is read without loading the others
+- Replace the store atomically, so readers never see a half-written one
+- Export to YAML for people to read
+
+Spec:
+- SummaryStore(path: Path)
+- SummaryStore.write(summaries: Iterable[dict]) -> int
+- SummaryStore.get(file: str) -> dict | None
+- SummaryStore.files() -> list[str]
+- SummaryStore.export_yaml(path: Path) -> int
+'''
+import os
+from pathlib import Path
+from typing import Iterable, Iterator
+import yaml
+from core.jsonl_log import JsonlLog
+
+WRITE_BATCH = 512  # Records per write; bounds memory without a syscall per record
+YamlDumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+
+class SummaryStore:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.log = JsonlLog(self.path)
+        self.keys_path = self.path.with_name(self.path.name + ".keys")
+        self._positions = None
+
+    def exists(self) -> bool:
+        return self.log.exists()
+
+    def __len__(self) -> int:
+        return len(self.log) if self.exists() else 0
+
+    def write(self, summaries: Iterable[dict]) -> int:
+        '''
+        Replace the store with `summaries`, writing them in batches as they are
+        produced. Returns the number of records written.
+        '''
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = JsonlLog(self.path.with_name(self.path.name + ".tmp"))
+        for stale in (tmp.path, tmp.index_path):
+            stale.unlink(missing_ok=True)
+        tmp_keys = self.keys_path.with_name(self.keys_path.name + ".tmp")
+
+        count = 0
+        batch = []
+        with open(tmp_keys, "w", encoding="utf-8") as keys:
+            for summary in summaries:
+                batch.append(summary)
+                keys.write(summary["file"] + "\n")
+                if len(batch) >= WRITE_BATCH:
+                    tmp.append(batch)
+                    count += len(batch)
+                    batch = []
+            tmp.append(batch)
+            count += len(batch)
+
+        # If a crash lands between the renames, the keys are rebuilt from the log
+        os.replace(tmp.path, self.log.path)
+        os.replace(tmp.index_path, self.log.index_path)
+        os.replace(tmp_keys, self.keys_path)
+        self.log = JsonlLog(self.path)
+        self._positions = None
+        return count
+
+    def _load_positions(self) -> dict[str, int]:
+        if self._positions is None:
+            try:
+                with open(self.keys_path, "r", encoding="utf-8") as f:
+                    keys = f.read().splitlines()
+            except OSError:
+                keys = None
+            if keys is None or len(keys) != len(self):
+                keys = [record["file"] for record in self]
+            self._positions = {key: i for i, key in enumerate(keys)}
+        return self._positions
+
+    def files(self) -> list[str]:
+        return list(self._load_positions())
+
+    def get(self, file: str) -> dict | None:
+        '''
+        Read one file's summary by seeking to its offset.
+        '''
+        position = self._load_positions().get(str(file))
+        return None if position is None else self.log.read(position)
+
+    def __iter__(self) -> Iterator[dict]:
+        '''
+        Stream every summary without holding the whole store in memory.
+        '''
+        if self.exists():
+            yield from self.log
+
+    def export_yaml(self, path: Path) -> int:
+        '''
+        Write the summaries as a YAML list, one record at a time.
+        '''
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        count = 0
+        with open(path, "w", encoding="utf-8") as f:
+            for record in self:
+                yaml.dump([record], f, Dumper=YamlDumper, sort_keys=False)
+                count += 1
+            if not count:
+                f.write("[]\n")
+        return count
@@ -0,0 +1,319 @@
+'''
+Purpose: Queryable index of the project's symbols and cross-references.
+
+Responsibilities:
+- Store definitions (with line ranges), imports and call/inheritance
+  references from project_analyzer in SQLite under .coductor/
+- Update only the files whose analysis changed, and drop deleted files
+- Answer lookups such as "who calls X" or "what is defined in module Y"
+  without rescanning the tree
+- Keep a BM25 term index of file summaries and symbol docstrings for
+  relevance search
+
+Spec:
+- SymbolIndex(path: Path)
+- SymbolIndex.update(results: list[dict], root: Path) -> dict
+- SymbolIndex.definitions(name: str) -> list[dict]
+- SymbolIndex.callers(name: str) -> list[dict]
+- SymbolIndex.module_symbols(module: str) -> list[dict]
+- SymbolIndex.imports_of(module: str) -> list[dict]
+- SymbolIndex.search(query: str, limit: int) -> list[dict]
+- open_index(root: Path) -> SymbolIndex
+- build_index(root: Path) -> dict
+'''
+import hashlib
+import json
+import math
+import re
+import sqlite3
+from collections import Counter
+from pathlib import Path
+from core.analysis_daemon import daemon_status, fetch_results
+from core.project_analyzer import analyze_project, records
+
+INDEX_FILE = Path(".coductor") / "index.db"  # Relative to the project root
+BM25_K1 = 1.2
+BM25_B = 0.75
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "if", "in", "into", "is", "it",
+    "of", "on", "or", "the", "this", "to", "with", "def", "self", "none", "return", "returns",
+}
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    module TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    docstring TEXT,
+    summary TEXT
+);
+CREATE TABLE IF NOT EXISTS symbols (
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    qualname TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    line INTEGER,
+    end_line INTEGER,
+    docstring TEXT
+);
+CREATE TABLE IF NOT EXISTS imports (
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    module TEXT NOT NULL,
+    name TEXT,
+    alias TEXT,
+    line INTEGER
+);
+CREATE TABLE IF NOT EXISTS refs (
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    caller TEXT NOT NULL,
+    target TEXT NOT NULL,
+    name TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    line INTEGER
+);
+CREATE TABLE IF NOT EXISTS docs (
+    id INTEGER PRIMARY KEY,
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    qualname TEXT,
+    line INTEGER,
+    end_line INTEGER,
+    text TEXT NOT NULL,
+    length INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS postings (
+    term TEXT NOT NULL,
+    doc_id INTEGER NOT NULL REFERENCES docs(id) ON DELETE CASCADE,
+    tf INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_module ON files(module);
+CREATE INDEX IF NOT EXISTS symbols_name ON symbols(name);
+CREATE INDEX IF NOT EXISTS symbols_qualname ON symbols(qualname);
+CREATE INDEX IF NOT EXISTS symbols_file ON symbols(file_id);
+CREATE INDEX IF NOT EXISTS imports_file ON imports(file_id);
+CREATE INDEX IF NOT EXISTS refs_name ON refs(name);
+CREATE INDEX IF NOT EXISTS refs_file ON refs(file_id);
+CREATE INDEX IF NOT EXISTS docs_file ON docs(file_id);
+CREATE INDEX IF NOT EXISTS postings_term ON postings(term);
+CREATE INDEX IF NOT EXISTS postings_doc ON postings(doc_id);
+'''
+
+
+def tokenize(text: str) -> list[str]:
+    '''
+    Lowercase search terms, splitting snake_case and camelCase identifiers.
+    '''
+    words = re.findall(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+", text or "")
+    return [word.lower() for word in words if len(word) > 1 and word.lower() not in STOPWORDS]
+
+
+def module_name(path: str) -> str:
+    '''
+    Dotted module name of a path relative to the project root, e.g. core/agent.py -> core.agent.
+    '''
+    parts = path.split("/")
+    parts[-1] = parts[-1].rsplit(".", 1)[0]
+    if parts[-1] == "__init__" and len(parts) > 1:
+        parts.pop()
+    return ".".join(parts)
+
+
+def _digest(result: dict) -> str:
+    payload = json.dumps({k: v for k, v in result.items() if k != "file"}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SymbolIndex:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(self.path)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA foreign_keys = ON")
+        self.db.execute("PRAGMA journal_mode = WAL")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def update(self, results: list[dict], root: Path) -> dict:
+        '''
+        Bring the index in line with a full set of analysis results.
+        Files whose results are unchanged are left alone.
+        Returns counts of updated, unchanged and removed files.
+        '''
+        root = Path(root)
+        stored = {row["path"]: row["digest"] for row in self.db.execute("SELECT path, digest FROM files")}
+        seen = set()
+        updated = 0
+        with self.db:  # One transaction for the whole update
+            for result in results:
+                rel = Path(result["file"]).relative_to(root).as_posix()
+                seen.add(rel)
+                digest = _digest(result)
+                if stored.get(rel) == digest:
+                    continue
+                self._replace_file(rel, digest, result)
+                updated += 1
+            removed = [path for path in stored if path not in seen]
+            self.db.executemany("DELETE FROM files WHERE path = ?", [(path,) for path in removed])
+        return {"updated": updated, "unchanged": len(seen) - updated, "removed": len(removed)}
+
+    def _replace_file(self, rel: str, digest: str, result: dict):
+        self.db.execute("DELETE FROM files WHERE path = ?", (rel,))
+        file_id = self.db.execute(
+            "INSERT INTO files (path, module, digest, docstring, summary) VALUES (?, ?, ?, ?, ?)",
+            (rel, module_name(rel), digest, result.get("docstring"), result.get("summary")),
+        ).lastrowid
+        symbols = records(result, "symbols")
+        self.db.executemany(
+            "INSERT INTO symbols VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(file_id, s.name, s.qualname, s.kind, s.line, s.end_line, s.docstring) for s in symbols],
+        )
+        self.db.executemany(
+            "INSERT INTO imports VALUES (?, ?, ?, ?, ?)",
+            [(file_id, i.module, i.name, i.alias, i.line) for i in records(result, "imports")],
+        )
+        self.db.executemany(
+            "INSERT INTO refs VALUES (?, ?, ?, ?, ?, ?)",
+            [(file_id, r.caller, r.target, r.name, r.kind, r.line) for r in records(result, "references")],
+        )
+
+        # Searchable documents: the file's summary plus one per documented symbol
+        docs = [("file", None, None, None, "\n".join(filter(None, [rel, result.get("docstring"), result.get("summary")])))]
+        for symbol in symbols:
+            text = f"{symbol.kind} {symbol.qualname}{symbol.signature} in {rel}"
+            if symbol.docstring:
+                text += f": {symbol.docstring}"
+            docs.append((symbol.kind, symbol.qualname, symbol.line, symbol.end_line, text))
+        for kind, qualname, line, end_line, text in docs:
+            terms = Counter(tokenize(text))
+            doc_id = self.db.execute(
+                "INSERT INTO docs (file_id, kind, qualname, line, end_line, text, length) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (file_id, kind, qualname, line, end_line, text, sum(terms.values())),
+            ).lastrowid
+            self.db.executemany("INSERT INTO postings VALUES (?, ?, ?)", [(term, doc_id, tf) for term, tf in terms.items()])
+
+    def _query(self, sql: str, params: tuple) -> list[dict]:
+        return [dict(row) for row in self.db.execute(sql, params)]
+
+    def definitions(self, name: str) -> list[dict]:
+        '''
+        Where a symbol is defined, by plain or qualified name (e.g. save or JsonlLog.append).
+        '''
+        return self._query(
+            "SELECT f.path, f.module, s.qualname, s.kind, s.line, s.end_line, s.docstring "
+            "FROM symbols s JOIN files f ON f.id = s.file_id "
+            "WHERE s.name = ? OR s.qualname = ? ORDER BY f.path, s.line",
+            (name, name),
+        )
+
+    def callers(self, name: str) -> list[dict]:
+        '''
+        Who calls (or subclasses) a symbol. Matches the last part of the call
+        target, so `callers("append")` also finds `session_log.append(...)`.
+        '''
+        short = name.rsplit(".", 1)[-1]
+        return self._query(
+            "SELECT f.path, f.module, r.caller, r.target, r.kind, r.line "
+            "FROM refs r JOIN files f ON f.id = r.file_id "
+            "WHERE r.name = ? ORDER BY f.path, r.line",
+            (short,),
+        )
+
+    def module_symbols(self, module: str) -> list[dict]:
+        '''
+        What is defined in a module, given as a dotted name or a path.
+        '''
+        if "/" in module or module.endswith(".py"):
+            module = module_name(module)
+        return self._query(
+            "SELECT f.path, s.qualname, s.kind, s.line, s.end_line, s.docstring "
+            "FROM symbols s JOIN files f ON f.id = s.file_id "
+            "WHERE f.module = ? ORDER BY s.line",
+            (module,),
+        )
+
+    def imports_of(self, module: str) -> list[dict]:
+        '''
+        Which files import a module, directly or with `from module import ...`.
+        '''
+        return self._query(
+            "SELECT f.path, i.module, i.name, i.alias, i.line "
+            "FROM imports i JOIN files f ON f.id = i.file_id "
+            "WHERE i.module = ? OR i.module LIKE ? ORDER BY f.path, i.line",
+            (module, module + ".%"),
+        )
+
+    def search(self, query: str, limit: int = 10) -> list[dict]:
+        '''
+        Rank file summaries and symbols against a free-text query with BM25.
+        '''
+        terms = sorted(set(tokenize(query)))
+        if not terms:
+            return []
+        total, avg_length = self.db.execute("SELECT COUNT(*), AVG(length) FROM docs").fetchone()
+        if not total:
+            return []
+        avg_length = avg_length or 1.0
+
+        placeholders = ", ".join("?" * len(terms))
+        rows = self.db.execute(
+            f"SELECT p.term, p.doc_id, p.tf, d.length FROM postings p JOIN docs d ON d.id = p.doc_id "
+            f"WHERE p.term IN ({placeholders})",
+            terms,
+        ).fetchall()
+        frequency = Counter(row["term"] for row in rows)
+        scores = Counter()
+        for row in rows:
+            df = frequency[row["term"]]
+            idf = math.log(1 + (total - df + 0.5) / (df + 0.5))
+            norm = row["tf"] + BM25_K1 * (1 - BM25_B + BM25_B * row["length"] / avg_length)
+            scores[row["doc_id"]] += idf * row["tf"] * (BM25_K1 + 1) / norm
+
+        ranked = scores.most_common(limit)
+        if not ranked:
+            return []
+        ids = [doc_id for doc_id, _ in ranked]
+        docs = {
+            row["id"]: dict(row) for row in self.db.execute(
+                f"SELECT d.id, f.path, d.kind, d.qualname, d.line, d.end_line, d.text "
+                f"FROM docs d JOIN files f ON f.id = d.file_id WHERE d.id IN ({', '.join('?' * len(ids))})",
+                ids,
+            )
+        }
+        return [{**docs[doc_id], "score": score} for doc_id, score in ranked]
+
+    def stats(self) -> dict:
+        return {
+            table: self.db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ("files", "symbols", "imports", "refs", "docs")
+        }
+
+
+def open_index(root: Path) -> SymbolIndex:
+    return SymbolIndex(Path(root) / INDEX_FILE)
+
+
+def build_index(root: Path, use_cache: bool = True) -> dict:
+    '''
+    Analyze the project (reusing cached analysis, or the warm analysis of a
+    running `analyze --watch` daemon) and update its index.
+    Returns counts of updated, unchanged and removed files.
+    '''
+    status = daemon_status(root) if use_cache else None
+    if status and status.get("current"):
+        # The daemon has already indexed its latest analysis
+        return {"updated": 0, "unchanged": status["files"], "removed": 0}
+    results = fetch_results(root) if status else None
+    if results is None:
+        results = analyze_project(Path(root), use_cache=use_cache)
+    with open_index(root) as index:
+        return index.update(results, root)
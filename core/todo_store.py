@@ -0,0 +1,204 @@
+'''
+Purpose: The project's TODO list, stored in SQLite and shown in TODO.md.
+
+Responsibilities:
+- Store tasks under .coductor/ with their category and status, indexed by
+  id, status, category and task text
+- Apply adds and status changes in bulk, each batch in one transaction
+- Render TODO.md as a view of the store, re-rendering only the categories
+  that changed, and leaving the rest of the file as it was written
+- Import the old .coductor/todo.yml list once
+
+Spec:
+- TodoStore(path: Path)
+- TodoStore.add(category: str, tasks: list[str], status: str) -> list[int]
+- TodoStore.set_status(ids: int | Iterable[int], status: str) -> int
+- TodoStore.set_status_by_task(task: str, status: str) -> int
+- TodoStore.items(status: str | None, category: str | None) -> list[dict]
+- TodoStore.render(path: Path) -> int
+- open_todos(root: Path) -> TodoStore
+'''
+import os
+import sqlite3
+from pathlib import Path
+from typing import Iterable
+
+TODO_FILE = Path(".coductor") / "todo.db"  # Relative to the project root
+DEFAULT_CATEGORY = "General"
+DONE_STATUSES = {"done", "complete", "completed"}
+VIEW_START = "<!-- coductor:todo:start -->"
+VIEW_END = "<!-- coductor:todo:end -->"
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS todos (
+    id INTEGER PRIMARY KEY,
+    category TEXT NOT NULL,
+    task TEXT NOT NULL,
+    status TEXT NOT NULL,
+    UNIQUE (category, task)
+);
+CREATE TABLE IF NOT EXISTS sections (
+    category TEXT PRIMARY KEY,
+    text TEXT
+);
+CREATE INDEX IF NOT EXISTS todos_status ON todos(status);
+CREATE INDEX IF NOT EXISTS todos_category ON todos(category);
+CREATE INDEX IF NOT EXISTS todos_task ON todos(task);
+
+-- A section's rendered text is cleared whenever one of its tasks changes
+CREATE TRIGGER IF NOT EXISTS todos_insert AFTER INSERT ON todos BEGIN
+    INSERT INTO sections (category, text) VALUES (NEW.category, NULL)
+        ON CONFLICT (category) DO UPDATE SET text = NULL;
+END;
+CREATE TRIGGER IF NOT EXISTS todos_update AFTER UPDATE ON todos BEGIN
+    UPDATE sections SET text = NULL WHERE category IN (OLD.category, NEW.category);
+END;
+CREATE TRIGGER IF NOT EXISTS todos_delete AFTER DELETE ON todos BEGIN
+    UPDATE sections SET text = NULL WHERE category = OLD.category;
+END;
+'''
+
+
+def render_section(category: str, items: list[dict]) -> str:
+    lines = [f"## {category}"]
+    for item in items:
+        mark = "x" if item["status"] in DONE_STATUSES else " "
+        lines.append(f"- [{mark}] {item['task']}")
+    return "\n".join(lines)
+
+
+class TodoStore:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(self.path)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode = WAL")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.db.execute("SELECT COUNT(*) FROM todos").fetchone()[0]
+
+    def add(self, category: str, tasks: list[str], status: str = "pending") -> list[int]:
+        '''
+        Add tasks under a category, in one transaction. Tasks already listed
+        under the category are kept as they are. Returns the tasks' ids.
+        '''
+        with self.db:
+            self.db.executemany(
+                "INSERT OR IGNORE INTO todos (category, task, status) VALUES (?, ?, ?)",
+                [(category, task, status) for task in tasks],
+            )
+            return [
+                self.db.execute("SELECT id FROM todos WHERE category = ? AND task = ?", (category, task)).fetchone()[0]
+                for task in tasks
+            ]
+
+    def set_status(self, ids: int | Iterable[int], status: str) -> int:
+        '''
+        Set the status of one or many tasks by id, in one transaction.
+        Returns how many tasks changed.
+        '''
+        ids = [ids] if isinstance(ids, int) else list(ids)
+        with self.db:
+            cursor = self.db.executemany(
+                "UPDATE todos SET status = ? WHERE id = ? AND status != ?",
+                [(status, todo_id, status) for todo_id in ids],
+            )
+        return cursor.rowcount
+
+    def set_status_by_task(self, task: str, status: str) -> int:
+        with self.db:
+            cursor = self.db.execute("UPDATE todos SET status = ? WHERE task = ? AND status != ?", (status, task, status))
+        return cursor.rowcount
+
+    def remove(self, ids: int | Iterable[int]) -> int:
+        ids = [ids] if isinstance(ids, int) else list(ids)
+        with self.db:
+            cursor = self.db.executemany("DELETE FROM todos WHERE id = ?", [(todo_id,) for todo_id in ids])
+        return cursor.rowcount
+
+    def get(self, todo_id: int) -> dict | None:
+        row = self.db.execute("SELECT * FROM todos WHERE id = ?", (todo_id,)).fetchone()
+        return dict(row) if row else None
+
+    def items(self, status: str | None = None, category: str | None = None) -> list[dict]:
+        '''
+        Tasks in the order they were added, optionally only those with a
+        status or in a category.
+        '''
+        query = "SELECT * FROM todos"
+        clauses = [(column, value) for column, value in (("status", status), ("category", category)) if value is not None]
+        if clauses:
+            query += " WHERE " + " AND ".join(f"{column} = ?" for column, _ in clauses)
+        return [dict(row) for row in self.db.execute(query + " ORDER BY id", [value for _, value in clauses])]
+
+    def categories(self) -> list[str]:
+        return [row[0] for row in self.db.execute("SELECT category FROM sections ORDER BY rowid")]
+
+    def render(self, path: Path) -> int:
+        '''
+        Bring the TODO view in `path` up to date. Only categories whose tasks
+        changed are rendered again; text outside the view's markers is kept,
+        and a file without the markers gets the view appended. Returns the
+        number of categories rendered.
+        '''
+        path = Path(path)
+        rendered = {}  # Category -> its new text, None once it has no tasks
+        for (category,) in self.db.execute("SELECT category FROM sections WHERE text IS NULL").fetchall():
+            items = self.items(category=category)
+            rendered[category] = render_section(category, items) if items else None
+        sections = [
+            rendered.get(category, text)
+            for category, text in self.db.execute("SELECT category, text FROM sections ORDER BY rowid")
+            if rendered.get(category, text) is not None
+        ]
+        try:
+            current = path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            current = "# TODO\n"
+        if not rendered and (VIEW_START in current or not sections):
+            return 0
+
+        view = "\n\n".join([VIEW_START, *sections, VIEW_END])
+        start, end = current.find(VIEW_START), current.find(VIEW_END)
+        if start != -1 and end > start:
+            content = current[:start] + view + current[end + len(VIEW_END):]
+        else:
+            content = current.rstrip("\n") + "\n\n" + view + "\n"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        temp.write_text(content, encoding="utf-8")
+        os.replace(temp, path)
+
+        with self.db:  # Only once the view is written, so a failed write is retried next time
+            self.db.executemany("UPDATE sections SET text = ? WHERE category = ?", [(text, c) for c, text in rendered.items() if text])
+            self.db.executemany("DELETE FROM sections WHERE category = ?", [(c,) for c, text in rendered.items() if not text])
+        return len(rendered)
+
+    def import_list(self, todos: list[dict], replace: bool = False) -> int:
+        '''
+        Add entries of the old todo.yml format ({"task", "status"}, optional
+        "category"), with replace dropping every other task in the same transaction.
+        '''
+        with self.db:
+            if replace:
+                self.db.execute("DELETE FROM todos")
+            cursor = self.db.executemany(
+                "INSERT OR IGNORE INTO todos (category, task, status) VALUES (?, ?, ?)",
+                [(todo.get("category", DEFAULT_CATEGORY), todo["task"], todo.get("status", "pending")) for todo in todos],
+            )
+        return cursor.rowcount
+
+
+def open_todos(root: Path) -> TodoStore:
+    return TodoStore(Path(root) / TODO_FILE)
@@ -0,0 +1,127 @@
+'''
+Purpose: Token counting helpers for prompts and chat history.
+
+Responsibilities:
+- Count tokens in raw text for a model
+- Count tokens in a list of chat messages, including per-message overhead
+- Cache encoders per model and token counts per message, so history is only
+  encoded once
+
+Spec:
+- get_encoding(model: str) -> tiktoken.Encoding
+- count_tokens(text: str, model: str) -> int
+- count_message_tokens(message: dict, model: str) -> int
+- count_chat_tokens(messages: list[dict], model: str) -> int
+- annotate_token_counts(messages: list[dict], model: str) -> int
+- api_messages(messages: list[dict]) -> list[dict]
+'''
+from functools import lru_cache
+import tiktoken
+
+DEFAULT_MODEL = "gpt-4o-mini"
+FALLBACK_ENCODING = "o200k_base"  # For model names tiktoken does not know
+MESSAGE_FIELDS = ("role", "content", "name")  # Fields sent to the API, the rest is metadata
+TOKENS_PER_MESSAGE = 3  # system, user, assistant structure
+TOKENS_PER_NAME = 1     # if 'name' is used in the message
+
+
+class ApproximateEncoding:
+    '''
+    Rough stand-in tokenizer (about four characters per token), used when the
+    real encoding cannot be loaded, e.g. offline before tiktoken has cached it.
+    '''
+    name = "approximate"
+
+    def encode(self, text: str) -> list[int]:
+        return [0] * ((len(text) + 3) // 4)
+
+    def encode_batch(self, texts: list[str]) -> list[list[int]]:
+        return [self.encode(text) for text in texts]
+
+
+@lru_cache(maxsize=None)
+def get_encoding(model: str = DEFAULT_MODEL):
+    '''
+    Return the tokenizer for a model. Loading one is slow, so it is cached.
+    '''
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding(FALLBACK_ENCODING)
+    except Exception:
+        # tiktoken downloads encodings on first use, which fails offline
+        return ApproximateEncoding()
+
+
+def _encoding_key(encoding) -> str:
+    # Token counts are stored per encoding, since several models share one
+    return str(getattr(encoding, "name", encoding))
+
+
+def count_tokens(text: str, model: str = DEFAULT_MODEL) -> int:
+    return len(get_encoding(model).encode(text))
+
+
+def count_message_tokens(message: dict, model: str = DEFAULT_MODEL) -> int:
+    '''
+    Count the tokens a single chat message costs, including its overhead.
+    The count is stored on the message under "tokens" so it is only encoded once.
+    '''
+    encoding = get_encoding(model)
+    key = _encoding_key(encoding)
+    cached = message.get("tokens", {})
+    if key in cached:
+        return cached[key]
+
+    num_tokens = TOKENS_PER_MESSAGE
+    for field in MESSAGE_FIELDS:
+        if field in message:
+            num_tokens += len(encoding.encode(message[field]))
+            if field == "name":
+                num_tokens += TOKENS_PER_NAME
+
+    message["tokens"] = {**cached, key: num_tokens}
+    return num_tokens
+
+
+def count_chat_tokens(messages: list[dict], model: str = DEFAULT_MODEL) -> int:
+    num_tokens = sum(count_message_tokens(message, model) for message in messages)
+    num_tokens += 3         # Every reply has priming tokens
+    return num_tokens
+
+
+def annotate_token_counts(messages: list[dict], model: str = DEFAULT_MODEL) -> int:
+    '''
+    Store token counts on every message that does not have one yet.
+    Missing messages are encoded in one batch, which is much faster when
+    importing an old session than encoding them one at a time.
+    Returns the number of messages that were counted.
+    '''
+    encoding = get_encoding(model)
+    key = _encoding_key(encoding)
+    missing = [message for message in messages if key not in message.get("tokens", {})]
+    if not missing:
+        return 0
+
+    texts = []
+    for message in missing:
+        texts.extend(message[field] for field in MESSAGE_FIELDS if field in message)
+    encoded = iter(encoding.encode_batch(texts))
+
+    for message in missing:
+        num_tokens = TOKENS_PER_MESSAGE
+        for field in MESSAGE_FIELDS:
+            if field in message:
+                num_tokens += len(next(encoded))
+                if field == "name":
+                    num_tokens += TOKENS_PER_NAME
+        message["tokens"] = {**message.get("tokens", {}), key: num_tokens}
+    return len(missing)
+
+
+def api_messages(messages: list[dict]) -> list[dict]:
+    '''
+    Strip stored metadata (such as token counts) before a request is sent.
+    '''
+    return [{field: message[field] for field in MESSAGE_FIELDS if field in message} for message in messages]
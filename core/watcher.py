@@ -0,0 +1,238 @@
+'''
+Purpose: Report which project files changed, in debounced batches.
+
+Responsibilities:
+- Watch the project tree with inotify, called through ctypes so no extra
+  dependency is needed
+- Fall back to polling file stats where inotify is unavailable
+- Skip excluded directories, as file discovery does
+- Coalesce bursts of events (an editor saving, a checkout) into one batch
+
+Spec:
+- open_watcher(root: Path, extensions: tuple[str, ...], poll: bool = False) -> InotifyWatcher | PollingWatcher
+- watcher.changes(timeout: float | None) -> set[str] | None
+- watcher.close()
+'''
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import time
+from pathlib import Path
+from core.file_discovery import discover_files, DEFAULT_EXCLUDED_DIRS, IGNORE_FILES
+
+DEBOUNCE = float(os.getenv("CODUCTOR_WATCH_DEBOUNCE", "0.2"))     # Quiet time that ends a batch
+MAX_BATCH_DELAY = 2.0                                              # A steady stream of events still flushes
+POLL_INTERVAL = float(os.getenv("CODUCTOR_WATCH_POLL_INTERVAL", "1.0"))
+
+# From <sys/inotify.h>
+IN_MODIFY = 0x2
+IN_CLOSE_WRITE = 0x8
+IN_MOVED_FROM = 0x40
+IN_MOVED_TO = 0x80
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_DELETE_SELF = 0x400
+IN_MOVE_SELF = 0x800
+IN_Q_OVERFLOW = 0x4000
+IN_IGNORED = 0x8000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = (
+    IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE
+    | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+)
+EVENT = struct.Struct("iIII")  # wd, mask, cookie, len; followed by the name
+READ_SIZE = 64 * 1024
+
+
+def _libc():
+    name = ctypes.util.find_library("c") or "libc.so.6"
+    libc = ctypes.CDLL(name, use_errno=True)
+    if not hasattr(libc, "inotify_init1"):
+        raise OSError("inotify is not available on this platform")
+    return libc
+
+
+class InotifyWatcher:
+    '''
+    Watches every non-excluded directory under root with one inotify instance.
+    '''
+    def __init__(self, root: Path, extensions: tuple[str, ...] = (".py",), excluded_dirs: set[str] = DEFAULT_EXCLUDED_DIRS):
+        self.root = str(root)
+        self.extensions = tuple(extensions)
+        self.excluded_dirs = excluded_dirs
+        self.libc = _libc()
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self.dirs = {}  # Watch descriptor -> directory path relative to root
+        try:
+            self._add_tree(self.root, "", strict=True)
+        except OSError:
+            os.close(self.fd)
+            raise
+
+    def _add_watch(self, path: str) -> int:
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), path)
+        return wd
+
+    def _add_tree(self, directory: str, rel: str, strict: bool = False) -> set[str]:
+        '''
+        Watch a directory and everything below it. Returns the source files
+        found, so a directory created or moved in with files already in it is
+        not missed. With strict, running out of watches raises so the caller
+        can fall back to polling.
+        '''
+        found = set()
+        stack = [(directory, rel)]
+        while stack:
+            directory, rel = stack.pop()
+            try:
+                self.dirs[self._add_watch(directory)] = rel
+                with os.scandir(directory) as it:
+                    entries = list(it)
+            except OSError as e:
+                if strict and (directory == self.root or e.errno == errno.ENOSPC):
+                    raise  # Out of watches: a partial watch would miss changes
+                continue  # Removed already, or not readable
+            for entry in entries:
+                entry_rel = f"{rel}/{entry.name}" if rel else entry.name
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in self.excluded_dirs:
+                            stack.append((entry.path, entry_rel))
+                    elif entry.name.endswith(self.extensions):
+                        found.add(entry_rel)
+                except OSError:
+                    continue
+        return found
+
+    def _read(self, changed: set[str]) -> bool:
+        '''
+        Drain pending events into `changed`. Returns True when the set of
+        files may have changed in ways that need a rescan.
+        '''
+        rescan = False
+        try:
+            data = os.read(self.fd, READ_SIZE)
+        except BlockingIOError:
+            return rescan
+        offset = 0
+        while offset + EVENT.size <= len(data):
+            wd, mask, _, length = EVENT.unpack_from(data, offset)
+            name = os.fsdecode(data[offset + EVENT.size:offset + EVENT.size + length].rstrip(b"\0"))
+            offset += EVENT.size + length
+
+            if mask & IN_Q_OVERFLOW:
+                rescan = True  # Events were dropped
+                continue
+            if mask & IN_IGNORED:
+                self.dirs.pop(wd, None)
+                continue
+            directory = self.dirs.get(wd)
+            if directory is None:
+                continue
+            if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                rescan = rescan or directory == ""
+                continue
+            rel = f"{directory}/{name}" if directory else name
+            if mask & IN_ISDIR:
+                if name in self.excluded_dirs:
+                    continue
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    changed |= self._add_tree(os.path.join(self.root, rel), rel)
+                else:
+                    rescan = True  # A directory left: everything below it went too
+            elif name in IGNORE_FILES:
+                rescan = True  # Ignore rules changed
+            elif name.endswith(self.extensions):
+                changed.add(rel)
+        return rescan
+
+    def changes(self, timeout: float | None = None) -> set[str] | None:
+        '''
+        Wait up to `timeout` seconds (forever if None) for changes, then keep
+        collecting until things are quiet for DEBOUNCE seconds. Returns the
+        changed paths relative to root (empty on timeout), or None when the
+        whole tree should be rescanned.
+        '''
+        changed = set()
+        rescan = False
+        wait = timeout
+        flush_at = None
+        while True:
+            ready, _, _ = select.select([self.fd], [], [], wait)
+            if not ready:
+                break
+            rescan = self._read(changed) or rescan
+            now = time.monotonic()
+            flush_at = flush_at or now + MAX_BATCH_DELAY
+            if now >= flush_at:
+                break
+            wait = min(DEBOUNCE, flush_at - now)
+        return None if rescan else changed
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class PollingWatcher:
+    '''
+    Finds changes by comparing file stats between scans.
+    '''
+    def __init__(self, root: Path, extensions: tuple[str, ...] = (".py",), excluded_dirs: set[str] = DEFAULT_EXCLUDED_DIRS, interval: float = POLL_INTERVAL):
+        self.root = Path(root)
+        self.extensions = tuple(extensions)
+        self.excluded_dirs = excluded_dirs
+        self.interval = interval
+        self.snapshot = self._scan()
+
+    def _scan(self) -> dict[str, tuple[int, int]]:
+        snapshot = {}
+        for file in discover_files(self.root, self.extensions, self.excluded_dirs):
+            try:
+                stat = file.stat()
+            except OSError:
+                continue
+            snapshot[file.relative_to(self.root).as_posix()] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def changes(self, timeout: float | None = None) -> set[str] | None:
+        '''
+        Scan every `interval` seconds until something changed or `timeout` passes.
+        '''
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.interval if deadline is None else max(0.0, min(self.interval, deadline - time.monotonic()))
+            time.sleep(wait)
+            current = self._scan()
+            changed = {key for key in current.keys() | self.snapshot.keys() if current.get(key) != self.snapshot.get(key)}
+            self.snapshot = current
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def close(self):
+        pass
+
+
+def open_watcher(root: Path, extensions: tuple[str, ...] = (".py",), poll: bool = False) -> InotifyWatcher | PollingWatcher:
+    '''
+    Use inotify where it works (Linux, enough watches left), otherwise poll.
+    '''
+    if not poll:
+        try:
+            return InotifyWatcher(root, extensions)
+        except OSError:
+            pass
+    return PollingWatcher(root, extensions)
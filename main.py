@@ -1,10 +1,78 @@
+import importlib
 import typer
-from core.commands import build, add, tests
+from pathlib import Path
+from typer.core import TyperCommand, TyperGroup
+
+# Command name -> (module, help). A module is only imported when its command runs,
+# so `--help` and fast commands skip openai, jinja2 and the rest.
+COMMANDS = {
+    "build": ("core.commands.build", "Plan and scaffold a new project."),
+    "add": ("core.commands.add", "Add a feature to the project."),
+    "tests": ("core.commands.tests", "Generate tests for project code."),
+    "session": ("core.commands.session", "List and compact conversation sessions."),
+    "index": ("core.commands.index", "Build and query the symbol index."),
+    "analyze": ("core.commands.analyze", "Analyze the project, optionally in watch mode."),
+}
+_env_loaded = False
+
+
+def load_environment():
+    '''
+    Read .env once, before the first command module (and the settings it reads) loads.
+    '''
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _env_loaded = True
+
+
+def load_command(name: str) -> TyperGroup:
+    load_environment()
+    command = typer.main.get_group(importlib.import_module(COMMANDS[name][0]).app)
+    command.name = name
+    return command
+
+
+class LazyGroup(TyperGroup):
+    _listing = False  # True while help is rendered, which only needs names and help text
+
+    def list_commands(self, ctx) -> list[str]:
+        return list(COMMANDS)
+
+    def get_command(self, ctx, name: str):
+        if name not in COMMANDS:
+            return None
+        if self._listing:
+            return TyperCommand(name=name, help=COMMANDS[name][1])
+        return load_command(name)
+
+    def format_help(self, ctx, formatter):
+        self._listing = True
+        try:
+            super().format_help(ctx, formatter)
+        finally:
+            self._listing = False
+
+
+app = typer.Typer(cls=LazyGroup)
+
+
+@app.callback()
+def main(
+    no_cache: bool = typer.Option(False, "--no-cache", help="Bypass the LLM response cache."),
+    backend: str = typer.Option(None, "--backend", help="LLM backend: live, record or replay. (default: CODUCTOR_BACKEND, else live)"),
+    cassette: Path = typer.Option(None, "--cassette", help="Cassette file used by record and replay. (default: CODUCTOR_CASSETTE)"),
+    session: str = typer.Option(None, "--session", help="Share one named session across commands instead of one per command."),
+):
+    if not (no_cache or backend or cassette or session):
+        return  # Defaults need no setup, so commands that never call the LLM stay light
+    load_environment()
+    from core import agent
+    agent.set_cache_enabled(not no_cache)
+    agent.set_backend(backend or agent.BACKEND_MODE, cassette)
+    agent.set_session_override(session)
 
-app = typer.Typer()
-app.add_typer(build.app, name="build")
-app.add_typer(add.app, name="add")
-app.add_typer(tests.app, name="tests")
 
 if __name__ == "__main__":
     app()
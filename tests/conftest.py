@@ -0,0 +1,12 @@
+"""
+Shared fixtures: keep compiled prompt templates out of the user's cache directory.
+"""
+
+import pytest
+from core.prompts import prompt_loader
+
+
+@pytest.fixture(autouse=True)
+def template_cache(tmp_path_factory, monkeypatch):
+    monkeypatch.setenv("CODUCTOR_TEMPLATE_CACHE_DIR", str(tmp_path_factory.getbasetemp() / "templates"))
+    monkeypatch.setattr(prompt_loader, "_registry", None)
@@ -0,0 +1,297 @@
+"""
+Unit tests for send_prompt and session history in agent.py.
+The OpenAI client, tokenizer, cache and session files are all redirected to
+mocks or a temporary directory, so no network access or real state is used.
+"""
+
+import json
+import pytest
+from unittest.mock import patch, MagicMock, AsyncMock
+from core import agent, budget
+from core.cache import ResponseCache
+from core.jsonl_log import JsonlLog
+
+pytest_plugins = ('pytest_asyncio',)
+
+
+@pytest.fixture(autouse=True)
+def isolated_agent(tmp_path, monkeypatch):
+    encoding = MagicMock()
+    encoding.name = "whitespace"
+    encoding.encode.side_effect = lambda text: text.split()
+    encoding.encode_batch.side_effect = lambda texts: [text.split() for text in texts]
+
+    monkeypatch.setattr(agent, "session_log", JsonlLog(tmp_path / "session.jsonl"))
+    monkeypatch.setattr(agent, "LEGACY_SESSION_FILE", tmp_path / "session.json")
+    monkeypatch.setattr(agent, "SESSION_NAME", None)
+    monkeypatch.setattr(agent, "SESSION_OVERRIDE", None)
+    monkeypatch.setattr(agent, "response_cache", ResponseCache(tmp_path / "cache"))
+    monkeypatch.chdir(tmp_path)
+    with patch("core.tokens.get_encoding", return_value=encoding), \
+         patch("core.agent.console.print"):
+        yield tmp_path
+
+
+@pytest.fixture
+def mock_client():
+    client = MagicMock()
+    client.chat.completions.create = AsyncMock()
+    with patch.object(agent.client_manager, "get_client", return_value=client):
+        yield client
+
+
+def reply(content: str):
+    response = MagicMock()
+    response.choices[0].message.content = content
+    return response
+
+
+# -----------------------
+# send_prompt
+# -----------------------
+@pytest.mark.asyncio
+async def test_send_prompt_appends_turn_to_history(mock_client):
+    mock_client.chat.completions.create.return_value = reply('{"name": "Habits"}')
+
+    result = await agent.send_prompt("name my project")
+
+    assert result == {"name": "Habits"}
+    history = agent.load_history()
+    assert [m["role"] for m in history] == ["user", "assistant"]
+    assert all("tokens" in m for m in history)
+    # Token counts are stored on disk but never sent to the API
+    sent = mock_client.chat.completions.create.call_args.kwargs["messages"]
+    assert sent == [{"role": "user", "content": "name my project"}]
+
+
+@pytest.mark.asyncio
+async def test_send_prompt_serves_repeat_from_cache(mock_client):
+    mock_client.chat.completions.create.return_value = reply('{"name": "Habits"}')
+    await agent.send_prompt("name my project")
+    agent.save_history([])
+
+    result = await agent.send_prompt("name my project")
+
+    assert result == {"name": "Habits"}
+    assert mock_client.chat.completions.create.call_count == 1
+    assert agent.response_cache.hits == 1
+
+
+@pytest.mark.asyncio
+async def test_send_prompt_no_cache_goes_to_network(mock_client):
+    mock_client.chat.completions.create.return_value = reply('{"name": "Habits"}')
+    await agent.send_prompt("name my project")
+    agent.save_history([])
+
+    await agent.send_prompt("name my project", use_cache=False)
+
+    assert mock_client.chat.completions.create.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_send_prompt_too_long_is_rejected_before_dispatch(mock_client, monkeypatch):
+    monkeypatch.setitem(budget.MODEL_BUDGETS, "tiny", {"max_tokens": 20, "response_tokens": 5})
+
+    result = await agent.send_prompt("word " * 50, model="tiny")
+
+    assert result == {}
+    mock_client.chat.completions.create.assert_not_called()
+
+
+def test_prepare_history_reads_back_only_what_fits_the_budget(monkeypatch):
+    monkeypatch.setitem(budget.MODEL_BUDGETS, "small", {"max_tokens": 100, "response_tokens": 10})
+    agent.save_history([{"role": "user", "content": f"turn {i}", "tokens": {"whitespace": 5}} for i in range(300)])
+
+    with patch.object(agent.session_log, "read_all", side_effect=AssertionError("whole log parsed")), \
+         patch.object(agent.session_log, "tail", wraps=agent.session_log.tail) as tail:
+        history, messages, rewrite = agent._prepare_history("hi", "small")
+
+    tail.assert_called_once_with(agent.HISTORY_CHUNK)
+    assert rewrite  # The turns that no longer fit are dropped from the log
+    assert history[-1] == {"role": "user", "content": "hi", "tokens": {"whitespace": 5}}
+    assert [m["content"] for m in history[:-1]] == [f"turn {i}" for i in range(284, 300)]
+    assert len(messages) == len(history)
+
+
+# -----------------------
+# migrate_legacy_history
+# -----------------------
+def test_legacy_session_json_is_migrated(isolated_agent):
+    legacy = isolated_agent / "session.json"
+    legacy.write_text(json.dumps([{"role": "user", "content": "old prompt"}], indent=4))
+
+    history = agent.load_history()
+
+    assert history == [{"role": "user", "content": "old prompt", "tokens": {"whitespace": 6}}]
+    assert not legacy.exists()
+    assert (isolated_agent / "session.json.bak").exists()
+
+
+def test_session_compact_migrates_legacy_history_before_opening_sessions(isolated_agent):
+    from core.commands.session import compact_session
+    legacy = isolated_agent / "session.json"
+    legacy.write_text(json.dumps([{"role": "user", "content": "old prompt"}]))
+    (isolated_agent / ".coductor").mkdir()
+    global_log = agent.session_log
+
+    with patch("core.commands.session.console.print"):
+        compact_session(name="build", model=agent.DEFAULT_MODEL, budget=False)
+
+    assert [m["content"] for m in global_log.read_all()] == ["old prompt"]
+    assert agent.SESSION_NAME == "build"
+    assert len(agent.session_log) == 0  # The project session stays separate
+    assert not legacy.exists()
+    assert (isolated_agent / "session.json.bak").exists()
+
+
+# -----------------------
+# stream_prompt / send_prompt(on_entry=...)
+# -----------------------
+def stream_of(*pieces):
+    async def stream():
+        for piece in pieces:
+            chunk = MagicMock()
+            chunk.choices[0].delta.content = piece
+            yield chunk
+    return stream()
+
+
+@pytest.mark.asyncio
+async def test_stream_prompt_yields_deltas_and_records_reply(mock_client):
+    mock_client.chat.completions.create.return_value = stream_of("Hel", "lo")
+
+    pieces = [piece async for piece in agent.stream_prompt("say hello")]
+
+    assert pieces == ["Hel", "lo"]
+    assert agent.load_history()[-1]["content"] == "Hello"
+
+
+@pytest.mark.asyncio
+async def test_send_prompt_on_entry_renders_entries_while_streaming(mock_client):
+    mock_client.chat.completions.create.return_value = stream_of('{"todo": {"a.py": ["x"]},', ' "structure": {"p": {}}}')
+    seen = []
+
+    result = await agent.send_prompt("plan", on_entry=lambda path, value: seen.append(path))
+
+    assert result == {"todo": {"a.py": ["x"]}, "structure": {"p": {}}}
+    assert seen == [("todo", "a.py"), ("structure", "p")]
+    assert agent.stream_metrics["time_to_first_render"] <= agent.stream_metrics["total_time"]
+
+
+# -----------------------
+# send_many
+# -----------------------
+@pytest.mark.asyncio
+async def test_send_many_keeps_order_and_skips_history(mock_client):
+    async def create(**kwargs):
+        prompt = kwargs["messages"][0]["content"]
+        return reply(json.dumps({"prompt": prompt}))
+    mock_client.chat.completions.create.side_effect = create
+
+    results = await agent.send_many(["a", "b", "c"], use_cache=False)
+
+    assert results == [{"prompt": "a"}, {"prompt": "b"}, {"prompt": "c"}]
+    assert agent.load_history() == []
+
+
+# -----------------------
+# Project sessions
+# -----------------------
+@pytest.mark.asyncio
+async def test_commands_keep_separate_sessions_in_the_project(mock_client, tmp_path, monkeypatch):
+    (tmp_path / ".git").mkdir()
+    (tmp_path / "src").mkdir()
+    monkeypatch.chdir(tmp_path / "src")
+    mock_client.chat.completions.create.return_value = reply('{"ok": true}')
+
+    agent.use_session("build")
+    await agent.send_prompt("plan it")
+    agent.use_session("tests")
+    await agent.send_prompt("test it")
+
+    sessions = tmp_path / ".coductor" / "sessions"
+    assert JsonlLog(sessions / "build.jsonl").read_all()[0]["content"] == "plan it"
+    assert JsonlLog(sessions / "tests.jsonl").read_all()[0]["content"] == "test it"
+    # Only the tests thread is sent with the tests prompt
+    sent = mock_client.chat.completions.create.call_args.kwargs["messages"]
+    assert [m["content"] for m in sent] == ["test it"]
+
+
+def test_session_override_shares_one_thread(tmp_path):
+    agent.set_session_override("feature-x")
+    agent.use_session("build")
+    assert agent.session_log.path == tmp_path / ".coductor" / "sessions" / "feature-x.jsonl"
+
+    with pytest.raises(ValueError):
+        agent.open_session("../escape")
+
+
+@pytest.mark.asyncio
+async def test_preamble_is_sent_but_not_stored(mock_client, tmp_path):
+    (tmp_path / ".coductor").mkdir()
+    (tmp_path / ".coductor" / "preamble.md").write_text("Use Python 3.11.\n")
+    mock_client.chat.completions.create.return_value = reply('{"ok": true}')
+    agent.use_session("add")
+
+    await agent.send_prompt("add a feature")
+
+    sent = mock_client.chat.completions.create.call_args.kwargs["messages"]
+    assert sent[0] == {"role": "system", "content": "Use Python 3.11."}
+    assert [m["role"] for m in agent.load_history()] == ["user", "assistant"]
+
+
+# -----------------------
+# Structured output
+# -----------------------
+SCHEMA = {
+    "type": "object",
+    "required": ["name", "stack"],
+    "properties": {"name": {"type": "string"}, "stack": {"type": "object"}},
+}
+
+
+@pytest.fixture
+def fresh_stats(monkeypatch):
+    monkeypatch.setattr(agent, "structured_stats", {"replies": 0, "repaired": 0, "reasks": 0, "failed": 0})
+    return agent.structured_stats
+
+
+@pytest.mark.asyncio
+async def test_send_prompt_repairs_reply_locally(mock_client, fresh_stats):
+    mock_client.chat.completions.create.return_value = reply('{"name": "Habits", "stack": {"lang": ["py"],},')
+
+    result = await agent.send_prompt("name it", schema=SCHEMA)
+
+    assert result == {"name": "Habits", "stack": {"lang": ["py"]}}
+    assert mock_client.chat.completions.create.call_count == 1
+    assert mock_client.chat.completions.create.call_args.kwargs["response_format"] == {"type": "json_object"}
+    assert fresh_stats["repaired"] == 1
+    # The repaired reply is what gets stored
+    assert json.loads(agent.load_history()[-1]["content"]) == result
+
+
+@pytest.mark.asyncio
+async def test_send_prompt_reasks_only_for_invalid_keys(mock_client, fresh_stats):
+    mock_client.chat.completions.create.side_effect = [
+        reply('{"name": "Habits", "stack": "python"}'),
+        reply('{"stack": {"lang": ["python"]}}'),
+    ]
+
+    result = await agent.send_prompt("name it", schema=SCHEMA)
+
+    assert result == {"name": "Habits", "stack": {"lang": ["python"]}}
+    assert fresh_stats["reasks"] == 1
+    reask = mock_client.chat.completions.create.call_args.kwargs["messages"]
+    assert len(reask) == 3 and "stack" in reask[-1]["content"]
+
+
+@pytest.mark.asyncio
+async def test_send_prompt_gives_up_after_max_reasks(mock_client, fresh_stats):
+    mock_client.chat.completions.create.return_value = reply('{"name": 1}')
+
+    with pytest.raises(agent.StructuredOutputError, match="name"):
+        await agent.send_prompt("name it", schema=SCHEMA, use_cache=False)
+
+    assert mock_client.chat.completions.create.call_count == 1 + agent.MAX_REASKS
+    assert fresh_stats["failed"] == 1
+    assert agent.load_history() == []
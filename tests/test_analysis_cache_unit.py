@@ -0,0 +1,86 @@
+"""
+Unit tests for the incremental analysis cache used by project_analyzer.py.
+"""
+
+import os
+import pytest
+from unittest.mock import patch
+from core import project_analyzer
+from core.analysis_cache import AnalysisCache
+from core.project_analyzer import analyze_project, records
+
+
+@pytest.fixture
+def project(tmp_path):
+    (tmp_path / "app.py").write_text("def main():\n    '''Entry point.'''\n")
+    (tmp_path / "db.py").write_text("class Store:\n    pass\n")
+    with patch("core.project_analyzer.console.print"):
+        yield tmp_path
+
+
+def analyzed_files(project):
+    with patch("core.project_analyzer.analyze_source", wraps=project_analyzer.analyze_source) as analyze:
+        results = analyze_project(project)
+    return sorted(os.path.basename(call.args[0]) for call in analyze.call_args_list), results
+
+
+def test_second_run_reuses_every_result(project):
+    first, results = analyzed_files(project)
+    second, cached = analyzed_files(project)
+
+    assert first == ["app.py", "db.py"]
+    assert second == []
+    assert sorted(r["summary"] for r in cached) == sorted(r["summary"] for r in results)
+
+
+def test_only_changed_and_added_files_are_reanalyzed(project):
+    analyzed_files(project)
+    (project / "app.py").write_text("def main():\n    pass\n\ndef helper():\n    pass\n")
+    (project / "new.py").write_text("X = 1\n")
+
+    analyzed, results = analyzed_files(project)
+
+    assert analyzed == ["app.py", "new.py"]
+    app = next(r for r in results if r["file"].endswith("app.py"))
+    assert [s.name for s in records(app, "symbols")] == ["main", "helper"]
+
+
+def test_touched_but_unchanged_file_is_a_hit(project):
+    analyzed_files(project)
+    stat = (project / "db.py").stat()
+    os.utime(project / "db.py", ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    analyzed, _ = analyzed_files(project)
+
+    assert analyzed == []
+
+
+def test_deleted_files_are_dropped_from_the_cache(project):
+    analyzed_files(project)
+    (project / "db.py").unlink()
+
+    analyze_project(project)
+
+    cache = AnalysisCache(project / project_analyzer.ANALYSIS_CACHE_FILE)
+    assert list(cache.entries) == ["app.py"]
+
+
+def test_cold_run_stores_the_hash_computed_by_the_worker(project):
+    analyze_project(project)
+
+    cache = AnalysisCache(project / project_analyzer.ANALYSIS_CACHE_FILE)
+    for key in ("app.py", "db.py"):
+        assert cache.entries[key]["sha256"] == AnalysisCache.digest((project / key).read_bytes())
+
+
+def test_report_counts_hits_and_saved_time(tmp_path):
+    source = tmp_path / "a.py"
+    source.write_text("x = 1\n")
+    cache = AnalysisCache(tmp_path / "cache.json")
+    assert cache.lookup("a.py", source) == (None, None)  # A file without an entry is left to the worker
+    cache.store("a.py", source, AnalysisCache.digest(source.read_bytes()), {"file": "a.py"}, seconds=0.5)
+    cache.save()
+
+    reloaded = AnalysisCache(tmp_path / "cache.json")
+    assert reloaded.lookup("a.py", source) == ({"file": "a.py"}, None)
+    assert reloaded.report() == {"hits": 1, "misses": 0, "removed": 0, "hit_rate": 1.0, "saved_seconds": 0.5}
@@ -0,0 +1,139 @@
+"""
+Unit tests for the warm analysis daemon and its socket client in analysis_daemon.py.
+"""
+
+import os
+import stat
+import pytest
+from unittest.mock import patch
+from core.analysis_daemon import AnalysisDaemon, daemon_status, fetch_results, socket_path
+from core.project_analyzer import records
+from core.symbol_index import build_index
+
+
+@pytest.fixture
+def project(tmp_path):
+    for name in ("a", "b", "c"):
+        (tmp_path / f"{name}.py").write_text(f"def {name}():\n    pass\n")
+    with patch("core.analysis_daemon.console.print"), patch("core.project_analyzer.console.print"):
+        yield tmp_path
+
+
+def test_refresh_only_reanalyzes_changed_files(project):
+    daemon = AnalysisDaemon(project, workers=1)
+    assert daemon.refresh() == {"analyzed": 3, "removed": 0, "files": 3}
+
+    (project / "b.py").write_text("def b2():\n    pass\n")
+    with patch("core.analysis_daemon.get_source_files") as walk:
+        counts = daemon.refresh({"b.py"})
+
+    walk.assert_not_called()  # Only known files changed, so no walk
+    assert counts == {"analyzed": 1, "removed": 0, "files": 3}
+    assert [s.name for s in records(daemon.results["b.py"], "symbols")] == ["b2"]
+
+
+def test_refresh_picks_up_added_and_removed_files(project):
+    daemon = AnalysisDaemon(project, workers=1)
+    daemon.refresh()
+
+    (project / "a.py").unlink()
+    (project / "d.py").write_text("def d():\n    pass\n")
+
+    assert daemon.refresh({"a.py", "d.py"}) == {"analyzed": 1, "removed": 1, "files": 3}
+    assert list(daemon.results) == ["b.py", "c.py", "d.py"]
+
+
+def test_refresh_keeps_the_disk_cache_warm(project):
+    AnalysisDaemon(project, workers=1).refresh()
+
+    assert AnalysisDaemon(project, workers=1).refresh()["analyzed"] == 0
+
+
+def test_clients_read_the_warm_analysis_over_the_socket(project):
+    assert fetch_results(project) is None
+
+    daemon = AnalysisDaemon(project, workers=1)
+    daemon.refresh()
+    server = daemon.serve()
+    try:
+        results = fetch_results(project)
+        assert [r["file"] for r in results] == [str(project / f"{n}.py") for n in "abc"]
+        assert records(results[0], "symbols")[0].name == "a"
+        assert daemon_status(project)["files"] == 3
+
+        with pytest.raises(RuntimeError):
+            AnalysisDaemon(project).serve()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_stale_socket_is_replaced(project):
+    path = socket_path(project)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("")  # Left behind by a daemon that was killed
+
+    assert fetch_results(project) is None
+    server = AnalysisDaemon(project, workers=1).serve()
+    try:
+        assert daemon_status(project)["files"] == 0
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_build_index_skips_analysis_while_the_daemon_keeps_it_current(project):
+    indexed = []
+    daemon = AnalysisDaemon(project, workers=1, on_refresh=indexed.append)
+    daemon.refresh()
+    server = daemon.serve()
+    try:
+        with patch("core.symbol_index.analyze_project") as analyze:
+            counts = build_index(project)
+
+        analyze.assert_not_called()
+        assert counts == {"updated": 0, "unchanged": 3, "removed": 0}
+        assert [r["file"] for r in indexed[0]] == [str(project.resolve() / f"{n}.py") for n in "abc"]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_build_index_uses_warm_results_without_a_hook(project):
+    daemon = AnalysisDaemon(project, workers=1)
+    daemon.refresh()
+    server = daemon.serve()
+    try:
+        with patch("core.symbol_index.analyze_project") as analyze:
+            counts = build_index(project)
+
+        analyze.assert_not_called()
+        assert counts == {"updated": 3, "unchanged": 0, "removed": 0}
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_deep_projects_get_a_socket_in_the_users_runtime_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    deep = tmp_path / ("nested" * 20)
+
+    assert socket_path(deep).parent == tmp_path
+
+    monkeypatch.delenv("XDG_RUNTIME_DIR")
+    monkeypatch.setattr("tempfile.tempdir", str(tmp_path))
+    private = socket_path(deep).parent
+    assert private == tmp_path / f"coductor-{os.getuid()}"
+    assert stat.S_IMODE(private.stat().st_mode) == 0o700
+
+
+def test_sockets_of_other_users_are_not_trusted(project):
+    server = AnalysisDaemon(project, workers=1).serve()
+    try:
+        assert daemon_status(project) is not None
+        with patch("core.analysis_daemon.os.getuid", return_value=os.getuid() + 1):
+            assert daemon_status(project) is None
+            assert fetch_results(project) is None
+    finally:
+        server.shutdown()
+        server.server_close()
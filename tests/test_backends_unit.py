@@ -0,0 +1,156 @@
+"""
+Unit tests for the record/replay backends in backends.py, plus end-to-end runs
+of the CLI commands replayed from a cassette with no network access.
+"""
+
+import json
+import pytest
+from unittest.mock import patch
+from typer.testing import CliRunner
+from core import agent
+from core.backends import Cassette, CassetteMissError, RecordBackend, ReplayBackend, make_backend
+from core.cache import ResponseCache
+from core.jsonl_log import JsonlLog
+from core.todo_store import open_todos
+from core.prompts.prompt_loader import load_prompt
+
+pytest_plugins = ('pytest_asyncio',)
+
+runner = CliRunner()
+MESSAGES = [{"role": "user", "content": "name my project"}]
+
+
+class FakeLive:
+    async def complete(self, messages, model, temperature, estimated_tokens=0, response_format=None):
+        return '{"name": "Habits"}'
+
+    async def stream(self, messages, model, temperature, estimated_tokens=0, response_format=None):
+        for piece in ('{"name": ', '"Habits"}'):
+            yield piece
+
+
+# -----------------------
+# Cassette / RecordBackend / ReplayBackend
+# -----------------------
+@pytest.mark.asyncio
+async def test_record_then_replay_round_trip(tmp_path):
+    path = tmp_path / "cassette.json"
+    recorder = RecordBackend(FakeLive(), Cassette(path))
+    assert await recorder.complete(MESSAGES, "gpt-4o-mini", 0.7) == '{"name": "Habits"}'
+
+    replayer = ReplayBackend(Cassette(path))
+    assert await replayer.complete(MESSAGES, "gpt-4o-mini", 0.7) == '{"name": "Habits"}'
+
+
+@pytest.mark.asyncio
+async def test_record_stream_saves_joined_reply(tmp_path):
+    path = tmp_path / "cassette.json"
+    recorder = RecordBackend(FakeLive(), Cassette(path))
+
+    pieces = [piece async for piece in recorder.stream(MESSAGES, "gpt-4o-mini", 0.7)]
+
+    assert pieces == ['{"name": ', '"Habits"}']
+    assert json.loads(path.read_text())["interactions"][0]["response"] == '{"name": "Habits"}'
+
+
+def test_replay_matches_on_prompt_when_history_differs(tmp_path):
+    cassette = Cassette(tmp_path / "cassette.json")
+    cassette.record("gpt-4o-mini", 0.7, MESSAGES, "first")
+    cassette.record("gpt-4o-mini", 0.7, MESSAGES, "second")
+
+    history = [{"role": "assistant", "content": "earlier turn"}] + MESSAGES
+    assert cassette.find("gpt-4o-mini", 0.7, history) == "first"
+    assert cassette.find("gpt-4o-mini", 0.7, history) == "second"
+
+
+def test_replay_miss_raises(tmp_path):
+    with pytest.raises(CassetteMissError):
+        Cassette(tmp_path / "empty.json").find("gpt-4o-mini", 0.7, MESSAGES)
+
+
+def test_make_backend_rejects_unknown_mode(tmp_path):
+    with pytest.raises(ValueError):
+        make_backend("mock", tmp_path / "cassette.json", None, None)
+
+
+# -----------------------
+# End-to-end replay
+# -----------------------
+@pytest.fixture
+def replay(tmp_path, monkeypatch):
+    '''
+    Point the agent at a temporary session and a replay cassette, returning the cassette.
+    '''
+    cassette = Cassette(tmp_path / "cassette.json")
+    monkeypatch.setattr(agent, "session_log", JsonlLog(tmp_path / "session.jsonl"))
+    monkeypatch.setattr(agent, "LEGACY_SESSION_FILE", tmp_path / "session.json")
+    monkeypatch.setattr(agent, "SESSION_NAME", None)
+    monkeypatch.setattr(agent, "SESSION_OVERRIDE", None)
+    monkeypatch.setattr(agent, "response_cache", ResponseCache(tmp_path / "cache"))
+    monkeypatch.setattr(agent, "backend", ReplayBackend(cassette))
+    monkeypatch.chdir(tmp_path)
+    return cassette
+
+
+def test_build_new_replays_offline(replay, tmp_path):
+    from core.commands.build import app
+
+    idea = "A habit tracker"
+    stack = {"Language": ["Python"]}
+    replay.record("gpt-4o-mini", 0.7, [{"role": "user", "content": load_prompt("generate_name_and_stack").render(idea=idea)}],
+                  json.dumps({"name": "Habits", "stack": stack}))
+    replay.record("gpt-4o-mini", 0.7, [{"role": "user", "content": load_prompt("plan_project").render(idea=idea, stack=stack, name="Habits")}],
+                  json.dumps({"todo": {"main.py": ["Add CLI"]}, "structure": {"Habits": {"main.py": "Entry point"}}}))
+
+    with patch("core.commands.build.Prompt.ask", return_value=idea), \
+         patch("core.commands.build.Confirm.ask", return_value=True):
+        result = runner.invoke(app, ["--parent-path", str(tmp_path) + "/"])
+
+    assert result.exit_code == 0, result.output
+    assert (tmp_path / "Habits" / "main.py").read_text() == '"""Entry point"""\n'
+    assert "- [ ] Add CLI" in (tmp_path / "Habits" / "TODO.md").read_text()
+    with open_todos(tmp_path / "Habits") as todos:
+        assert [item["task"] for item in todos.items()] == ["Add CLI"]
+
+
+def test_tests_gen_replays_offline(replay, tmp_path):
+    from core.commands.tests import app
+
+    (tmp_path / "calc.py").write_text("X = 1\n\n@cached\ndef add(a, b):\n    return a + b\n")
+    code = "@cached\ndef add(a, b):\n    return a + b\n"
+    replay.record("gpt-4o-mini", 0.7, [{"role": "user", "content": load_prompt("generate_tests").render(mode="stubs", code=code)}],
+                  json.dumps({"tests": "def test_add():\n    pass\n"}))
+
+    result = runner.invoke(app, ["calc.py", "--symbol", "add"])
+
+    assert result.exit_code == 0, result.output
+    assert (tmp_path / "tests" / "test_calc.py").read_text() == "def test_add():\n    pass\n"
+
+
+def test_add_feature_replays_offline(replay, tmp_path):
+    from core.commands.add import app
+
+    feature = "Password reset"
+    replay.record("gpt-4o-mini", 0.7, [{"role": "user", "content": load_prompt("add_feature").render(feature=feature)}],
+                  json.dumps({"todo": {"Reset flow": ["- [ ] Send email"]}, "structure": {"auth": {"reset.py": "Reset flow"}}}))
+
+    result = runner.invoke(app, [feature])
+
+    assert result.exit_code == 0, result.output
+    assert (tmp_path / "auth" / "reset.py").read_text() == '"""Reset flow"""\n'
+    assert "Send email" in (tmp_path / "TODO.md").read_text()
+
+
+def test_add_feature_reports_a_reply_that_stays_invalid(replay, tmp_path, monkeypatch):
+    from core.commands.add import app
+
+    monkeypatch.setattr(agent, "MAX_REASKS", 0)
+    feature = "Password reset"
+    replay.record("gpt-4o-mini", 0.7, [{"role": "user", "content": load_prompt("add_feature").render(feature=feature)}],
+                  json.dumps({"todo": {"Reset flow": ["Send email"]}}))
+
+    result = runner.invoke(app, [feature])
+
+    assert result.exit_code == 1
+    assert "still invalid" in result.output and "structure" in result.output
+    assert not (tmp_path / "TODO.md").exists()
@@ -0,0 +1,66 @@
+"""
+Unit tests for token budgeting and history compaction in budget.py.
+The tokenizer is replaced by a whitespace splitter so counts are easy to follow
+and no encoding files need to be downloaded.
+"""
+
+import pytest
+from unittest.mock import patch, MagicMock
+from core import budget
+from core.budget import compact_history, configure_budget, SUMMARY_PREFIX
+
+
+@pytest.fixture(autouse=True)
+def fake_encoding():
+    encoding = MagicMock()
+    encoding.name = "whitespace"
+    encoding.encode.side_effect = lambda text: text.split()
+    with patch("core.tokens.get_encoding", return_value=encoding):
+        yield encoding
+
+
+@pytest.fixture
+def small_model(monkeypatch):
+    # Each message below costs 3 overhead + 1 role + its words
+    monkeypatch.setitem(budget.MODEL_BUDGETS, "test-model", {"max_tokens": 60, "response_tokens": 10, "summary_tokens": 20})
+    return "test-model"
+
+
+def turn(role, words):
+    return {"role": role, "content": " ".join([role] * words)}
+
+
+def test_history_under_budget_is_unchanged(small_model):
+    messages = [turn("user", 5), turn("assistant", 5)]
+    assert compact_history(messages, small_model) == messages
+
+
+def test_drop_oldest_keeps_system_preamble_and_newest(small_model):
+    system = turn("system", 2)
+    messages = [system] + [turn("user", 10), turn("assistant", 10)] * 2 + [turn("user", 5)]
+
+    compacted = compact_history(messages, small_model)
+
+    # The first user/assistant turn is dropped, everything newer is kept
+    assert compacted == [system] + messages[3:]
+
+
+def test_summarize_replaces_dropped_turns(small_model, monkeypatch):
+    monkeypatch.setitem(budget.MODEL_BUDGETS[small_model], "strategy", "summarize")
+    messages = [turn("user", 10), turn("assistant", 10), turn("user", 10), turn("assistant", 10), turn("user", 5)]
+
+    compacted = compact_history(messages, small_model)
+
+    assert compacted[0]["role"] == "system"
+    assert compacted[0]["content"].startswith(SUMMARY_PREFIX)
+    assert compacted[-1] == messages[-1]
+
+
+def test_prompt_too_long_raises_before_dispatch(small_model):
+    with pytest.raises(ValueError, match="Prompt too long"):
+        compact_history([turn("user", 100)], small_model)
+
+
+def test_configure_budget_rejects_unknown_strategy():
+    with pytest.raises(ValueError):
+        configure_budget("gpt-4o-mini", strategy="forget_everything")
@@ -12,10 +12,12 @@ from core.commands.build import (
     confirm_name_and_stack,
     ask_coductor_to_plan,
     confirm_plan,
+    PlanRenderer,
     scaffold_project,
     generate_readme,
     generate_todo
 )
+from core.todo_store import open_todos
 
 pytest_plugins = ('pytest_asyncio',)
 
@@ -122,18 +124,52 @@ def test_generate_readme(mock_write_file):
 # -----------------------
 # generate_todo
 # -----------------------
-@patch("core.commands.build.safe_write_file")
-def test_generate_todo(mock_write_file):
+def test_generate_todo(tmp_path):
     todo_dict = {
         "Setup": ["Initialize repo", "Install dependencies"],
         "Development": ["Build CLI", "Write tests"]
     }
-    generate_todo(todo_dict)
-    assert mock_write_file.call_count == 1
-    content = mock_write_file.call_args[0][1]
+    generate_todo(todo_dict, str(tmp_path) + "/")
+    content = (tmp_path / "TODO.md").read_text()
 
     assert "# TODO" in content
     assert "## Setup" in content
     assert "- [ ] Initialize repo" in content
     assert "- [ ] Install dependencies" in content
     assert "## Development" in content
+
+    # The plan's tasks are in the project's TODO store, so a later feature extends the same list
+    with open_todos(tmp_path) as todos:
+        assert [item["task"] for item in todos.items(category="Setup")] == ["Initialize repo", "Install dependencies"]
+        todos.add("Reset flow", ["Send email"])
+        todos.render(tmp_path / "TODO.md")
+    content = (tmp_path / "TODO.md").read_text()
+    assert content.count("<!-- coductor:todo:start -->") == 1
+    assert content.index("## Setup") < content.index("## Reset flow")
+
+
+# -----------------------
+# PlanRenderer
+# -----------------------
+@patch("core.commands.build.console.print")
+def test_plan_renderer_prints_each_section_header_once(mock_print):
+    renderer = PlanRenderer()
+    renderer(("todo", "main.py"), ["Set up CLI"])
+    renderer(("todo", "db.py"), ["Create schema"])
+    renderer(("structure", "project"), {"main.py": "Entry point"})
+
+    printed = [call.args[0] for call in mock_print.call_args_list]
+    assert printed.count("\n[bold cyan]TODO:[/bold cyan]") == 1
+    assert "2. db.py" in printed
+    assert renderer.sections == {"todo", "structure"}
+
+
+@patch("core.commands.build.console.print")
+def test_plan_renderer_only_shows_the_plan_it_printed(mock_print):
+    renderer = PlanRenderer()
+    renderer(("todo", "main.py"), ["Set up CLI"])
+    renderer(("structure", "project"), {"main.py": 1})
+
+    assert renderer.shows({"todo": {"main.py": ["Set up CLI"]}, "structure": {"project": {"main.py": 1}}})
+    # A re-ask replaced the structure after it was printed
+    assert not renderer.shows({"todo": {"main.py": ["Set up CLI"]}, "structure": {"project": {"main.py": "Entry point"}}})
@@ -0,0 +1,68 @@
+"""
+Unit tests for the LLM response cache in cache.py.
+These tests use a temporary cache directory so no real project state is touched.
+"""
+
+import os
+import time
+import pytest
+from core.cache import ResponseCache
+
+MESSAGES = [{"role": "user", "content": "Plan a habit tracker"}]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResponseCache(tmp_path / "cache")
+
+
+# -----------------------
+# get / put
+# -----------------------
+def test_cache_miss_then_hit(cache):
+    assert cache.get("gpt-4o-mini", 0.7, MESSAGES) is None
+    cache.put("gpt-4o-mini", 0.7, MESSAGES, '{"name": "Habits"}')
+
+    assert cache.get("gpt-4o-mini", 0.7, MESSAGES) == '{"name": "Habits"}'
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_cache_key_depends_on_model_temperature_and_messages(cache):
+    cache.put("gpt-4o-mini", 0.7, MESSAGES, "cached")
+
+    assert cache.get("gpt-4o", 0.7, MESSAGES) is None
+    assert cache.get("gpt-4o-mini", 0.0, MESSAGES) is None
+    assert cache.get("gpt-4o-mini", 0.7, MESSAGES + [{"role": "user", "content": "more"}]) is None
+
+
+def test_cache_expired_entry_is_a_miss(tmp_path):
+    cache = ResponseCache(tmp_path / "cache", max_age=60)
+    cache.put("gpt-4o-mini", 0.7, MESSAGES, "cached")
+    path = cache._entry_path(cache.make_key("gpt-4o-mini", 0.7, MESSAGES))
+
+    # Rewrite the entry as if it was created two minutes ago
+    path.write_text('{"created": %f, "content": "cached"}' % (time.time() - 120))
+
+    assert cache.get("gpt-4o-mini", 0.7, MESSAGES) is None
+    assert not path.exists()
+
+
+# -----------------------
+# evict
+# -----------------------
+def test_evict_removes_least_recently_used(tmp_path):
+    cache = ResponseCache(tmp_path / "cache", max_bytes=10_000)
+    first = [{"role": "user", "content": "first"}]
+    second = [{"role": "user", "content": "second"}]
+    cache.put("m", 0.7, first, "a" * 4000)
+    cache.put("m", 0.7, second, "b" * 4000)
+
+    # Make the first entry look older than the second
+    old = time.time() - 100
+    os.utime(cache._entry_path(cache.make_key("m", 0.7, first)), (old, old))
+
+    cache.put("m", 0.7, [{"role": "user", "content": "third"}], "c" * 4000)
+
+    assert cache.get("m", 0.7, first) is None
+    assert cache.get("m", 0.7, second) == "b" * 4000
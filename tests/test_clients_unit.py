@@ -0,0 +1,74 @@
+"""
+Unit tests for the pooled client manager in clients.py.
+No requests are sent; these tests only check how clients are created and reused.
+"""
+
+import asyncio
+import pytest
+from core.clients import ClientManager
+
+pytest_plugins = ('pytest_asyncio',)
+
+
+@pytest.mark.asyncio
+async def test_get_client_reuses_client_per_model():
+    manager = ClientManager(api_key="fake", base_url="http://127.0.0.1:1/v1")
+
+    assert manager.get_client("gpt-4o-mini") is manager.get_client("gpt-4o-mini")
+    assert manager.get_client("gpt-4o-mini") is not manager.get_client("gpt-4o")
+    await manager.aclose()
+
+
+@pytest.mark.asyncio
+async def test_get_client_uses_model_base_url():
+    manager = ClientManager(
+        api_key="fake",
+        base_url="http://127.0.0.1:1/v1",
+        model_base_urls={"local-model": "http://127.0.0.1:2/v1"},
+    )
+
+    assert str(manager.get_client("local-model").base_url).startswith("http://127.0.0.1:2/v1")
+    assert str(manager.get_client("gpt-4o-mini").base_url).startswith("http://127.0.0.1:1/v1")
+    await manager.aclose()
+
+
+@pytest.mark.asyncio
+async def test_aclose_closes_and_forgets_clients():
+    manager = ClientManager(api_key="fake", base_url="http://127.0.0.1:1/v1")
+    client = manager.get_client("gpt-4o-mini")
+
+    await manager.aclose()
+
+    assert client.is_closed()
+    assert manager.get_client("gpt-4o-mini") is not client
+    await manager.aclose()
+
+
+def test_clients_are_not_shared_across_event_loops():
+    manager = ClientManager(api_key="fake", base_url="http://127.0.0.1:1/v1")
+
+    async def get():
+        return manager.get_client("gpt-4o-mini")
+
+    first = asyncio.run(get())
+    second = asyncio.run(get())
+    assert first is not second
+
+
+def test_clients_of_an_earlier_event_loop_are_closed():
+    manager = ClientManager(api_key="fake", base_url="http://127.0.0.1:1/v1")
+
+    async def get():
+        return manager.get_client("gpt-4o-mini")
+
+    async def get_and_close():
+        client = manager.get_client("gpt-4o-mini")
+        await manager.aclose()
+        return client
+
+    first = asyncio.run(get())
+    assert not first.is_closed()
+    second = asyncio.run(get_and_close())
+
+    assert first.is_closed() and second.is_closed()
+    assert not manager._closing
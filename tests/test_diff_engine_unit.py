@@ -0,0 +1,88 @@
+"""
+Unit tests for the bounded diff engine in diff_engine.py.
+"""
+
+import difflib
+import random
+from unittest.mock import MagicMock, patch
+from core import diff_engine
+from core.diff_engine import myers_opcodes, opcodes, register_differ, same_content, show_diff, unified_lines
+
+
+def apply(a: list[str], b: list[str], codes: list[tuple]) -> list[str]:
+    out = []
+    for tag, i1, i2, j1, j2 in codes:
+        out += a[i1:i2] if tag == "equal" else b[j1:j2]
+    return out
+
+
+def test_same_content_ignores_surrounding_whitespace():
+    assert same_content("x = 1\n", "\nx = 1")
+    assert not same_content("x = 1", "x = 2")
+
+
+def test_myers_opcodes_rebuild_the_new_lines():
+    rng = random.Random(7)
+    for _ in range(200):
+        a = [rng.choice("abc") for _ in range(rng.randint(0, 20))]
+        b = [rng.choice("abc") for _ in range(rng.randint(0, 20))]
+        assert apply(a, b, myers_opcodes(a, b)) == b
+
+
+def test_myers_matches_difflib_output_on_a_large_file():
+    old = [f"line {i}" for i in range(20000)]
+    new = list(old)
+    new[100] = "changed"
+    del new[15000]
+    new.insert(9000, "added")
+    old_text, new_text = "\n".join(old), "\n".join(new)
+
+    ours = list(unified_lines(old_text, new_text, "big.py", algorithm="myers"))
+
+    assert ours == list(difflib.unified_diff(old, new, "big.py", "big.py", lineterm=""))
+
+
+def test_too_many_edits_are_summarized():
+    old = "\n".join(f"a{i}" for i in range(50))
+    new = "\n".join(f"b{i}" for i in range(50))
+
+    assert myers_opcodes(old.split("\n"), new.split("\n"), max_edits=10) is None
+    with patch.object(diff_engine, "MAX_DIFF_LINES", 80):
+        lines = list(unified_lines(old, new, "gen.py"))
+
+    assert len(lines) == 1
+    assert "50 lines -> 50 lines" in lines[0]
+
+
+def test_registered_differ_is_used_by_name():
+    differ = MagicMock(return_value=[("replace", 0, 1, 0, 1)])
+    register_differ("fake", differ)
+
+    assert opcodes(["a"], ["b"], algorithm="fake") == [("replace", 0, 1, 0, 1)]
+    differ.assert_called_once_with(["a"], ["b"])
+
+
+def test_show_diff_prints_one_page_when_not_interactive():
+    console = MagicMock(is_terminal=False)
+    old = "\n".join(str(i) for i in range(100))
+    new = "\n".join(f"{i}!" for i in range(100))
+
+    with patch("core.diff_engine.Confirm.ask") as mock_ask:
+        show_diff(old, new, "f.txt", console, page_lines=10)
+
+    mock_ask.assert_not_called()
+    assert console.print.call_count == 2
+    assert console.print.call_args_list[0].args[0].count("\n") == 9
+    assert "not shown" in console.print.call_args_list[1].args[0]
+
+
+def test_show_diff_pages_on_request():
+    console = MagicMock(is_terminal=True)
+    old = "\n".join(str(i) for i in range(30))
+    new = "\n".join(f"{i}!" for i in range(30))
+
+    with patch("core.diff_engine.Confirm.ask", side_effect=[True, False]) as mock_ask:
+        show_diff(old, new, "f.txt", console, page_lines=20)
+
+    assert mock_ask.call_count == 2
+    assert console.print.call_count == 3
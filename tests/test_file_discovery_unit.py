@@ -0,0 +1,73 @@
+"""
+Unit tests for the scandir-based walker and ignore-file matching in file_discovery.py.
+"""
+
+import os
+import pytest
+from core.file_discovery import IgnoreRules, discover_files
+
+
+def touch(root, *paths):
+    for path in paths:
+        (root / path).parent.mkdir(parents=True, exist_ok=True)
+        (root / path).write_text("")
+
+
+def names(root, files):
+    return [f.relative_to(root).as_posix() for f in files]
+
+
+# -----------------------
+# IgnoreRules
+# -----------------------
+@pytest.mark.parametrize("pattern, path, is_dir, expected", [
+    ("*.log", "deep/dir/app.log", False, True),
+    ("build/", "build", True, True),
+    ("build/", "build", False, None),
+    ("/dist", "dist", True, True),
+    ("/dist", "src/dist", True, None),
+    ("docs/*.md", "docs/a.md", False, True),
+    ("docs/*.md", "docs/sub/a.md", False, None),
+    ("**/generated", "a/b/generated", True, True),
+    ("cache/**", "cache/x/y.py", False, True),
+    ("a/**/b.py", "a/x/y/b.py", False, True),
+    ("file[0-9].py", "file3.py", False, True),
+])
+def test_ignore_patterns(pattern, path, is_dir, expected):
+    assert IgnoreRules.parse(pattern).ignored(path, is_dir) is expected
+
+
+def test_negation_and_base_directory():
+    rules = IgnoreRules.parse("*.py\n!keep.py\n", base="pkg")
+
+    assert rules.ignored("pkg/drop.py", False) is True
+    assert rules.ignored("pkg/keep.py", False) is False
+    assert rules.ignored("other/drop.py", False) is None
+
+
+# -----------------------
+# discover_files
+# -----------------------
+def test_excluded_and_ignored_directories_are_pruned(tmp_path):
+    touch(tmp_path, "main.py", "pkg/util.py", "node_modules/lib/x.py", "venv/site.py",
+          "build/out.py", "pkg/gen/auto.py", "notes.txt")
+    (tmp_path / ".gitignore").write_text("build/\n")
+    (tmp_path / "pkg" / ".coductorignore").write_text("gen\n")
+
+    assert names(tmp_path, discover_files(tmp_path)) == ["main.py", "pkg/util.py"]
+
+
+def test_multiple_extensions_in_stable_order(tmp_path):
+    touch(tmp_path, "b.ts", "a.py", "web/app.js", "web/app.css")
+
+    files = discover_files(tmp_path, (".py", ".ts", ".js"))
+
+    assert names(tmp_path, files) == ["a.py", "b.ts", "web/app.js"]
+
+
+def test_symlink_loops_are_walked_once(tmp_path):
+    touch(tmp_path, "pkg/mod.py")
+    os.symlink(tmp_path, tmp_path / "pkg" / "loop")
+    os.symlink(tmp_path / "pkg", tmp_path / "pkg_alias")
+
+    assert names(tmp_path, discover_files(tmp_path)) == ["pkg/mod.py"]
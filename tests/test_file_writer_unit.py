@@ -4,6 +4,7 @@ These tests isolate each function to ensure correctness, side-effect behavior,
 and user interaction handling without requiring actual CLI execution.
 """
 
+import os
 import pytest
 from unittest.mock import patch, MagicMock, mock_open
 from core.file_writer import (
@@ -11,7 +12,9 @@ from core.file_writer import (
     append_to_file,
     append_docstring,
     create_structure_from_dict,
-    append_to_todo
+    append_to_todo,
+    plan_structure,
+    commit_plan,
 )
 from pathlib import Path
 
@@ -157,72 +160,181 @@ def test_append_to_file_existing_file(mock_file_append, mock_console_print):
 # -----------------------
 # append_docstring
 # -----------------------
-def test_append_docstring_existing_file_no_docstring(mock_file_exists, mock_file_write, mock_file_read, mock_console_print):
+def test_append_docstring_existing_file_no_docstring(tmp_path, mock_user_decline, mock_console_print):
     """
     Test append_docstring when the file exists and the docstring is not present.
     """
-    filepath = "test.py"
-    docstring = "This is a docstring"
-    append_docstring(filepath, docstring)
+    filepath = tmp_path / "test.py"
+    filepath.write_text("old content")
+    append_docstring(filepath, "This is a docstring")
 
-    # Assert file is read, docstring is added with the file content
-    mock_file_exists.assert_called_once()
-    mock_file_write[0].assert_called_once_with('"""' + docstring + '"""' + "\nold content")
-    mock_file_write[1].assert_called_once_with(parents=True, exist_ok=True)
+    # Assert the docstring is added above the file content, without asking
+    assert filepath.read_text() == '"""This is a docstring"""\nold content'
+    mock_user_decline.assert_not_called()
 
 
-def test_append_docstring_new_file(mock_file_not_exists, mock_file_write, mock_console_print):
+def test_append_docstring_new_file(tmp_path, mock_console_print):
     """
     Test append_docstring when the file does not exist.
     """
-    filepath = "test.py"
-    docstring = "This is a docstring"
-    append_docstring(filepath, docstring)
+    filepath = tmp_path / "pkg" / "test.py"
+    append_docstring(filepath, "This is a docstring")
 
-    # Assert file is created and docstring is appended
-    mock_file_not_exists.assert_called_once()
-    mock_file_write[0].assert_called_once_with('"""' + docstring + '"""\n')
-    mock_file_write[1].assert_called_once_with(parents=True, exist_ok=True)
+    # Assert file is created with the docstring
+    assert filepath.read_text() == '"""This is a docstring"""\n'
 
 
-def test_append_docstring_existing_file_declined(mock_file_exists, mock_file_read, mock_user_decline, mock_file_write, mock_console_print):
+def test_append_docstring_existing_file_declined(tmp_path, mock_user_decline, mock_console_print):
     """
     Test append_docstring when the file exists and the docstring is already present
     and the user chooses not to overwrite.
     """
-    filepath = "test.py"
-    docstring = "This is a docstring"
-    mock_file_read.return_value = '"""Existing docstring"""'
+    filepath = tmp_path / "test.py"
+    filepath.write_text('"""Existing docstring"""\nx = 1\n')
 
-    append_docstring(filepath, docstring)
+    append_docstring(filepath, "This is a docstring")
 
-    # Assert file is read, docstring is not added
-    mock_file_exists.assert_called_once()
-    mock_file_read.assert_called_once()
+    # Assert the user is asked, and the file is unchanged
     mock_user_decline.assert_called_once()
-    mock_file_write[0].assert_not_called()
-    mock_file_write[1].assert_called_once_with(parents=True, exist_ok=True)
+    assert filepath.read_text() == '"""Existing docstring"""\nx = 1\n'
 
 
-def test_append_docstring_existing_file_confirm(mock_file_exists, mock_file_read, mock_user_confirm, mock_file_write, mock_console_print):
-
+def test_append_docstring_existing_file_confirm(tmp_path, mock_user_confirm, mock_console_print):
     """
     Test append_docstring when the file exists and the docstring is already present
     and the user chooses to overwrite.
     """
-    filepath = "test.py"
-    docstring = "This is a docstring"
-    mock_file_read.return_value = '"""Existing docstring"""'
+    filepath = tmp_path / "test.py"
+    filepath.write_text('"""Existing docstring"""\nx = 1\n')
 
-    append_docstring(filepath, docstring)
+    append_docstring(filepath, "This is a docstring")
 
-    # Assert file is read, docstring is added
-    mock_file_exists.assert_called_once()
-    mock_file_read.assert_called_once()
-    mock_file_write[0].assert_called_once_with('"""' + docstring + '"""\n')
-    mock_file_write[1].assert_called_once_with(parents=True, exist_ok=True)
+    # Assert only the docstring is replaced
+    mock_user_confirm.assert_called_once()
+    assert filepath.read_text() == '"""This is a docstring"""\nx = 1\n'
+
+
+def test_append_docstring_replaces_single_quoted_docstring(tmp_path, mock_user_confirm, mock_console_print):
+    filepath = tmp_path / "test.py"
+    filepath.write_text("'''\nOld\nheader\n'''\nimport os\n")
+
+    append_docstring(filepath, "New")
+
+    assert filepath.read_text() == '"""New"""\nimport os\n'
+
+
+def test_append_docstring_keeps_shebang_and_replaces_line_comments(tmp_path, mock_user_confirm, mock_console_print):
+    filepath = tmp_path / "run.sh"
+    filepath.write_text("#!/bin/bash\n# Old header\n# over two lines\necho hi\n")
+    filepath.chmod(0o755)
+
+    append_docstring(filepath, "Runs the thing.\nTwice.")
+
+    assert filepath.read_text() == "#!/bin/bash\n# Runs the thing.\n# Twice.\necho hi\n"
+    assert filepath.stat().st_mode & 0o777 == 0o755
+
+
+def test_append_docstring_streams_large_file(tmp_path, mock_user_confirm, mock_console_print):
+    """
+    Only the head of a large file is read; the body is copied across byte for byte.
+    """
+    filepath = tmp_path / "big.py"
+    body = b"".join(b"row_%d = %d\r\n" % (i, i) for i in range(200000))
+    filepath.write_bytes(b'"""Old"""\n' + body)
+
+    with patch("core.file_writer.Path.read_text") as mock_read:
+        append_docstring(filepath, "New")
+
+    mock_read.assert_not_called()
+    assert filepath.read_bytes() == b'"""New"""\n' + body
+    assert [path.name for path in tmp_path.iterdir()] == ["big.py"]
+
+
+def test_append_docstring_leaves_unclosed_docstring(tmp_path, mock_user_decline, mock_console_print):
+    filepath = tmp_path / "test.py"
+    filepath.write_text('"""Never closed\nx = 1\n')
+
+    append_docstring(filepath, "New")
+
+    assert filepath.read_text() == '"""New"""\n"""Never closed\nx = 1\n'
 
 
 # -------------------------
 # create_structure_from_dict
 # -------------------------
+def test_create_structure_writes_tree_without_prompting(tmp_path, mock_user_decline):
+    """
+    New files and folders are created with their docstrings, without asking.
+    """
+    structure = {"app": {"main.py": "Entry point", "ui": {"view.js": "Views"}}, "README.md": "Readme"}
+    create_structure_from_dict(structure, base_path=tmp_path / "project")
+
+    assert (tmp_path / "project/app/main.py").read_text() == '"""Entry point"""\n'
+    assert (tmp_path / "project/app/ui/view.js").read_text() == "/*Views*/\n"
+    assert (tmp_path / "project/README.md").read_text() == "<!--Readme-->\n"
+    mock_user_decline.assert_not_called()
+    assert not list(tmp_path.rglob("*.tmp"))
+
+
+def test_create_structure_asks_once_for_existing_files(tmp_path, mock_user_decline):
+    """
+    Changes to existing files are reviewed together, and declining changes nothing.
+    """
+    (tmp_path / "a.py").write_text('"""Old a"""\nx = 1\n')
+    (tmp_path / "b.py").write_text("y = 2\n")
+    create_structure_from_dict({"a.py": "New a", "b.py": "New b", "c.py": "New c"}, base_path=tmp_path)
+
+    mock_user_decline.assert_called_once()
+    assert (tmp_path / "a.py").read_text() == '"""Old a"""\nx = 1\n'
+    assert not (tmp_path / "c.py").exists()
+
+
+def test_create_structure_force_updates_existing_files(tmp_path, mock_user_decline):
+    (tmp_path / "a.py").write_text('"""Old a"""\nx = 1\n')
+    create_structure_from_dict({"a.py": "New a"}, base_path=tmp_path, force=True)
+
+    mock_user_decline.assert_not_called()
+    assert (tmp_path / "a.py").read_text() == '"""New a"""\nx = 1\n'
+
+
+def test_plan_structure_skips_unchanged_files(tmp_path):
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg/done.py").write_text('"""Done"""\n')
+    plan = plan_structure({"pkg": {"done.py": "Done", "new.py": "New"}, "docs": {}}, base_path=tmp_path)
+
+    assert plan.directories == [tmp_path / "docs"]
+    assert [write.path for write in plan.writes] == [tmp_path / "pkg/new.py"]
+    assert plan.changed == []
+
+
+def test_commit_plan_rolls_back_on_failure(tmp_path):
+    """
+    A failure part way through the renames restores the tree as it was.
+    """
+    (tmp_path / "keep.py").write_text('"""Old"""\nbody\n')
+    plan = plan_structure({"keep.py": "New", "pkg": {"one.py": "One", "two.py": "Two"}}, base_path=tmp_path)
+    real_replace = os.replace
+    calls = []
+
+    def failing_replace(src, dst):
+        calls.append(dst)
+        if len(calls) == 3:
+            raise OSError("disk full")
+        real_replace(src, dst)
+
+    with patch("core.file_writer.os.replace", side_effect=failing_replace):
+        with pytest.raises(OSError):
+            commit_plan(plan)
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["keep.py"]
+    assert (tmp_path / "keep.py").read_text() == '"""Old"""\nbody\n'
+
+
+def test_commit_plan_fsyncs_each_file_and_directory_once(tmp_path):
+    plan = plan_structure({"a.py": "A", "pkg": {"b.py": "B", "c.py": "C"}}, base_path=tmp_path)
+
+    with patch("core.file_writer.os.fsync", wraps=os.fsync) as mock_fsync:
+        commit_plan(plan)
+
+    # Three temp files, then tmp_path and pkg once each
+    assert mock_fsync.call_count == 5
@@ -0,0 +1,58 @@
+"""
+Unit tests for the incremental JSON parser in json_stream.py.
+Replies are fed in small chunks to mimic a streamed LLM response.
+"""
+
+import json
+from core.json_stream import IncrementalJSONParser
+
+PLAN = {
+    "todo": {"main.py": ["Set up CLI", "Add \"quoted\" task"], "db.py": ["Create schema"]},
+    "structure": {"project": {"main.py": "Entry point", "db.py": "Database helpers"}},
+}
+
+
+def feed_in_chunks(parser, text, size=5):
+    events = []
+    for start in range(0, len(text), size):
+        events.extend(parser.feed(text[start:start + size]))
+    return events
+
+
+def test_entries_are_emitted_as_they_complete():
+    parser = IncrementalJSONParser()
+    text = json.dumps(PLAN)
+
+    events = feed_in_chunks(parser, text)
+
+    assert events == [
+        (("todo", "main.py"), ["Set up CLI", "Add \"quoted\" task"]),
+        (("todo", "db.py"), ["Create schema"]),
+        (("structure", "project"), {"main.py": "Entry point", "db.py": "Database helpers"}),
+    ]
+    assert parser.done
+    assert parser.result() == PLAN
+
+
+def test_first_entry_is_available_before_reply_ends():
+    parser = IncrementalJSONParser()
+    text = json.dumps(PLAN)
+    cut = text.index('"db.py"')
+
+    assert parser.feed(text[:cut]) == [(("todo", "main.py"), PLAN["todo"]["main.py"])]
+
+
+def test_markdown_fence_and_bare_keys_are_tolerated():
+    parser = IncrementalJSONParser()
+    text = '```json\n{ todo: {"a.py": ["x"]}, "count": 2 }\n```'
+
+    events = feed_in_chunks(parser, text, size=3)
+
+    assert events == [(("todo", "a.py"), ["x"])]
+
+
+def test_emit_depth_one_reports_top_level_values():
+    parser = IncrementalJSONParser(emit_depth=1)
+    events = parser.feed('{"name": "Coductor", "stack": {"Language": ["Python"]}}')
+
+    assert events == [(("name",), "Coductor"), (("stack",), {"Language": ["Python"]})]
@@ -0,0 +1,89 @@
+"""
+Unit tests for the append-only JSONL log in jsonl_log.py.
+Every test works on a log in a temporary directory.
+"""
+
+import pytest
+from core.jsonl_log import JsonlLog
+
+
+@pytest.fixture
+def log(tmp_path):
+    return JsonlLog(tmp_path / "session.jsonl")
+
+
+def records(count, start=0):
+    return [{"role": "user", "content": f"message {i}"} for i in range(start, start + count)]
+
+
+# -----------------------
+# append / read / tail
+# -----------------------
+def test_append_and_read_back(log):
+    log.append(records(3))
+    log.append(records(2, start=3))
+
+    assert len(log) == 5
+    assert log.read_all() == records(5)
+    assert log.read(0) == records(1)[0]
+    assert log.read(-1) == {"role": "user", "content": "message 4"}
+
+
+def test_tail_reads_only_last_records(log):
+    log.append(records(10))
+
+    assert log.tail(3) == records(3, start=7)
+    assert log.tail(50) == records(10)
+    assert log.tail(0) == []
+
+
+def test_read_out_of_range(log):
+    log.append(records(1))
+    with pytest.raises(IndexError):
+        log.read(5)
+
+
+# -----------------------
+# recover
+# -----------------------
+def test_recover_truncates_partial_record(log):
+    log.append(records(2))
+    with open(log.path, "ab") as f:
+        f.write(b'{"role": "user", "cont')
+
+    reopened = JsonlLog(log.path)
+    assert reopened.read_all() == records(2)
+    assert len(reopened) == 2
+
+
+def test_recover_rebuilds_stale_index(log):
+    log.append(records(2))
+    # Simulate a crash after the data write but before the index write
+    with open(log.path, "ab") as f:
+        f.write(b'{"role": "user", "content": "message 2"}\n')
+
+    reopened = JsonlLog(log.path)
+    assert len(reopened) == 3
+    assert reopened.read(-1) == {"role": "user", "content": "message 2"}
+
+
+# -----------------------
+# rewrite / compact
+# -----------------------
+def test_rewrite_replaces_log(log):
+    log.append(records(5))
+    log.rewrite(records(2, start=8))
+
+    assert log.read_all() == records(2, start=8)
+    assert log.tail(1) == records(1, start=9)
+
+
+def test_compact_drops_corrupt_records(log):
+    log.append(records(1))
+    with open(log.path, "ab") as f:
+        f.write(b"not json\n")
+    log.append(records(1, start=1))
+
+    assert log.compact() == 1
+    assert log.read_all() == records(2)
+    assert len(log) == 2
@@ -0,0 +1,88 @@
+"""
+Unit tests for MemoryManager in memory.py.
+"""
+
+import pytest
+import yaml
+from unittest.mock import patch
+from core.memory import MemoryManager
+
+
+def test_todos_are_kept_in_the_store(tmp_path):
+    memory = MemoryManager(tmp_path)
+    memory.add_todo("Write tests")
+    memory.add_todo("Ship it", category="Release")
+    memory.update_todo_status("Write tests", "done")
+
+    todos = MemoryManager(tmp_path).load_todos()
+
+    assert [(t["task"], t["status"], t["category"]) for t in todos] == [
+        ("Write tests", "done", "General"),
+        ("Ship it", "pending", "Release"),
+    ]
+    assert not (tmp_path / ".coductor" / "todo.yml").exists()
+
+
+def test_old_todo_yml_is_imported_once(tmp_path):
+    (tmp_path / ".coductor").mkdir()
+    (tmp_path / ".coductor" / "todo.yml").write_text(yaml.safe_dump([{"task": "Old task", "status": "done"}]))
+
+    memory = MemoryManager(tmp_path)
+
+    assert memory.load_todos()[0]["task"] == "Old task"
+    assert not (tmp_path / ".coductor" / "todo.yml").exists()
+    assert len(MemoryManager(tmp_path).load_todos()) == 1
+
+
+def test_save_todos_replaces_the_list(tmp_path):
+    memory = MemoryManager(tmp_path)
+    memory.add_todo("First")
+
+    memory.save_todos([{"task": "Second", "status": "pending"}])
+
+    assert [t["task"] for t in memory.load_todos()] == ["Second"]
+
+
+def test_memory_is_parsed_once_until_the_file_changes(tmp_path):
+    memory = MemoryManager(tmp_path)
+    memory.update_memory("goal", "ship")
+
+    with patch("core.memory.yaml.load", wraps=yaml.load) as mock_load:
+        assert memory.load_memory() == {"goal": "ship"}
+        assert memory.load_memory() == {"goal": "ship"}
+        mock_load.assert_not_called()
+
+        # Another process rewrites the file
+        (tmp_path / ".coductor" / "memory.yml").write_text(yaml.safe_dump({"goal": "rewrite", "extra": 1}))
+        assert memory.load_memory() == {"goal": "rewrite", "extra": 1}
+        mock_load.assert_called_once()
+
+
+def test_transaction_writes_once_at_exit(tmp_path):
+    memory = MemoryManager(tmp_path)
+
+    with patch.object(memory, "_write_memory", wraps=memory._write_memory) as mock_write:
+        with memory.transaction():
+            for i in range(100):
+                memory.update_memory(f"key_{i}", i)
+            with memory.transaction():
+                memory.update_memory("nested", True)
+            assert memory.load_memory()["key_99"] == 99
+            mock_write.assert_not_called()
+
+    mock_write.assert_called_once()
+    saved = yaml.safe_load((tmp_path / ".coductor" / "memory.yml").read_text())
+    assert saved["key_99"] == 99 and saved["nested"] is True
+
+
+def test_transaction_discards_changes_on_error(tmp_path):
+    memory = MemoryManager(tmp_path)
+    memory.update_memory("kept", 1)
+
+    with pytest.raises(RuntimeError):
+        with memory.transaction():
+            memory.update_memory("lost", 2)
+            raise RuntimeError("stop")
+
+    assert memory.load_memory() == {"kept": 1}
+    assert MemoryManager(tmp_path).load_memory() == {"kept": 1}
@@ -0,0 +1,129 @@
+"""
+Unit tests for analyze_project in project_analyzer.py: parallel analysis,
+result order, tolerance of files that do not parse, and the symbol records.
+"""
+
+import json
+import pytest
+from pathlib import Path
+from unittest.mock import patch
+from core import project_analyzer
+from core.project_analyzer import analyze_project, analyze_source, find_symbol, records, Symbol
+
+SOURCE = '''
+import functools
+
+class Store(Base, metaclass=Meta):
+    """Keeps things."""
+
+    @functools.cache
+    @staticmethod
+    def load(path: str, *, strict: bool = False) -> dict:
+        def parse(line):
+            return line
+        return {}
+
+async def fetch(url, retries=3):
+    pass
+'''
+
+
+@pytest.fixture
+def project(tmp_path):
+    for i in range(12):
+        (tmp_path / f"mod_{i:02}.py").write_text(f"def func_{i}():\n    pass\n")
+    (tmp_path / "broken.py").write_text("def oops(:\n")
+    with patch("core.project_analyzer.console.print"):
+        yield tmp_path
+
+
+def test_bad_file_does_not_stop_the_run(project):
+    results = analyze_project(project, use_cache=False, workers=1)
+
+    broken = next(r for r in results if r["file"].endswith("broken.py"))
+    assert broken["error"].startswith("SyntaxError")
+    assert sum("error" not in r for r in results) == 12
+
+
+def test_process_pool_returns_results_in_file_order(project, monkeypatch):
+    monkeypatch.setattr(project_analyzer, "PARALLEL_THRESHOLD", 0)
+
+    parallel = analyze_project(project, use_cache=False, workers=2)
+    serial = analyze_project(project, use_cache=False, workers=1)
+
+    assert parallel == serial
+    assert [r["file"] for r in parallel] == [str(f) for f in project_analyzer.get_python_files(project)]
+
+
+def test_iter_analysis_yields_results_as_they_finish(project, tmp_path):
+    analyzed = []
+    analyze = project_analyzer._analyze_worker
+
+    def worker(path, source):
+        analyzed.append(path)
+        return analyze(path, source)
+
+    with patch("core.project_analyzer._analyze_worker", side_effect=worker):
+        results = project_analyzer.iter_analysis(project, use_cache=False, workers=1)
+        next(results)
+        assert len(analyzed) == 1  # The first result arrives before the rest are analyzed
+        store = project_analyzer.save_summaries(results, tmp_path / "summaries.jsonl")
+
+    assert len(store) == 12 and len(analyzed) == 13
+
+
+def test_iter_analysis_keeps_file_order_when_only_some_files_changed(project, monkeypatch):
+    monkeypatch.setattr(project_analyzer, "PARALLEL_THRESHOLD", 0)
+    analyze_project(project, workers=2)
+    for name in ("mod_03.py", "mod_09.py"):
+        (project / name).write_text("def changed():\n    pass\n")
+
+    results = list(project_analyzer.iter_analysis(project, workers=2))
+
+    assert [r["file"] for r in results] == [str(f) for f in project_analyzer.get_python_files(project)]
+
+
+def test_failed_files_are_cached_until_fixed(project):
+    analyze_project(project)
+    (project / "broken.py").write_text("def oops():\n    pass\n")
+
+    results = analyze_project(project)
+
+    broken = next(r for r in results if r["file"].endswith("broken.py"))
+    assert "error" not in broken and broken["symbols"][0].name == "oops"
+
+
+def test_symbols_keep_parents_spans_signatures_and_decorators():
+    symbols = {s.qualname: s for s in analyze_source(Path("store.py"), SOURCE)["symbols"]}
+
+    assert list(symbols) == ["Store", "Store.load", "Store.load.<locals>.parse", "fetch"]
+    assert symbols["Store"].signature == "(Base, metaclass=Meta)"
+    load = symbols["Store.load"]
+    assert (load.kind, load.parent, load.line, load.end_line) == ("method", "Store", 7, 12)
+    assert load.signature == "(path: str, *, strict: bool=False) -> dict"
+    assert load.decorators == ("functools.cache", "staticmethod")
+    assert symbols["Store.load.<locals>.parse"].parent == "Store.load"
+    assert symbols["fetch"].is_async and not load.is_async
+
+
+def test_records_survive_a_json_round_trip():
+    result = analyze_source(Path("store.py"), SOURCE)
+    decoded = json.loads(json.dumps(result))
+
+    assert records(decoded, "symbols") == [Symbol(*s) for s in result["symbols"]]
+    assert records(decoded, "imports")[0].module == "functools"
+    assert records(decoded, "references")[0].kind == "inherits"
+
+
+def test_find_symbol_prefers_qualified_names():
+    result = analyze_source(Path("store.py"), SOURCE)
+
+    assert [s.qualname for s in find_symbol(result, "Store.load")] == ["Store.load"]
+    assert [s.qualname for s in find_symbol(result, "parse")] == ["Store.load.<locals>.parse"]
+    assert find_symbol(result, "missing") == []
+
+
+def test_summary_lists_top_level_definitions_and_methods():
+    summary = analyze_source(Path("store.py"), SOURCE)["summary"]
+
+    assert summary == "store.py defines:\n- Classes: Store\n- Functions: fetch\n- Methods: Store.load"
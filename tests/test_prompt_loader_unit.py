@@ -0,0 +1,88 @@
+"""
+Unit tests for the prompt template registry in prompt_loader.py.
+"""
+
+import os
+import pytest
+from jinja2 import UndefinedError
+from unittest.mock import patch
+from core.prompts.prompt_loader import PromptRegistry, load_prompt, load_schema
+
+
+@pytest.fixture
+def prompts(tmp_path):
+    directory = tmp_path / "prompts"
+    directory.mkdir()
+    (directory / "greet.yml").write_text(
+        "name: greet\nprompt: |\n  Hello {{name}}!\nschema:\n  type: object\n"
+    )
+    return directory
+
+
+def rewrite(path, text):
+    stat = path.stat()
+    path.write_text(text)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))  # A visibly newer mtime
+
+
+def test_templates_are_compiled_once(prompts, tmp_path):
+    registry = PromptRegistry(prompts, tmp_path / "bytecode")
+
+    first = registry.template("greet")
+
+    assert registry.template("greet") is first
+    assert first.render(name="Ada") == "Hello Ada!"
+    assert registry.spec("greet")["schema"] == {"type": "object"}
+
+
+def test_changed_files_are_reloaded(prompts, tmp_path):
+    registry = PromptRegistry(prompts, tmp_path / "bytecode")
+    registry.template("greet")
+
+    rewrite(prompts / "greet.yml", "name: greet\nprompt: |\n  Bye {{name}}!\n")
+
+    assert registry.template("greet").render(name="Ada") == "Bye Ada!"
+    assert registry.spec("greet").get("schema") is None
+
+
+def test_undefined_variables_fail_the_render(prompts, tmp_path):
+    registry = PromptRegistry(prompts, tmp_path / "bytecode")
+
+    with pytest.raises(UndefinedError):
+        registry.template("greet").render()
+
+
+def test_bytecode_cache_skips_compiling_in_a_new_process(prompts, tmp_path):
+    PromptRegistry(prompts, tmp_path / "bytecode").template("greet")
+    assert list((tmp_path / "bytecode").iterdir())
+
+    registry = PromptRegistry(prompts, tmp_path / "bytecode")
+    with patch.object(registry.env, "compile", wraps=registry.env.compile) as compile_:
+        assert registry.template("greet").render(name="Ada") == "Hello Ada!"
+
+    compile_.assert_not_called()
+
+
+def test_shipped_prompts_render():
+    assert "Password reset" in load_prompt("add_feature").render(feature="Password reset")
+    assert "Relevant parts" in load_prompt("add_feature").render(feature="x", context="core/agent.py")
+    assert load_schema("generate_tests")["required"] == ["tests"]
+
+
+def test_registry_is_created_on_first_use_in_the_configured_cache(tmp_path, monkeypatch):
+    import core.prompts.prompt_loader as prompt_loader
+    monkeypatch.setenv("CODUCTOR_TEMPLATE_CACHE_DIR", str(tmp_path / "templates"))
+    assert prompt_loader._registry is None
+
+    load_prompt("add_feature").render(feature="x")
+
+    assert prompt_loader.get_registry() is prompt_loader.get_registry()
+    assert list((tmp_path / "templates").glob("__jinja2_*.cache"))
+
+
+def test_default_cache_dir_follows_xdg(tmp_path, monkeypatch):
+    from core.prompts.prompt_loader import bytecode_cache_dir
+    monkeypatch.delenv("CODUCTOR_TEMPLATE_CACHE_DIR")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+
+    assert bytecode_cache_dir() == tmp_path / "coductor" / "templates"
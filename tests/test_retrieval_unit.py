@@ -0,0 +1,70 @@
+"""
+Unit tests for BM25 context retrieval in retrieval.py and its use by add feature.
+"""
+
+import pytest
+from unittest.mock import patch, AsyncMock
+from core.retrieval import retrieve, retrieve_context
+from core.symbol_index import open_index
+
+FILES = {
+    "auth/password.py": '"""Password hashing and reset tokens."""\n\ndef reset_password(user):\n    """Send a password reset email to the user."""\n',
+    "billing/invoice.py": '"""Invoices and payments."""\n\ndef create_invoice(order):\n    """Create an invoice for an order."""\n',
+    "ui/theme.py": '"""Colors and dark mode."""\n\ndef toggle_dark_mode():\n    """Switch between light and dark themes."""\n',
+}
+
+
+@pytest.fixture
+def project(tmp_path):
+    for path, source in FILES.items():
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_text(source)
+    with patch("core.project_analyzer.console.print"), \
+         patch("core.retrieval.count_tokens", side_effect=lambda text, model: len(text.split())):
+        yield tmp_path
+
+
+def test_most_relevant_file_ranks_first(project):
+    hits = retrieve("Add a password reset flow", project)
+
+    assert hits[0]["path"] == "auth/password.py"
+    assert {hit["path"] for hit in hits} == {"auth/password.py"}
+
+
+def test_results_fit_the_token_budget(project):
+    generous = retrieve("invoice dark mode password", project, max_tokens=1000)
+    tight = retrieve("invoice dark mode password", project, max_tokens=15)
+
+    assert len(generous) > len(tight) >= 1
+    assert sum(len(f"- {h['path']} {h['text']}".split()) for h in tight) <= 15 + len(tight)
+
+
+def test_reindex_picks_up_changes(project):
+    assert retrieve("payments for an order", project)[0]["path"] == "billing/invoice.py"
+    (project / "billing" / "invoice.py").write_text('"""Shipping labels."""\n')
+
+    assert retrieve("payments for an order", project) == []
+    with open_index(project) as index:
+        assert index.search("shipping")[0]["path"] == "billing/invoice.py"
+
+
+def test_context_lists_the_hits_as_snippets(project):
+    context = retrieve_context("Add a password reset flow", project)
+
+    assert context.startswith("- auth/password.py")
+    assert "reset_password" in context
+    assert retrieve_context("quantum entanglement", project) == ""
+
+
+@pytest.mark.asyncio
+async def test_add_feature_prompt_includes_context(project, monkeypatch):
+    from core.commands import add
+    monkeypatch.chdir(project)
+    send = AsyncMock(return_value={})
+
+    with patch("core.commands.add.send_prompt", send):
+        await add.ask_coductor_to_add_feature("dark mode toggle")
+
+    prompt = send.call_args.args[0]
+    assert "Relevant parts of the existing project" in prompt
+    assert "ui/theme.py" in prompt and "billing/invoice.py" not in prompt
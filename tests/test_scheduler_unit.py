@@ -0,0 +1,153 @@
+"""
+Unit tests for the request scheduler in scheduler.py.
+Calls are plain coroutines, so no requests are sent.
+"""
+
+import asyncio
+import time
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from core.scheduler import RequestScheduler, TokenBucket, retry_after
+
+pytest_plugins = ('pytest_asyncio',)
+
+
+class FakeRateLimit(Exception):
+    def __init__(self, headers=None):
+        super().__init__("rate limited")
+        self.response = MagicMock(headers=headers or {})
+
+
+# -----------------------
+# retry_after
+# -----------------------
+def test_retry_after_reads_seconds_and_milliseconds():
+    assert retry_after(FakeRateLimit({"retry-after": "2"})) == 2.0
+    assert retry_after(FakeRateLimit({"retry-after-ms": "250"})) == 0.25
+    assert retry_after(FakeRateLimit()) is None
+    assert retry_after(ValueError("no response")) is None
+
+
+# -----------------------
+# TokenBucket
+# -----------------------
+@pytest.mark.asyncio
+async def test_token_bucket_waits_for_refill():
+    bucket = TokenBucket(per_minute=600)  # 10 tokens per second
+    bucket.drain()
+
+    start = time.monotonic()
+    await bucket.acquire(1)
+    assert time.monotonic() - start >= 0.08
+
+
+# -----------------------
+# RequestScheduler.submit
+# -----------------------
+@pytest.mark.asyncio
+async def test_submit_retries_with_retry_after():
+    scheduler = RequestScheduler(retryable=(FakeRateLimit,))
+    calls = []
+
+    async def call():
+        calls.append(1)
+        if len(calls) < 3:
+            raise FakeRateLimit({"retry-after": "0"})
+        return "ok"
+
+    assert await scheduler.submit(call) == "ok"
+    assert len(calls) == 3
+    assert scheduler.stats["retries"] == 2
+
+
+@pytest.mark.asyncio
+async def test_submit_gives_up_after_max_retries():
+    scheduler = RequestScheduler(max_retries=1, base_delay=0.001, retryable=(FakeRateLimit,))
+
+    async def call():
+        raise FakeRateLimit()
+
+    with pytest.raises(FakeRateLimit):
+        await scheduler.submit(call)
+    assert scheduler.stats["requests"] == 2
+
+
+@pytest.mark.asyncio
+async def test_submit_does_not_retry_other_errors():
+    scheduler = RequestScheduler(retryable=(FakeRateLimit,))
+
+    async def call():
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        await scheduler.submit(call)
+    assert scheduler.stats["retries"] == 0
+
+
+@pytest.mark.asyncio
+async def test_submit_bounds_concurrency():
+    scheduler = RequestScheduler(max_concurrency=2)
+    in_flight = []
+    peak = []
+
+    async def call():
+        in_flight.append(1)
+        peak.append(len(in_flight))
+        await asyncio.sleep(0.01)
+        in_flight.pop()
+
+    await asyncio.gather(*(scheduler.submit(call) for _ in range(6)))
+    assert max(peak) == 2
+
+
+# -----------------------
+# RequestScheduler.stream
+# -----------------------
+@pytest.mark.asyncio
+async def test_stream_holds_its_slot_until_consumed():
+    scheduler = RequestScheduler(max_concurrency=1)
+    events = []
+
+    def opener(name):
+        async def call():
+            async def chunks():
+                for i in range(3):
+                    events.append((name, i))
+                    await asyncio.sleep(0.005)
+                    yield i
+            return chunks()
+        return call
+
+    async def consume(name):
+        return [chunk async for chunk in scheduler.stream(opener(name))]
+
+    results = await asyncio.gather(consume("a"), consume("b"))
+
+    assert results == [[0, 1, 2], [0, 1, 2]]
+    # With one slot, the second stream only opens once the first is read to the end
+    assert [name for name, _ in events] == ["a"] * 3 + ["b"] * 3
+
+
+@pytest.mark.asyncio
+async def test_stream_gives_its_slot_back_when_closed_early():
+    scheduler = RequestScheduler(max_concurrency=1)
+    closed = []
+
+    async def call():
+        stream = MagicMock()
+        stream.__aiter__.return_value = iter([1, 2, 3])
+        stream.aclose = None
+        stream.close = AsyncMock(side_effect=lambda: closed.append(True))
+        return stream
+
+    chunks = scheduler.stream(call)
+    assert await anext(chunks) == 1
+    await chunks.aclose()
+
+    assert closed == [True]
+    assert await asyncio.wait_for(scheduler.submit(AsyncMock(return_value="ok")), timeout=1) == "ok"
+
+
+def test_backoff_is_capped():
+    scheduler = RequestScheduler(base_delay=1.0, max_delay=5.0)
+    assert all(0 <= scheduler.backoff(attempt) <= 5.0 for attempt in range(10))
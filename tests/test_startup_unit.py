@@ -0,0 +1,46 @@
+"""
+Startup tests for main.py: commands must not pay for dependencies they do not use.
+Each case runs a fresh interpreter with `python -X importtime`.
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+
+ROOT = Path(__file__).parent.parent
+HEAVY = {"openai", "httpx", "tiktoken", "jinja2", "yaml", "dotenv"}
+STARTUP_BUDGET_MS = float(os.getenv("CODUCTOR_STARTUP_BUDGET_MS", "500"))
+
+
+def import_times(*args: str) -> dict[str, int]:
+    result = subprocess.run([sys.executable, "-X", "importtime", *args], cwd=ROOT, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr[-2000:]
+    times = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "cumulative" not in line:
+            _, cumulative, name = line[len("import time:"):].split("|")
+            times[name[1:].rstrip()] = int(cumulative)
+    return times
+
+
+def imported(times: dict[str, int]) -> set[str]:
+    return {name.strip().split(".")[0] for name in times}
+
+
+def test_help_loads_no_command_modules_or_heavy_dependencies():
+    times = import_times("main.py", "--help")
+
+    assert not {name.strip() for name in times if name.strip().startswith("core")}
+    assert not HEAVY & imported(times)
+    total_ms = sum(us for name, us in times.items() if not name.startswith(" ")) / 1000
+    assert total_ms < STARTUP_BUDGET_MS
+
+
+@pytest.mark.parametrize("args", [("main.py", "session", "list"), ("-c", "import core.agent")])
+def test_agent_loads_the_openai_client_only_when_sending(args):
+    times = import_times(*args)
+
+    assert "core.agent" in {name.strip() for name in times}
+    assert not {"openai", "httpx"} & imported(times)
@@ -0,0 +1,82 @@
+"""
+Unit tests for schema validation, local repair and re-ask helpers in structured.py.
+"""
+
+import json
+import pytest
+from core.structured import SchemaError, validate, repair_json, parse_json, failed_keys, reask_prompt, merge
+from core.prompts.prompt_loader import load_schema
+
+
+# -----------------------
+# repair_json / parse_json
+# -----------------------
+@pytest.mark.parametrize("text, expected", [
+    ('{"a": 1,}', {"a": 1}),
+    ('```json\n{"a": [1, 2,],}\n```', {"a": [1, 2]}),
+    ('{todo: {"main.py": ["x"]}}', {"todo": {"main.py": ["x"]}}),
+    ('Sure! {"a": true} Hope this helps.', {"a": True}),
+    ('{"a": {"b": ["x", "y', {"a": {"b": ["x", "y"]}}),
+    ('{"a": 1, "b"', {"a": 1, "b": None}),
+    ('{"a": "line\nbreak"}', {"a": "line\nbreak"}),
+    ('{"a": True, "b": None}', {"a": True, "b": None}),
+    ('{"a": tru', {"a": True}),
+    ('{"a": nul', {"a": None}),
+    ('{"a": [fa', {"a": [False]}),
+    ('{"a": 1.', {"a": 1}),
+    ('{"a": 2.5e-', {"a": 2.5}),
+    ('{"a": -', {"a": None}),
+])
+def test_repair_json_fixes_common_defects(text, expected):
+    assert json.loads(repair_json(text)) == expected
+
+
+def test_parse_json_reports_whether_it_repaired():
+    assert parse_json('{"a": 1}') == ({"a": 1}, False)
+    assert parse_json('{"a": 1,') == ({"a": 1}, True)
+    with pytest.raises(ValueError):
+        parse_json("no json here")
+
+
+# -----------------------
+# validate
+# -----------------------
+def test_validate_accepts_a_valid_plan():
+    plan = {"todo": {"main.py": ["Set up CLI"]}, "structure": {"app": {"main.py": "Entry point"}}}
+    assert validate(plan, load_schema("plan_project")) == []
+
+
+def test_validate_reports_paths_of_problems():
+    plan = {"todo": {"main.py": "Set up CLI"}}
+
+    errors = validate(plan, load_schema("plan_project"))
+
+    assert SchemaError(("structure",), "missing") in errors
+    assert any(error.path == ("todo", "main.py") for error in errors)
+
+
+def test_validate_does_not_treat_booleans_as_numbers():
+    assert validate(True, {"type": "integer"}) != []
+    assert validate(3, {"type": "number"}) == []
+
+
+# -----------------------
+# Re-ask helpers
+# -----------------------
+def test_reask_only_asks_for_failed_keys():
+    schema = load_schema("plan_project")
+    value = {"todo": {"main.py": ["x"]}, "structure": "oops"}
+    errors = validate(value, schema)
+
+    keys = failed_keys(value, errors)
+    prompt = reask_prompt(errors, schema, keys)
+
+    assert keys == ["structure"]
+    assert "structure" in prompt and '"todo"' not in prompt
+    assert merge(value, {"structure": {"app": {}}}, keys) == {"todo": {"main.py": ["x"]}, "structure": {"app": {}}}
+
+
+def test_unparsable_reply_is_asked_for_again_whole():
+    errors = [SchemaError((), "invalid JSON")]
+    assert failed_keys(None, errors) is None
+    assert merge(None, {"a": 1}, None) == {"a": 1}
@@ -0,0 +1,49 @@
+"""
+Unit tests for the JSONL summaries store in summary_store.py.
+"""
+
+import yaml
+from core.summary_store import SummaryStore
+
+
+def summary(i: int) -> dict:
+    return {"file": f"pkg/module_{i}.py", "classes": [], "functions": [{"name": f"f{i}", "docstring": None}], "summary": f"module {i}"}
+
+
+def test_write_streams_from_a_generator_and_reads_one_file(tmp_path):
+    store = SummaryStore(tmp_path / "summaries.jsonl")
+
+    count = store.write(summary(i) for i in range(1200))
+
+    assert count == len(store) == 1200
+    assert store.get("pkg/module_777.py") == summary(777)
+    assert store.get("missing.py") is None
+    assert store.files()[:2] == ["pkg/module_0.py", "pkg/module_1.py"]
+
+
+def test_rewrite_replaces_previous_summaries(tmp_path):
+    store = SummaryStore(tmp_path / "summaries.jsonl")
+    store.write([summary(1), summary(2)])
+
+    store.write([summary(3)])
+
+    reopened = SummaryStore(tmp_path / "summaries.jsonl")
+    assert list(reopened) == [summary(3)]
+    assert reopened.get("pkg/module_1.py") is None
+
+
+def test_missing_keys_file_is_rebuilt_from_the_log(tmp_path):
+    store = SummaryStore(tmp_path / "summaries.jsonl")
+    store.write([summary(1), summary(2)])
+    store.keys_path.unlink()
+
+    assert SummaryStore(tmp_path / "summaries.jsonl").get("pkg/module_2.py") == summary(2)
+
+
+def test_yaml_export_is_readable(tmp_path):
+    store = SummaryStore(tmp_path / "summaries.jsonl")
+    store.write([summary(1), summary(2)])
+
+    store.export_yaml(tmp_path / "summaries.yml")
+
+    assert yaml.safe_load((tmp_path / "summaries.yml").read_text()) == [summary(1), summary(2)]
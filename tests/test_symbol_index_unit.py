@@ -0,0 +1,90 @@
+"""
+Unit tests for the SQLite symbol index in symbol_index.py, built from a small
+temporary project.
+"""
+
+import pytest
+from unittest.mock import patch
+from core.symbol_index import build_index, open_index, module_name
+
+STORE = '''
+"""Storage helpers."""
+import json
+from pathlib import Path
+
+
+class Store:
+    def save(self, record):
+        """Write one record."""
+        return json.dumps(record)
+'''
+
+APP = '''
+from pkg.store import Store
+
+
+class CachedStore(Store):
+    pass
+
+
+def main():
+    store = Store()
+    store.save({"a": 1})
+'''
+
+
+@pytest.fixture
+def project(tmp_path):
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "__init__.py").write_text("")
+    (tmp_path / "pkg" / "store.py").write_text(STORE)
+    (tmp_path / "app.py").write_text(APP)
+    with patch("core.project_analyzer.console.print"):
+        build_index(tmp_path)
+        yield tmp_path
+
+
+def test_module_name():
+    assert module_name("core/agent.py") == "core.agent"
+    assert module_name("pkg/__init__.py") == "pkg"
+
+
+def test_definitions_have_line_ranges(project):
+    with open_index(project) as index:
+        (save,) = index.definitions("Store.save")
+
+    assert save["path"] == "pkg/store.py"
+    assert save["kind"] == "method"
+    assert (save["line"], save["end_line"]) == (8, 10)
+    assert save["docstring"] == "Write one record."
+
+
+def test_callers_and_subclasses(project):
+    with open_index(project) as index:
+        calls = index.callers("save")
+        store_refs = index.callers("Store")
+
+    assert [(c["path"], c["caller"], c["target"]) for c in calls] == [("app.py", "main", "store.save")]
+    assert {(r["caller"], r["kind"]) for r in store_refs} == {("<module>", "inherits"), ("main", "call")}
+
+
+def test_module_symbols_and_importers(project):
+    with open_index(project) as index:
+        symbols = [s["qualname"] for s in index.module_symbols("pkg.store")]
+        importers = index.imports_of("pkg.store")
+
+    assert symbols == ["Store", "Store.save"]
+    assert [(i["path"], i["name"]) for i in importers] == [("app.py", "Store")]
+
+
+def test_rebuild_only_touches_changed_files(project):
+    (project / "app.py").write_text("def main():\n    pass\n")
+    (project / "pkg" / "store.py").unlink()
+
+    with patch("core.project_analyzer.console.print"):
+        counts = build_index(project)
+
+    assert counts == {"updated": 1, "unchanged": 1, "removed": 1}
+    with open_index(project) as index:
+        assert index.callers("save") == []
+        assert index.definitions("Store") == []
@@ -0,0 +1,65 @@
+"""
+Unit tests for the SQLite TODO store in todo_store.py.
+"""
+
+from core.todo_store import TodoStore, VIEW_END, VIEW_START
+
+
+def test_add_is_idempotent_per_category(tmp_path):
+    with TodoStore(tmp_path / "todo.db") as store:
+        first = store.add("Setup", ["Init repo", "Install deps"])
+        again = store.add("Setup", ["Init repo"])
+        other = store.add("Docs", ["Init repo"])
+
+        assert again == first[:1]
+        assert other != again
+        assert len(store) == 3
+        assert store.categories() == ["Setup", "Docs"]
+
+
+def test_bulk_status_update_and_filters(tmp_path):
+    with TodoStore(tmp_path / "todo.db") as store:
+        ids = store.add("Build", [f"task {i}" for i in range(100)])
+
+        assert store.set_status(ids[:40], "done") == 40
+        assert store.set_status(ids[0], "done") == 0  # Already done
+        assert store.set_status_by_task("task 99", "in progress") == 1
+
+        assert len(store.items(status="done")) == 40
+        assert store.items(status="in progress")[0]["task"] == "task 99"
+        assert store.get(ids[5])["status"] == "done"
+        assert store.items(category="Missing") == []
+
+
+def test_render_keeps_hand_written_text_and_only_rerenders_changed_sections(tmp_path):
+    todo_md = tmp_path / "TODO.md"
+    todo_md.write_text("# Project TODO\n\nNotes written by hand.\n")
+    with TodoStore(tmp_path / "todo.db") as store:
+        ids = store.add("Setup", ["Init repo"])
+        store.add("Docs", ["Write README"])
+
+        assert store.render(todo_md) == 2
+        assert store.render(todo_md) == 0
+
+        store.set_status(ids, "done")
+        assert store.render(todo_md) == 1
+
+    content = todo_md.read_text()
+    assert content.startswith("# Project TODO\n\nNotes written by hand.\n")
+    assert content.count(VIEW_START) == content.count(VIEW_END) == 1
+    assert "## Setup\n- [x] Init repo" in content
+    assert "## Docs\n- [ ] Write README" in content
+
+
+def test_render_drops_empty_sections(tmp_path):
+    todo_md = tmp_path / "TODO.md"
+    with TodoStore(tmp_path / "todo.db") as store:
+        ids = store.add("Old", ["Gone soon"])
+        store.add("Kept", ["Stays"])
+        store.render(todo_md)
+
+        store.remove(ids)
+        store.render(todo_md)
+
+        assert store.categories() == ["Kept"]
+    assert "## Old" not in todo_md.read_text()
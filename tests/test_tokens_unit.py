@@ -0,0 +1,80 @@
+"""
+Unit tests for the token counting helpers in tokens.py.
+The tokenizer is replaced by a whitespace splitter so no encoding files are needed.
+"""
+
+import pytest
+from unittest.mock import patch, MagicMock
+from core.tokens import (
+    get_encoding,
+    count_message_tokens,
+    count_chat_tokens,
+    annotate_token_counts,
+    api_messages,
+)
+
+
+@pytest.fixture
+def fake_encoding():
+    encoding = MagicMock()
+    encoding.name = "whitespace"
+    encoding.encode.side_effect = lambda text: text.split()
+    encoding.encode_batch.side_effect = lambda texts: [text.split() for text in texts]
+    with patch("core.tokens.get_encoding", return_value=encoding):
+        yield encoding
+
+
+# -----------------------
+# get_encoding
+# -----------------------
+def test_get_encoding_is_cached_per_model():
+    get_encoding.cache_clear()
+    with patch("core.tokens.tiktoken.encoding_for_model", return_value=MagicMock()) as mock_load:
+        assert get_encoding("gpt-4o-mini") is get_encoding("gpt-4o-mini")
+        get_encoding("gpt-4o")
+    assert mock_load.call_count == 2
+    get_encoding.cache_clear()
+
+
+# -----------------------
+# count_message_tokens / count_chat_tokens
+# -----------------------
+def test_count_message_tokens_stores_count_on_message(fake_encoding):
+    message = {"role": "user", "content": "add a login page"}
+
+    assert count_message_tokens(message) == 3 + 1 + 4
+    assert message["tokens"] == {"whitespace": 8}
+
+    # A second count is served from the stored value without encoding again
+    fake_encoding.encode.reset_mock()
+    assert count_message_tokens(message) == 8
+    fake_encoding.encode.assert_not_called()
+
+
+def test_count_chat_tokens_adds_reply_priming(fake_encoding):
+    messages = [{"role": "user", "content": "one two"}, {"role": "assistant", "content": "three"}]
+    assert count_chat_tokens(messages) == (3 + 1 + 2) + (3 + 1 + 1) + 3
+
+
+# -----------------------
+# annotate_token_counts
+# -----------------------
+def test_annotate_token_counts_batches_only_new_messages(fake_encoding):
+    messages = [
+        {"role": "user", "content": "old message", "tokens": {"whitespace": 6}},
+        {"role": "assistant", "content": "new reply here"},
+    ]
+
+    annotate_token_counts(messages)
+
+    fake_encoding.encode_batch.assert_called_once_with(["assistant", "new reply here"])
+    assert messages[0]["tokens"] == {"whitespace": 6}
+    assert messages[1]["tokens"] == {"whitespace": 3 + 1 + 3}
+
+
+# -----------------------
+# api_messages
+# -----------------------
+def test_api_messages_strips_token_counts():
+    messages = [{"role": "user", "content": "hi", "tokens": {"whitespace": 5}}]
+    assert api_messages(messages) == [{"role": "user", "content": "hi"}]
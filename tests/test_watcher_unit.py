@@ -0,0 +1,68 @@
+"""
+Unit tests for the inotify and polling watchers in watcher.py.
+"""
+
+import pytest
+from core import watcher
+from core.watcher import InotifyWatcher, PollingWatcher
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    monkeypatch.setattr(watcher, "DEBOUNCE", 0.05)
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "mod.py").write_text("x = 1\n")
+    (tmp_path / "node_modules").mkdir()
+    return tmp_path
+
+
+@pytest.fixture
+def inotify(project):
+    try:
+        w = InotifyWatcher(project)
+    except OSError:
+        pytest.skip("inotify is not available")
+    yield w
+    w.close()
+
+
+def test_inotify_reports_modified_and_new_files(project, inotify):
+    (project / "pkg" / "mod.py").write_text("x = 2\n")
+    (project / "new.py").write_text("y = 1\n")
+    (project / "notes.txt").write_text("ignored\n")
+
+    assert inotify.changes(timeout=1.0) == {"pkg/mod.py", "new.py"}
+    assert inotify.changes(timeout=0.05) == set()
+
+
+def test_inotify_watches_directories_created_later(project, inotify):
+    (project / "fresh").mkdir()
+    (project / "fresh" / "a.py").write_text("a = 1\n")
+    assert "fresh/a.py" in inotify.changes(timeout=1.0)
+
+    (project / "fresh" / "a.py").write_text("a = 2\n")
+    assert inotify.changes(timeout=1.0) == {"fresh/a.py"}
+
+
+def test_inotify_skips_excluded_directories(project, inotify):
+    (project / "node_modules" / "dep.py").write_text("z = 1\n")
+
+    assert inotify.changes(timeout=0.2) == set()
+
+
+def test_inotify_asks_for_a_rescan_when_ignore_rules_change(project, inotify):
+    (project / ".gitignore").write_text("pkg/\n")
+
+    assert inotify.changes(timeout=1.0) is None
+
+
+def test_polling_reports_changed_and_removed_files(project):
+    w = PollingWatcher(project, interval=0.01)
+    (project / "pkg" / "mod.py").write_text("x = 22\n")
+    (project / "other.py").write_text("y = 1\n")
+
+    assert w.changes(timeout=1.0) == {"pkg/mod.py", "other.py"}
+
+    (project / "other.py").unlink()
+    assert w.changes(timeout=1.0) == {"other.py"}
+    assert w.changes(timeout=0.05) == set()